@@ -7,8 +7,14 @@ import os
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import shutil
+import sys
+
+# Scene helpers (primitives.py) that rendered scripts may import
+SCENE_LIBRARY_DIR = Path(__file__).parent.parent / "animation_manim"
+sys.path.append(str(SCENE_LIBRARY_DIR))
+from clips import ClipCache, clip_script, resolve_params
 
 
 class AnimationAgent:
@@ -23,9 +29,11 @@ class AnimationAgent:
         """
         self.output_dir = Path(output_dir) if output_dir else Path.cwd() / "media" / "videos"
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.clip_cache = ClipCache(str(self.output_dir.parent / "clips"))
         
     def render_animation(self, animation_code: str, scene_name: str = "GeneratedScene",
-                        quality: str = "low", format: str = "mp4") -> Dict:
+                        quality: str = "low", format: str = "mp4",
+                        script_name: Optional[str] = None) -> Dict:
         """
         Render a Manim animation from code
         
@@ -34,14 +42,23 @@ class AnimationAgent:
             scene_name: Name of the scene class to render
             quality: Quality level (low, medium, high)
             format: Output format (mp4, mov, gif)
+            script_name: Stable file name for the script. Manim keys its
+                         partial movie cache by script name, so re-rendering a
+                         patched script under the same name reuses every
+                         animation that did not change.
             
         Returns:
-            Dictionary with video path and metadata
+            Dictionary with video path and metadata (stderr and script_name
+            on failure, for repair)
         """
         # Create temporary file for the animation code
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-            f.write(animation_code)
-            temp_file = f.name
+        if script_name:
+            temp_file = os.path.join(tempfile.mkdtemp(), f"{script_name}.py")
+            Path(temp_file).write_text(animation_code)
+        else:
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+                f.write(animation_code)
+                temp_file = f.name
         
         try:
             # Quality settings
@@ -63,11 +80,18 @@ class AnimationAgent:
                 "--media_dir", str(self.output_dir.parent)
             ]
             
+            # Let scripts import the scene library from the temp directory
+            env = dict(os.environ)
+            env["PYTHONPATH"] = os.pathsep.join(
+                filter(None, [str(SCENE_LIBRARY_DIR), env.get("PYTHONPATH")])
+            )
+            
             result = subprocess.run(
                 cmd,
                 capture_output=True,
                 text=True,
-                check=True
+                check=True,
+                env=env
             )
             
             # Find the generated video
@@ -102,7 +126,8 @@ class AnimationAgent:
                 "success": False,
                 "error": str(e),
                 "stdout": e.stdout,
-                "stderr": e.stderr
+                "stderr": e.stderr,
+                "script_name": Path(temp_file).name
             }
         except Exception as e:
             return {
@@ -113,17 +138,245 @@ class AnimationAgent:
             # Cleanup temp file
             if os.path.exists(temp_file):
                 os.unlink(temp_file)
+            if script_name:
+                shutil.rmtree(os.path.dirname(temp_file), ignore_errors=True)
+    
+    def discard_render(self, video_path: str) -> int:
+        """
+        Delete the render directory (with its partial movie files) that a
+        video from render_animation lives in, once the video has been copied
+        
+        Args:
+            video_path: video_path returned by render_animation
+            
+        Returns:
+            Bytes freed
+        """
+        video_path = Path(video_path).resolve()
+        output_dir = self.output_dir.resolve()
+        if output_dir not in video_path.parents:
+            return 0
+        
+        # media/videos/<script>/<quality>/<scene>.mp4 -> media/videos/<script>
+        render_dir = output_dir / video_path.relative_to(output_dir).parts[0]
+        if render_dir == video_path:
+            freed = video_path.stat().st_size if video_path.exists() else 0
+            video_path.unlink(missing_ok=True)
+            return freed
+        
+        freed = sum(f.stat().st_size for f in render_dir.rglob("*") if f.is_file())
+        shutil.rmtree(render_dir, ignore_errors=True)
+        return freed
+    
+    def render_with_audio(self, animation_code: str, audio_path: Optional[str] = None,
+                          output_path: Optional[str] = None, scene_name: str = "GeneratedScene",
+                          quality: str = "low", format: str = "mp4",
+                          script_name: Optional[str] = None,
+                          audio_duration: Optional[float] = None) -> Dict:
+        """
+        Render a Manim scene by streaming frames into one ffmpeg encoder
+        
+        Unlike render_animation, no partial movie files are written or
+        combined, and the narration is muxed in the same encode, so
+        add_audio_to_video is not needed afterwards. Takes the same scene
+        arguments as render_animation, so the repair loop can use either.
+        
+        Args:
+            animation_code: Python code containing Manim scene
+            audio_path: Narration to mux (silent video if omitted)
+            output_path: Path for the video (defaults to the output directory)
+            scene_name: Name of the scene class to render
+            quality: Quality level (low, medium, high)
+            format: Only "mp4" is supported
+            script_name: Stable file name for the script
+            audio_duration: Measured narration length; the last frame is held
+                            until the narration ends
+            
+        Returns:
+            Dictionary with video path and metadata (stderr and script_name
+            on failure, for repair)
+        """
+        temp_dir = tempfile.mkdtemp()
+        temp_file = os.path.join(temp_dir, f"{script_name or 'scene'}.py")
+        Path(temp_file).write_text(animation_code)
+        output_path = Path(output_path) if output_path else \
+            self.output_dir / f"{script_name or Path(temp_dir).name}.{format}"
+        # Encode next to the output and rename on success, so a failed
+        # render never leaves a truncated video at output_path
+        partial_path = output_path.with_name(f"{output_path.stem}.partial{output_path.suffix}")
+        
+        cmd = [
+            os.getenv("MANIM_PYTHON", sys.executable),
+            str(SCENE_LIBRARY_DIR / "pipe_render.py"),
+            temp_file, scene_name,
+            "--output", str(partial_path),
+            "--quality", quality,
+            "--media-dir", str(Path(temp_dir) / "media")
+        ]
+        if audio_path:
+            cmd += ["--audio", str(audio_path)]
+        if audio_duration:
+            cmd += ["--audio-duration", f"{audio_duration:.3f}"]
+        
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(SCENE_LIBRARY_DIR), env.get("PYTHONPATH")])
+        )
+        
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, check=True, env=env)
+            os.replace(partial_path, output_path)
+            return {
+                "success": True,
+                "video_path": str(output_path),
+                "video_name": output_path.name,
+                "quality": quality,
+                "format": format,
+                "file_size": output_path.stat().st_size,
+                "audio_muxed": bool(audio_path),
+                "metadata": self._get_video_info(output_path)
+            }
+        except subprocess.CalledProcessError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "stdout": e.stdout,
+                "stderr": e.stderr,
+                "script_name": Path(temp_file).name
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            partial_path.unlink(missing_ok=True)
+    
+    def render_primitive(self, name: str, params: Dict, quality: str = "low") -> Dict:
+        """
+        Render one scene library primitive, reusing the cached clip if the
+        same primitive was already rendered with the same parameters
+        
+        Args:
+            name: Primitive name (see animation_manim/clips.py)
+            params: Primitive parameters
+            quality: Quality level (low, medium, high)
+            
+        Returns:
+            Dictionary with video path, cache_hit flag and duration
+        """
+        rendered = []
+        
+        def render(name: str, params: Dict) -> str:
+            result = self.render_animation(clip_script(name, params), scene_name="PrimitiveScene",
+                                           quality=quality, format="mp4")
+            if not result["success"]:
+                raise RuntimeError(result.get("stderr") or result.get("error"))
+            rendered.append(result["video_path"])
+            return result["video_path"]
+        
+        try:
+            params = resolve_params(name, params)
+            clip_path, cache_hit = self.clip_cache.get_or_render(name, params, render, quality)
+            for video_path in rendered:
+                self.discard_render(video_path)
+            return {
+                "success": True,
+                "video_path": str(clip_path),
+                "cache_hit": cache_hit,
+                "duration": self._get_video_info(clip_path).get("duration", 0)
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def render_composition(self, plan: List[Dict], output_path: str,
+                           quality: str = "low") -> Dict:
+        """
+        Render an animation plan of primitives and join the clips
+        
+        Each clip is held on its last frame (or cut) to its segment's
+        duration, and all clips are joined in a single ffmpeg encode.
+        
+        Args:
+            plan: Items with "primitive", "params" and "duration" in seconds
+            output_path: Path for the joined video
+            quality: Quality level (low, medium, high)
+            
+        Returns:
+            Dictionary with video path, metadata and cache hit counts
+        """
+        clips = []
+        for item in plan:
+            clip = self.render_primitive(item["primitive"], item.get("params", {}), quality)
+            if not clip["success"]:
+                return {
+                    "success": False,
+                    "error": f"Primitive {item['primitive']} failed: {clip['error']}"
+                }
+            clips.append(clip)
+        if not clips:
+            return {"success": False, "error": "Animation plan is empty"}
+        
+        inputs, filters = [], []
+        for index, (item, clip) in enumerate(zip(plan, clips)):
+            inputs += ["-i", clip["video_path"]]
+            hold = max(0.0, item["duration"] - clip["duration"])
+            filters.append(
+                f"[{index}:v]tpad=stop_mode=clone:stop_duration={hold:.3f},"
+                f"trim=duration={item['duration']:.3f},setpts=PTS-STARTPTS[v{index}]"
+            )
+        filters.append("".join(f"[v{index}]" for index in range(len(clips)))
+                       + f"concat=n={len(clips)}:v=1:a=0[out]")
+        
+        output_path = Path(output_path)
+        cmd = [
+            "ffmpeg", "-y", *inputs,
+            "-filter_complex", ";".join(filters),
+            "-map", "[out]",
+            "-c:v", "libx264",
+            "-pix_fmt", "yuv420p",
+            str(output_path)
+        ]
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "stderr": e.stderr
+            }
+        
+        cache_hits = sum(clip["cache_hit"] for clip in clips)
+        return {
+            "success": True,
+            "video_path": str(output_path),
+            "video_name": output_path.name,
+            "quality": quality,
+            "format": "mp4",
+            "file_size": output_path.stat().st_size,
+            "cache_hits": cache_hits,
+            "cache_misses": len(clips) - cache_hits,
+            "metadata": self._get_video_info(output_path)
+        }
     
     def add_audio_to_video(self, video_path: str, audio_path: str, 
-                          output_path: str = None, speed_adjustment: float = 1.0) -> Dict:
+                          output_path: str = None, speed_adjustment: float = 1.0,
+                          audio_duration: Optional[float] = None) -> Dict:
         """
         Add audio narration to the video
         
         Args:
-            video_path: Path to the video file
+            video_path: Path to the video file (any audio track in it is replaced)
             audio_path: Path to the audio file
             output_path: Path for output video (optional)
             speed_adjustment: Video speed adjustment factor
+            audio_duration: Measured narration length in seconds. When given,
+                            a shorter video is extended by holding its last
+                            frame instead of cutting the audio with -shortest
             
         Returns:
             Dictionary with combined video path and metadata
@@ -137,31 +390,45 @@ class AnimationAgent:
             output_path = Path(output_path)
         
         try:
+            # Pad the video to the narration length when the audio runs longer
+            pad_duration = 0.0
+            if audio_duration:
+                video_duration = self._get_video_info(video_path).get("duration", 0) / speed_adjustment
+                pad_duration = max(0.0, audio_duration - video_duration)
+            
             # Build ffmpeg command
-            if speed_adjustment != 1.0:
-                # Adjust video speed
-                speed_filter = f"setpts={1/speed_adjustment}*PTS"
+            if speed_adjustment != 1.0 or pad_duration > 0:
+                video_filters = []
+                if speed_adjustment != 1.0:
+                    # Adjust video speed
+                    video_filters.append(f"setpts={1/speed_adjustment}*PTS")
+                if pad_duration > 0:
+                    video_filters.append(f"tpad=stop_mode=clone:stop_duration={pad_duration:.3f}")
                 cmd = [
                     "ffmpeg", "-y",
                     "-i", str(video_path),
                     "-i", str(audio_path),
-                    "-filter:v", speed_filter,
+                    "-map", "0:v:0", "-map", "1:a:0",
+                    "-filter:v", ",".join(video_filters),
                     "-c:v", "libx264",
                     "-c:a", "aac",
-                    "-shortest",
                     str(output_path)
                 ]
+                if not audio_duration:
+                    cmd.insert(-1, "-shortest")
             else:
                 # No speed adjustment
                 cmd = [
                     "ffmpeg", "-y",
                     "-i", str(video_path),
                     "-i", str(audio_path),
+                    "-map", "0:v:0", "-map", "1:a:0",
                     "-c:v", "copy",
                     "-c:a", "aac",
-                    "-shortest",
                     str(output_path)
                 ]
+                if not audio_duration:
+                    cmd.insert(-1, "-shortest")
             
             result = subprocess.run(
                 cmd,
@@ -177,6 +444,7 @@ class AnimationAgent:
                 "video_path": str(output_path),
                 "file_size": output_path.stat().st_size,
                 "speed_adjustment": speed_adjustment,
+                "padded_seconds": round(pad_duration, 3),
                 "metadata": video_info
             }
             
@@ -192,6 +460,78 @@ class AnimationAgent:
                 "error": str(e)
             }
     
+    def generate_previews(self, video_path: str, output_dir: str,
+                          poster_time: Optional[float] = None, poster_width: int = 640,
+                          preview_frames: int = 16, preview_fps: int = 4,
+                          preview_width: int = 320) -> Dict:
+        """
+        Extract a poster frame and a short preview GIF in one ffmpeg pass
+        
+        The video is decoded once and split: one branch writes a single
+        JPEG, the other samples frames evenly across the whole video and
+        plays them back at a low frame rate with a generated palette.
+        
+        Args:
+            video_path: Rendered video
+            output_dir: Directory for poster.jpg and preview.gif
+            poster_time: Poster timestamp in seconds (middle of the video if omitted)
+            poster_width: Poster width in pixels
+            preview_frames: Number of frames in the preview
+            preview_fps: Preview playback frame rate
+            preview_width: Preview width in pixels
+        
+        Returns:
+            Dictionary with poster and preview paths and sizes
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        poster_path = output_dir / "poster.jpg"
+        preview_path = output_dir / "preview.gif"
+        
+        # Without a known duration, sample one frame per second from the start
+        duration = self._get_video_info(Path(video_path)).get("duration")
+        sample_rate = f"{preview_frames}/{duration:.3f}" if duration else "1"
+        if poster_time is None:
+            poster_time = duration / 2 if duration else 0.0
+        if duration:
+            poster_time = min(poster_time, max(0.0, duration - 0.1))
+        poster_time = max(0.0, poster_time)
+        
+        filters = ";".join([
+            "[0:v]split=2[p][g]",
+            f"[p]trim=start={poster_time:.3f},setpts=PTS-STARTPTS,"
+            f"scale={poster_width}:-2[poster]",
+            f"[g]fps={sample_rate},setpts=N/({preview_fps}*TB),"
+            f"scale={preview_width}:-2:flags=lanczos,split[a][b]",
+            "[a]palettegen=max_colors=64:stats_mode=diff[palette]",
+            "[b][palette]paletteuse=dither=bayer:bayer_scale=3[preview]",
+        ])
+        cmd = [
+            "ffmpeg", "-y",
+            "-i", str(video_path),
+            "-filter_complex", filters,
+            "-map", "[poster]", "-frames:v", "1", "-q:v", "4", str(poster_path),
+            "-map", "[preview]", "-frames:v", str(preview_frames), "-r", str(preview_fps),
+            "-loop", "0", str(preview_path)
+        ]
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "stderr": e.stderr
+            }
+        
+        return {
+            "success": True,
+            "poster_path": str(poster_path),
+            "poster_size": poster_path.stat().st_size,
+            "poster_time": round(poster_time, 3),
+            "preview_path": str(preview_path),
+            "preview_size": preview_path.stat().st_size
+        }
+    
     def _get_video_info(self, video_path: Path) -> Dict:
         """Get video information using ffprobe"""
         try:
@@ -0,0 +1,86 @@
+"""
+Audio Segment Stream
+Buffers narration audio segment by segment as TTS returns it, so HTTP
+clients can start playback before the full narration has been synthesized.
+"""
+
+import asyncio
+import threading
+from typing import AsyncIterator, List, Optional, Tuple
+
+
+class AudioSegmentStream:
+    """
+    Append-only buffer of encoded audio segments, written from worker threads
+    and read by any number of async consumers.
+
+    MP3 frames are self-delimiting, so the concatenation of per-segment MP3s
+    is itself a playable MP3 stream.
+    """
+
+    def __init__(self, media_type: str = "audio/mpeg"):
+        """
+        Args:
+            media_type: Content type of the concatenated segments
+        """
+        self.media_type = media_type
+        self._chunks: List[bytes] = []
+        self._done = False
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def done(self) -> bool:
+        """True once no more segments will be appended"""
+        return self._done
+
+    def append(self, audio: bytes):
+        """Add the next segment's audio, in playback order"""
+        with self._lock:
+            if self._done:
+                return
+            self._chunks.append(audio)
+            waiters, self._waiters = self._waiters, []
+        self._notify(waiters)
+
+    def close(self, error: Optional[str] = None):
+        """Mark the stream finished; safe to call more than once"""
+        with self._lock:
+            if self._done:
+                return
+            self._done = True
+            self.error = error
+            waiters, self._waiters = self._waiters, []
+        self._notify(waiters)
+
+    @staticmethod
+    def _notify(waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]):
+        for loop, event in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(event.set)
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """
+        Yield every segment from the beginning, waiting for new ones until
+        the stream is closed
+        """
+        loop = asyncio.get_running_loop()
+        position = 0
+        while True:
+            event = asyncio.Event()
+            with self._lock:
+                chunks = self._chunks[position:]
+                done = self._done
+                if not chunks and not done:
+                    self._waiters.append((loop, event))
+
+            for chunk in chunks:
+                yield chunk
+            position += len(chunks)
+
+            if chunks:
+                continue
+            if done:
+                return
+            await event.wait()
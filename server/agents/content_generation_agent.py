@@ -4,94 +4,167 @@ Generates mindmaps, summaries, and learning content based on user queries
 """
 
 import os
-from typing import Dict, List, Optional
-from google.cloud import aiplatform
-from vertexai.preview import reasoning_engines
-import vertexai
-from vertexai.generative_models import GenerativeModel, Part, Content
+from typing import Callable, Dict, Iterator, List, Optional
 import json
 
+from agents.json_stream import IncrementalJSONArrayParser, iter_json_array
+from agents.manim_repair import apply_patch, code_window
+from agents.prompt_templates import (
+    SYSTEM_INSTRUCTION,
+    TokenUsageTracker,
+    compact_timeline,
+    estimate_tokens,
+    get_template,
+)
+from agents.vertex_client import get_generative_model
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / "animation_manim"))
+from clips import catalogue, resolve_params
+from mindmap.mermaid_mindmap import normalize_mindmap, render_mindmap, sanitize_tree
+
+# "derived": concept tree from the narrative call; "separate": its own call
+DEFAULT_MINDMAP_MODE = "derived"
+
+
+def default_mindmap_mode() -> str:
+    """MINDMAP_MODE, or DEFAULT_MINDMAP_MODE when unset"""
+    return os.getenv("MINDMAP_MODE", DEFAULT_MINDMAP_MODE)
+
 
 class ContentGenerationAgent:
     """Agent that generates educational content including mindmaps and narratives"""
     
-    def __init__(self, project_id: str = None, location: str = "us-central1"):
+    def __init__(self, project_id: str = None, location: str = "us-central1",
+                 model_name: str = "gemini-1.5-pro"):
         """
         Initialize the Content Generation Agent
         
         Args:
             project_id: Google Cloud project ID
             location: Google Cloud region
+            model_name: Gemini model used for all content calls
         """
         self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
         self.location = location
+        self.model_name = model_name
+        self._model = None
         
-        # Initialize Vertex AI
-        vertexai.init(project=self.project_id, location=self.location)
+        # Process-wide token totals; per-session usage is tracked separately
+        self.total_usage = TokenUsageTracker()
+    
+    @property
+    def model(self):
+        """
+        Shared Gemini model for content generation, created on first use.
+        Shared instructions live in the system instruction so prompt bodies
+        stay compact.
+        """
+        if self._model is None:
+            self._model = get_generative_model(
+                self.model_name,
+                project_id=self.project_id,
+                location=self.location,
+                system_instruction=SYSTEM_INSTRUCTION
+            )
+        return self._model
+    
+    def _record_usage(self, template_name: str, response,
+                      usage: Optional[TokenUsageTracker]):
+        """Record token counts reported by the model for one call"""
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is None:
+            return
+        prompt_tokens = metadata.prompt_token_count or 0
+        output_tokens = metadata.candidates_token_count or 0
+        self.total_usage.record(template_name, prompt_tokens, output_tokens)
+        if usage is not None:
+            usage.record(template_name, prompt_tokens, output_tokens)
+    
+    def _generate(self, template_name: str, usage: Optional[TokenUsageTracker] = None,
+                  output_units: float = 0, **fields) -> str:
+        """
+        Render a registered prompt and run it within its token budget
+        
+        Args:
+            template_name: Key in the prompt template registry
+            usage: Optional per-session usage tracker
+            output_units: Size of the request for templates whose output
+                          budget scales (see PromptTemplate.output_budget)
+            **fields: Template fields
+        
+        Returns:
+            Stripped response text
+        """
+        template = get_template(template_name)
+        prompt = template.render(**fields)
+        response = self.model.generate_content(
+            prompt,
+            generation_config={"max_output_tokens": template.output_budget(output_units)}
+        )
+        self._record_usage(template_name, response, usage)
+        return response.text.strip()
+    
+    def _generate_stream(self, template_name: str, usage: Optional[TokenUsageTracker] = None,
+                         output_units: float = 0, **fields) -> Iterator[str]:
+        """Streaming variant of _generate yielding response text chunks"""
+        template = get_template(template_name)
+        prompt = template.render(**fields)
+        response_stream = self.model.generate_content(
+            prompt,
+            generation_config={"max_output_tokens": template.output_budget(output_units)},
+            stream=True
+        )
         
-        # Initialize Gemini model for content generation
-        self.model = GenerativeModel("gemini-1.5-pro")
+        last_chunk = None
+        for chunk in response_stream:
+            last_chunk = chunk
+            if chunk.candidates:
+                yield chunk.text
         
-    def generate_mindmap(self, topic: str, user_query: str = "") -> Dict:
+        # Usage metadata is reported on the final chunk
+        if last_chunk is not None:
+            self._record_usage(template_name, last_chunk, usage)
+    
+    def generate_mindmap(self, topic: str, user_query: str = "",
+                         usage: Optional[TokenUsageTracker] = None) -> Dict:
         """
         Generate a Mermaid.js mindmap based on the topic and user query
         
         Args:
             topic: Main topic for the mindmap
             user_query: Optional user query for customization
-            
+            usage: Optional per-session token usage tracker
+        
         Returns:
             Dictionary containing mindmap code and metadata
         """
-        prompt = f"""You are an expert educational content creator. Generate a comprehensive mindmap 
-using Mermaid.js syntax for the topic: "{topic}".
-
-User query: {user_query if user_query else "Create a comprehensive overview"}
-
-Requirements:
-1. Use mindmap syntax starting with "mindmap"
-2. Create a root node with the main topic
-3. Add 5-7 main branches covering key concepts
-4. Each branch should have 2-4 sub-nodes with details
-5. Use clear, concise labels (no emojis)
-6. Focus on educational value and logical hierarchy
-7. Include practical applications where relevant
-
-Return ONLY the valid Mermaid.js mindmap code without any markdown code blocks or additional text.
-Start directly with "mindmap" keyword.
-
-Example format:
-mindmap
-  root((Main Topic))
-    Branch 1
-      Sub-concept 1
-      Sub-concept 2
-    Branch 2
-      Detail A
-      Detail B
-"""
-        
-        response = self.model.generate_content(prompt)
-        mindmap_code = response.text.strip()
+        mindmap_code = self._generate(
+            "mindmap", usage,
+            topic=topic,
+            user_query=user_query if user_query else "Create a comprehensive overview"
+        )
         
-        # Clean up the response
-        if "```" in mindmap_code:
-            # Extract code from markdown blocks
-            mindmap_code = mindmap_code.split("```")[1]
-            if mindmap_code.startswith("mermaid"):
-                mindmap_code = mindmap_code[7:].strip()
+        # Repair fences, indentation and node shapes locally instead of
+        # letting the browser reject the diagram
+        normalized = normalize_mindmap(mindmap_code, fallback_label=topic)
+        if normalized["repaired"]:
+            print(f"🔧 Repaired mindmap: {', '.join(normalized['issues'][:3])}")
         
         return {
-            "mindmap_code": mindmap_code,
+            "mindmap_code": normalized["mindmap_code"],
             "topic": topic,
             "metadata": {
                 "generated_by": "content_generation_agent",
-                "model": "gemini-1.5-pro"
+                "model": self.model_name,
+                "repaired": normalized["repaired"]
             }
         }
     
-    def generate_narrative_summary(self, topic: str, style: str = "intuitive", 
-                                   target_duration: int = 120) -> Dict:
+    def generate_narrative_summary(self, topic: str, style: str = "intuitive",
+                                   target_duration: int = 120,
+                                   on_segment: Optional[Callable[[Dict], None]] = None,
+                                   usage: Optional[TokenUsageTracker] = None) -> Dict:
         """
         Generate a narrative summary for TTS conversion
         
@@ -99,71 +172,252 @@ mindmap
             topic: Topic to explain
             style: Narrative style (intuitive, formal, conversational, technical)
             target_duration: Target duration in seconds (approximate)
-            
+            on_segment: Optional callback invoked with each segment as soon as
+                        it has been streamed, so TTS can start before the
+                        model finishes writing
+            usage: Optional per-session token usage tracker
+        
         Returns:
             Dictionary containing narrative segments with timestamps
+        
+        Raises:
+            ValueError: If the response is truncated or has no segments
         """
-        words_per_second = 2.5  # Average speaking rate
-        target_words = int(target_duration * words_per_second)
+        segments = []
+        for segment in self.stream_narrative_segments(topic, style, target_duration, usage=usage):
+            segments.append(segment)
+            if on_segment:
+                on_segment(segment)
+        if not segments:
+            raise ValueError("Model returned no narrative segments")
         
-        prompt = f"""You are an expert educator creating audio narration content.
-Create a {style} explanation of: "{topic}"
-
-Requirements:
-1. Target approximately {target_words} words ({target_duration} seconds of speech)
-2. Style: {style}
-3. Break the content into 8-12 logical segments
-4. Each segment should be 1-3 sentences
-5. Use clear, engaging language
-6. Include real-world examples and analogies
-7. Build from basics to advanced concepts
-8. Make it memorable and intuitive
-
-Format your response as a JSON array of segments:
-[
-  {{
-    "segment_id": 1,
-    "title": "Introduction",
-    "content": "Opening statement...",
-    "estimated_duration": 10
-  }},
-  ...
-]
-
-Return ONLY valid JSON without any markdown formatting or additional text.
-"""
+        total_duration = segments[-1]["end_time"]
         
-        response = self.model.generate_content(prompt)
-        content = response.text.strip()
+        return {
+            "segments": segments,
+            "total_duration": total_duration,
+            "style": style,
+            "topic": topic,
+            "metadata": {
+                "generated_by": "content_generation_agent",
+                "model": self.model_name,
+                "streamed": True
+            }
+        }
+    
+    def stream_narrative_segments(self, topic: str, style: str = "intuitive",
+                                  target_duration: int = 120,
+                                  usage: Optional[TokenUsageTracker] = None) -> Iterator[Dict]:
+        """
+        Stream narrative segments from Gemini as each JSON object closes
         
-        # Clean up JSON response
-        if "```" in content:
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:].strip()
+        Args:
+            topic: Topic to explain
+            style: Narrative style (intuitive, formal, conversational, technical)
+            target_duration: Target duration in seconds (approximate)
+            usage: Optional per-session token usage tracker
         
-        segments = json.loads(content)
+        Yields:
+            Narrative segments with cumulative start_time/end_time
         
-        # Add cumulative timestamps
+        Raises:
+            ValueError: If the response ends before the segment array closes
+        """
+        words_per_second = 2.5  # Average speaking rate
+        target_words = int(target_duration * words_per_second)
+        
+        chunks = self._generate_stream(
+            "narrative", usage,
+            topic=topic,
+            style=style,
+            target_words=target_words,
+            target_duration=target_duration
+        )
+        
+        yield from self._timestamp_segments(iter_json_array(chunks))
+    
+    def _timestamp_segments(self, segments: Iterator[Dict]) -> Iterator[Dict]:
+        """Add cumulative timestamps to segments as they arrive"""
         cumulative_time = 0
         for segment in segments:
             segment["start_time"] = cumulative_time
             segment["end_time"] = cumulative_time + segment["estimated_duration"]
             cumulative_time = segment["end_time"]
+            yield segment
+    
+    def generate_lesson_plan(self, topic: str, user_query: str = "",
+                             style: str = "intuitive", target_duration: int = 120,
+                             on_segment: Optional[Callable[[Dict], None]] = None,
+                             usage: Optional[TokenUsageTracker] = None) -> Dict:
+        """
+        Generate the narrative and the mindmap with a single LLM call
+        
+        The model returns narrative segments followed by a concept tree; the
+        segments are streamed to on_segment as they close and the tree is
+        rendered to Mermaid locally.
+        
+        Args:
+            topic: Topic to explain
+            user_query: Optional user query for customization
+            style: Narrative style (intuitive, formal, conversational, technical)
+            target_duration: Target duration in seconds (approximate)
+            on_segment: Optional callback for each streamed narrative segment
+            usage: Optional per-session token usage tracker
+            
+        Returns:
+            Dictionary with "narrative" and "mindmap" in the same shape as
+            generate_narrative_summary and generate_mindmap
+        
+        Raises:
+            ValueError: If the response is truncated or has no segments
+        """
+        words_per_second = 2.5  # Average speaking rate
+        target_words = int(target_duration * words_per_second)
+        
+        chunks = self._generate_stream(
+            "lesson_plan", usage,
+            topic=topic,
+            user_query=user_query if user_query else "Create a comprehensive overview",
+            style=style,
+            target_words=target_words,
+            target_duration=target_duration
+        )
+        
+        # Keep the full text for the concept tree while streaming segments out
+        parser = IncrementalJSONArrayParser(key="segments")
+        response_parts = []
+        
+        def stream_segments():
+            for chunk in chunks:
+                response_parts.append(chunk)
+                yield from parser.feed(chunk)
+        
+        segments = []
+        for segment in self._timestamp_segments(stream_segments()):
+            segments.append(segment)
+            if on_segment:
+                on_segment(segment)
+        parser.close()
+        if not segments:
+            raise ValueError("Model returned no narrative segments")
+        
+        response_text = "".join(response_parts).strip()
+        if "```" in response_text:
+            response_text = response_text.split("```")[1]
+            if response_text.startswith("json"):
+                response_text = response_text[4:].strip()
+        
+        try:
+            concept_tree = sanitize_tree(json.loads(response_text).get("concept_tree"))
+        except (ValueError, AttributeError):
+            concept_tree = None
+        if not (concept_tree and concept_tree["children"]):
+            # Missing or malformed: fall back to the narrative outline
+            concept_tree = {
+                "label": topic,
+                "children": [{"label": segment["title"]} for segment in segments]
+            }
+        
+        total_duration = segments[-1]["end_time"]
         
         return {
-            "segments": segments,
-            "total_duration": cumulative_time,
-            "style": style,
+            "narrative": {
+                "segments": segments,
+                "total_duration": total_duration,
+                "style": style,
+                "topic": topic,
+                "metadata": {
+                    "generated_by": "content_generation_agent",
+                    "model": self.model_name,
+                    "streamed": True
+                }
+            },
+            "mindmap": {
+                "mindmap_code": render_mindmap(concept_tree),
+                "concept_tree": concept_tree,
+                "topic": topic,
+                "metadata": {
+                    "generated_by": "content_generation_agent",
+                    "model": self.model_name,
+                    "derived_from_narrative": True
+                }
+            }
+        }
+    
+    def generate_animation_plan(self, topic: str, narrative_segments: List[Dict],
+                                duration: float,
+                                usage: Optional[TokenUsageTracker] = None) -> Dict:
+        """
+        Compose the animation from the pre-built scene library instead of code
+        
+        Every segment gets one parameterized primitive. Invalid or missing
+        choices fall back to a title card, so the plan always renders.
+        
+        Args:
+            topic: Topic to animate
+            narrative_segments: List of narrative segments with timing
+            duration: Total duration in seconds
+            usage: Optional per-session token usage tracker
+        
+        Returns:
+            Dictionary containing the plan: primitive, params and duration
+            per segment
+        """
+        response_text = self._generate(
+            "animation_plan", usage,
+            topic=topic,
+            timeline=compact_timeline(narrative_segments),
+            catalogue=catalogue()
+        )
+        # Items that are not objects with a usable segment_id are ignored;
+        # their segments get a title card
+        choices = {}
+        try:
+            for item in iter_json_array([response_text]):
+                if isinstance(item, dict) and isinstance(item.get("segment_id"), (int, str)):
+                    choices[item["segment_id"]] = item
+        except ValueError:
+            pass
+        
+        plan = []
+        for index, segment in enumerate(narrative_segments):
+            choice = choices.get(segment["segment_id"], {})
+            try:
+                primitive = choice.get("primitive", "title_card")
+                params = resolve_params(primitive, choice.get("params"))
+            except ValueError as e:
+                print(f"⚠️  Segment {segment['segment_id']}: {e}; using a title card")
+                choice = {}
+                primitive, params = "title_card", resolve_params("title_card", {})
+            if not choice:
+                params["text"] = segment.get("title", topic)
+            
+            # Clips run until the next segment starts, covering any gap
+            end_time = (narrative_segments[index + 1]["start_time"]
+                        if index + 1 < len(narrative_segments) else duration)
+            plan.append({
+                "segment_id": segment["segment_id"],
+                "primitive": primitive,
+                "params": params,
+                "duration": round(max(end_time, segment["end_time"]) - segment["start_time"], 3)
+            })
+        
+        return {
+            "animation_plan": plan,
+            "animation_code": None,
+            "duration": duration,
             "topic": topic,
             "metadata": {
                 "generated_by": "content_generation_agent",
-                "model": "gemini-1.5-pro"
+                "model": self.model_name,
+                "mode": "primitives"
             }
         }
     
     def generate_animation_script(self, topic: str, narrative_segments: List[Dict],
-                                  duration: int) -> Dict:
+                                  duration: int,
+                                  usage: Optional[TokenUsageTracker] = None,
+                                  mode: str = "code") -> Dict:
         """
         Generate Manim animation code synchronized with narrative
         
@@ -171,49 +425,23 @@ Return ONLY valid JSON without any markdown formatting or additional text.
             topic: Topic to animate
             narrative_segments: List of narrative segments with timing
             duration: Total duration in seconds
-            
+            usage: Optional per-session token usage tracker
+            mode: "code" for a free-form scene, "primitives" to compose
+                  cached scene library clips (see generate_animation_plan)
+        
         Returns:
-            Dictionary containing Manim Python code
+            Dictionary containing Manim Python code (or the primitive plan)
         """
-        segments_text = "\n".join([
-            f"Segment {s['segment_id']} ({s['start_time']}-{s['end_time']}s): {s['title']}"
-            for s in narrative_segments
-        ])
+        if mode == "primitives":
+            return self.generate_animation_plan(topic, narrative_segments, duration, usage)
         
-        prompt = f"""You are an expert Manim animator. Create a Manim scene for the topic: "{topic}"
-
-The animation should be {duration} seconds long and synchronized with these narrative segments:
-{segments_text}
-
-Requirements:
-1. Create a complete Manim Scene class named "GeneratedScene"
-2. Use manim Community Edition syntax
-3. Include visual representations matching the narrative flow
-4. Add mathematical formulas, graphs, or diagrams as appropriate
-5. Use wait() commands to sync with narrative timing
-6. Make it visually engaging with colors and animations
-7. Resolution: 854x480 (480p)
-8. Frame rate: 15 fps
-
-Important timing notes:
-- Total scene duration must be {duration} seconds
-- Use self.wait(duration) to control timing
-- Align major visual transitions with segment boundaries
-
-Return ONLY the complete Python code without markdown blocks or explanations.
-Start with necessary imports and the class definition.
-
-Example structure:
-from manim import *
-
-class GeneratedScene(Scene):
-    def construct(self):
-        # Your animation code here
-        pass
-"""
-        
-        response = self.model.generate_content(prompt)
-        code = response.text.strip()
+        code = self._generate(
+            "animation", usage,
+            output_units=duration,
+            topic=topic,
+            duration=duration,
+            timeline=compact_timeline(narrative_segments)
+        )
         
         # Clean up code response
         if "```" in code:
@@ -227,14 +455,101 @@ class GeneratedScene(Scene):
             "topic": topic,
             "metadata": {
                 "generated_by": "content_generation_agent",
-                "model": "gemini-1.5-pro",
+                "model": self.model_name,
                 "scene_class": "GeneratedScene"
             }
         }
     
-    def generate_complete_content(self, user_query: str, 
+    def repair_animation_script(self, animation_code: str, failure: Dict,
+                                usage: Optional[TokenUsageTracker] = None) -> str:
+        """
+        Ask for a minimal patch to a scene that failed to render and apply it
+        
+        Only the traceback and the code around the failing line are sent, and
+        the model answers with find/replace edits instead of a new script.
+        
+        Args:
+            animation_code: Manim code that failed
+            failure: Result of manim_repair.extract_traceback
+            usage: Optional per-session token usage tracker
+        
+        Returns:
+            Patched Manim code
+        
+        Raises:
+            ValueError: If the response is not a patch that applies cleanly
+        """
+        response_text = self._generate(
+            "animation_repair", usage,
+            error_type=failure["error_type"],
+            message=failure["message"][:300],
+            traceback=failure["traceback"],
+            code=code_window(animation_code, failure["line"])
+        )
+        return apply_patch(animation_code, iter_json_array([response_text]))
+    
+    def translate_segments(self, segments: List[Dict], language: str,
+                           usage: Optional[TokenUsageTracker] = None) -> List[Dict]:
+        """
+        Translate narrative segments for a narration in another language
+        
+        Args:
+            segments: Narrative segments with "content" (and optional "title")
+            language: Target language name or BCP-47 code, e.g. "German" or "de-DE"
+            usage: Optional per-session token usage tracker
+        
+        Returns:
+            Copies of the segments with translated content; timings are kept
+            and should be re-measured from the new audio
+        
+        Raises:
+            ValueError: If the model does not return one string per segment
+        """
+        # Long narrations are split into batches that each fit the prompt budget
+        template = get_template("translate")
+        budget = template.max_input_tokens - template.fixed_tokens("texts", language=language)
+        batches, batch, batch_tokens = [], [], 0
+        for segment in segments:
+            tokens = estimate_tokens(json.dumps(segment["content"], ensure_ascii=False)) + 1
+            if batch and batch_tokens + tokens > budget:
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(segment["content"])
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        
+        translations = []
+        for batch in batches:
+            texts = json.dumps(batch, ensure_ascii=False)
+            response_text = self._generate(
+                "translate", usage,
+                output_units=estimate_tokens(texts),
+                language=language,
+                texts=texts
+            )
+            if "```" in response_text:
+                response_text = response_text.split("```")[1]
+                if response_text.startswith("json"):
+                    response_text = response_text[4:]
+            
+            translated = json.loads(response_text)
+            if not isinstance(translated, list) or len(translated) != len(batch):
+                raise ValueError(f"Expected {len(batch)} translated segments")
+            translations.extend(translated)
+        
+        return [
+            {**segment, "content": str(text).strip(), "language": language}
+            for segment, text in zip(segments, translations)
+        ]
+    
+    def generate_complete_content(self, user_query: str,
                                   narrative_style: str = "intuitive",
-                                  target_duration: int = 120) -> Dict:
+                                  target_duration: int = 120,
+                                  on_segment: Optional[Callable[[Dict], None]] = None,
+                                  mindmap_mode: Optional[str] = None,
+                                  on_narrative: Optional[Callable[[Dict], None]] = None,
+                                  animation_mode: str = "code") -> Dict:
         """
         Generate all content (mindmap, narrative, animation) in one call
         
@@ -242,20 +557,38 @@ class GeneratedScene(Scene):
             user_query: User's learning query
             narrative_style: Style for the narrative
             target_duration: Target duration in seconds
-            
+            on_segment: Optional callback for each streamed narrative segment
+            mindmap_mode: "separate" for a dedicated mindmap call, "derived" to
+                          get the concept tree with the narrative in one call;
+                          defaults to default_mindmap_mode()
+            on_narrative: Optional callback run on the finished narrative before
+                          the animation script is written, e.g. to replace the
+                          estimated timings with measured audio durations
+            animation_mode: "code" or "primitives" (see generate_animation_script)
+        
         Returns:
-            Complete content package
+            Complete content package, including per-session token usage
         """
+        usage = TokenUsageTracker()
+        mindmap_mode = mindmap_mode or default_mindmap_mode()
+        
         # Extract topic from query
-        topic_prompt = f"Extract the main educational topic from this query in 2-4 words: '{user_query}'"
-        topic_response = self.model.generate_content(topic_prompt)
-        topic = topic_response.text.strip().strip('"\'')
+        topic = self._generate("topic", usage, user_query=user_query).strip('"\'')
         
         # Generate all content
-        mindmap = self.generate_mindmap(topic, user_query)
-        narrative = self.generate_narrative_summary(topic, narrative_style, target_duration)
-        animation = self.generate_animation_script(topic, narrative["segments"], 
-                                                   narrative["total_duration"])
+        if mindmap_mode == "derived":
+            plan = self.generate_lesson_plan(topic, user_query, narrative_style, target_duration,
+                                             on_segment=on_segment, usage=usage)
+            mindmap, narrative = plan["mindmap"], plan["narrative"]
+        else:
+            mindmap = self.generate_mindmap(topic, user_query, usage=usage)
+            narrative = self.generate_narrative_summary(topic, narrative_style, target_duration,
+                                                        on_segment=on_segment, usage=usage)
+        if on_narrative:
+            on_narrative(narrative)
+        animation = self.generate_animation_script(topic, narrative["segments"],
+                                                   narrative["total_duration"], usage=usage,
+                                                   mode=animation_mode)
         
         return {
             "topic": topic,
@@ -263,6 +596,7 @@ class GeneratedScene(Scene):
             "mindmap": mindmap,
             "narrative": narrative,
             "animation": animation,
+            "token_usage": usage.summary(),
             "metadata": {
                 "generated_by": "content_generation_agent",
                 "timestamp": None  # Add timestamp in orchestrator
@@ -275,7 +609,7 @@ if __name__ == "__main__":
     agent = ContentGenerationAgent()
     
     # Test mindmap generation
-    result = agent.generate_mindmap("Derivatives in Calculus", 
+    result = agent.generate_mindmap("Derivatives in Calculus",
                                     "Explain derivatives intuitively")
     print("Mindmap generated:")
     print(result["mindmap_code"][:200] + "...")
@@ -284,3 +618,4 @@ if __name__ == "__main__":
     narrative = agent.generate_narrative_summary("Derivatives", "intuitive", 120)
     print(f"\nNarrative generated: {len(narrative['segments'])} segments")
     print(f"Total duration: {narrative['total_duration']}s")
+    print(f"Token usage: {agent.total_usage.summary()}")
@@ -0,0 +1,146 @@
+"""
+Incremental JSON parsing for streamed LLM responses
+Yields the objects of a top-level JSON array as soon as each one closes
+"""
+
+import json
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class IncrementalJSONArrayParser:
+    """
+    Feed text chunks of a JSON array and collect each complete element.
+
+    The parser only tracks string/escape state and brace depth, so it tolerates
+    leading prose or a markdown fence before the opening "[" and never re-scans
+    text it has already consumed.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        """
+        Args:
+            key: Parse the array stored under this key of an enclosing object
+                 (e.g. "segments") instead of the first array in the text
+        """
+        self._start_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key)) if key else None
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._element_start = None
+
+    @property
+    def finished(self) -> bool:
+        """True once the closing "]" of the top-level array has been seen"""
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """
+        Consume a chunk of text
+
+        Args:
+            chunk: Next piece of the streamed response
+
+        Returns:
+            List of elements completed by this chunk (possibly empty)
+        """
+        if self._finished or not chunk:
+            return []
+
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+        i = self._pos
+
+        if not self._started and self._start_pattern is not None:
+            match = self._start_pattern.search(buffer)
+            if not match:
+                # Keep the text; the key may be split across chunks
+                return []
+            self._started = True
+            i = match.end()
+
+        while i < len(buffer):
+            char = buffer[i]
+
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    self._element_start = i
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0 and char == "]":
+                    self._finished = True
+                    i += 1
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._element_start is not None:
+                    completed.append(json.loads(buffer[self._element_start:i + 1]))
+                    self._element_start = None
+            i += 1
+
+        # Drop consumed text so the buffer only holds the open element
+        if self._element_start is not None:
+            self._buffer = buffer[self._element_start:]
+            self._pos = i - self._element_start
+            self._element_start = 0
+        else:
+            self._buffer = ""
+            self._pos = 0
+
+        return completed
+
+    def close(self):
+        """
+        Check that the whole array was received once the stream has ended
+
+        Raises:
+            ValueError: If no array was found or it was never closed (e.g. a
+                        truncated or blocked response)
+        """
+        if not self._started:
+            raise ValueError("No JSON array in response")
+        if not self._finished:
+            raise ValueError("Response ended before the JSON array was closed")
+
+
+def iter_json_array(chunks: Iterable[str], key: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Yield the elements of a JSON array streamed as text chunks
+
+    Args:
+        chunks: Iterable of response text fragments
+        key: Optional key of the array inside an enclosing object
+
+    Yields:
+        Each array element as soon as it is complete
+
+    Raises:
+        ValueError: If the chunks end before the array is closed; elements
+                    already yielded are not taken back
+    """
+    parser = IncrementalJSONArrayParser(key)
+    for chunk in chunks:
+        for element in parser.feed(chunk):
+            yield element
+        if parser.finished:
+            break
+    parser.close()
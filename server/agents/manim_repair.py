@@ -0,0 +1,115 @@
+"""
+Manim render repair helpers
+Extract the failing frame from Manim's traceback and apply the small
+find/replace patches the model returns, so a broken scene can be fixed
+without regenerating the whole script.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Box-drawing and other decoration Rich adds around its tracebacks
+RICH_DECORATION = re.compile(r"[─-╿←-⇿❱]")
+
+# Frame locations in plain ("File "x.py", line 12") and Rich ("x.py:12 in f") tracebacks
+FRAME_PATTERNS = (
+    re.compile(r'File "(?P<path>[^"]+)", line (?P<line>\d+)'),
+    re.compile(r"(?P<path>\S+\.py):(?P<line>\d+) in \w+"),
+)
+
+# The final "SomeError: message" line
+ERROR_PATTERN = re.compile(r"^(?:[\w.]+\.)?(?P<type>\w*(?:Error|Exception|Exit|Interrupt))\b:?\s*(?P<message>.*)$")
+
+
+def extract_traceback(output: str, script_name: Optional[str] = None,
+                      max_lines: int = 30) -> Dict:
+    """
+    Reduce Manim's output to the part that explains a failed render
+
+    Args:
+        output: Captured stderr (and stdout) of the manim process
+        script_name: File name of the rendered script; frames in it are
+                     the ones the model can fix
+        max_lines: Traceback lines kept, counted from the end
+
+    Returns:
+        Dictionary with error_type, message, line (in the script, or None)
+        and the trimmed traceback text
+    """
+    lines = [RICH_DECORATION.sub("", line).strip() for line in (output or "").splitlines()]
+    lines = [line for line in lines if line]
+
+    start = max((i for i, line in enumerate(lines) if "Traceback (most recent call last)" in line),
+                default=0)
+    traceback_lines = lines[start:][-max_lines:]
+
+    line_number = None
+    for text in traceback_lines:
+        for pattern in FRAME_PATTERNS:
+            match = pattern.search(text)
+            if match and (script_name is None or match.group("path").endswith(script_name)):
+                # The innermost frame in the script is the one to fix
+                line_number = int(match.group("line"))
+
+    error_type, message = "Error", traceback_lines[-1] if traceback_lines else ""
+    for text in reversed(traceback_lines):
+        match = ERROR_PATTERN.match(text)
+        if match:
+            error_type, message = match.group("type"), match.group("message")
+            break
+
+    return {
+        "error_type": error_type,
+        "message": message,
+        "line": line_number,
+        "traceback": "\n".join(traceback_lines)
+    }
+
+
+def code_window(code: str, line: Optional[int], radius: int = 12) -> str:
+    """
+    Numbered excerpt of the script around a line (the whole script if unknown)
+
+    Args:
+        code: Scene source
+        line: 1-based line number of the failure
+        radius: Lines kept on each side
+
+    Returns:
+        Lines prefixed with their numbers, "12| code"
+    """
+    lines = code.splitlines()
+    start, end = 0, len(lines)
+    if line:
+        start, end = max(0, line - 1 - radius), min(len(lines), line + radius)
+    return "\n".join(f"{number}| {text}" for number, text in enumerate(lines[start:end], start + 1))
+
+
+def apply_patch(code: str, edits: Iterable[Dict]) -> str:
+    """
+    Apply find/replace edits to a script
+
+    Args:
+        code: Scene source
+        edits: Dictionaries with "find" (exact text occurring once in the
+               script) and "replace"
+
+    Returns:
+        Patched source
+
+    Raises:
+        ValueError: If there are no edits or a "find" text is missing or ambiguous
+    """
+    edits: List[Dict] = list(edits)
+    if not edits:
+        raise ValueError("Patch has no edits")
+
+    for edit in edits:
+        find, replace = edit.get("find"), edit.get("replace")
+        if not isinstance(find, str) or not isinstance(replace, str) or not find:
+            raise ValueError("Each edit needs string 'find' and 'replace' fields")
+        count = code.count(find)
+        if count != 1:
+            raise ValueError(f"Patch text found {count} times: {find[:60]!r}")
+        code = code.replace(find, replace)
+    return code
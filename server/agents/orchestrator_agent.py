@@ -4,47 +4,253 @@ Coordinates all agents to generate complete educational content
 """
 
 import os
+import re
+import copy
+import functools
+import hashlib
 import json
+import shutil
+import threading
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
-import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
-from agents.content_generation_agent import ContentGenerationAgent
+from agents.content_generation_agent import ContentGenerationAgent, default_mindmap_mode
 from agents.animation_agent import AnimationAgent
+from agents.audio_stream import AudioSegmentStream
+from agents.manim_repair import extract_traceback
+from agents.prompt_templates import TokenUsageTracker
 import sys
 sys.path.append(str(Path(__file__).parent.parent / "tts_agent"))
-from google_tts_agent import GoogleTTSAgent
+from tts_backend import create_tts_backend
+from audio_timing import audio_duration, retime_segments
+from ffmpeg_pipe import has_ffmpeg
+try:
+    from audio_postprocess import AudioPostProcessor
+except ImportError:  # NumPy not installed
+    AudioPostProcessor = None
+
+
+# Language prefix of Google TTS voice names, e.g. "de-DE" in "de-DE-Neural2-B"
+GOOGLE_VOICE_LANGUAGE = re.compile(r"^([a-z]{2,3}-[A-Z]{2})-")
 
 
 class OrchestratorAgent:
     """Master agent that orchestrates all content generation"""
     
-    def __init__(self, project_id: str = None, output_dir: str = None):
+    def __init__(self, project_id: str = None, output_dir: str = None,
+                 tts_workers: int = 4, mindmap_mode: str = None,
+                 tts_backend: str = None, audio_postprocess: Optional[bool] = None,
+                 render_repairs: Optional[int] = None, animation_mode: str = None,
+                 pipe_render: Optional[bool] = None):
         """
         Initialize the Orchestrator Agent
         
         Args:
             project_id: Google Cloud project ID
             output_dir: Base output directory
+            tts_workers: Concurrent TTS requests while the narrative streams
+            mindmap_mode: "derived" (mindmap from the narrative call) or
+                          "separate"; defaults to MINDMAP_MODE or "derived"
+            tts_backend: "google_async", "google", "macos", "espeak" or "fake";
+                         defaults to TTS_BACKEND or "google_async"
+            audio_postprocess: Even out loudness, trim silence and join
+                               segments with fixed gaps (needs NumPy and
+                               ffmpeg); defaults to AUDIO_POSTPROCESS or on
+            render_repairs: Patch-and-rerender attempts after a failed Manim
+                            render; defaults to MANIM_REPAIR_ATTEMPTS or 2
+            animation_mode: "code" (free-form Manim script) or "primitives"
+                            (cached scene library clips); defaults to
+                            ANIMATION_MODE or "code"
+            pipe_render: Stream generated scenes' frames straight into one
+                         ffmpeg encode that also muxes the narration;
+                         defaults to MANIM_PIPE_RENDER or off
         """
         self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+        self.tts_workers = tts_workers
+        self.mindmap_mode = mindmap_mode or default_mindmap_mode()
+        self.animation_mode = animation_mode or os.getenv("ANIMATION_MODE", "code")
+        self.pipe_render = (pipe_render if pipe_render is not None
+                            else os.getenv("MANIM_PIPE_RENDER", "0") == "1")
+        self.render_repairs = (render_repairs if render_repairs is not None
+                               else int(os.getenv("MANIM_REPAIR_ATTEMPTS", "2")))
         self.output_dir = Path(output_dir) if output_dir else Path.cwd() / "generated_content"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize all agents
         self.content_agent = ContentGenerationAgent(project_id=self.project_id)
-        self.tts_agent = GoogleTTSAgent()
+        self.tts_backend = tts_backend or os.getenv("TTS_BACKEND", "google_async")
+        self.tts_agent = create_tts_backend(self.tts_backend)
         self.animation_agent = AnimationAgent()
         
+        if audio_postprocess is None:
+            audio_postprocess = os.getenv("AUDIO_POSTPROCESS", "1") != "0"
+        self.audio_postprocessor = (
+            AudioPostProcessor()
+            if audio_postprocess and AudioPostProcessor is not None and has_ffmpeg()
+            else None
+        )
+        
         # Set default TTS configuration
-        self.tts_agent.set_voice(language_code="en-us", name="en-US-Neural2-J")
-        self.tts_agent.set_audio_config(speaking_rate=0.95)
+        if self.tts_backend.startswith("google"):
+            self.tts_agent.set_voice(language_code="en-us", name="en-US-Neural2-J")
+            self.tts_agent.set_audio_config(speaking_rate=0.95)
+        
+    def _synthesize_segment(self, segment: Dict, tts_agent=None) -> Dict:
+        """
+        Synthesize one narration segment with whatever timing the backend offers
+        
+        Args:
+            segment: Narrative segment with "segment_id" and "content"
+            tts_agent: Agent to use instead of the shared one (e.g. another voice)
+            
+        Returns:
+            Dictionary with audio_content, duration and per-word timings
+            (empty for backends without timepoints)
+        """
+        tts_agent = tts_agent or self.tts_agent
+        if hasattr(tts_agent, "synthesize_with_timepoints"):
+            return tts_agent.synthesize_with_timepoints([segment])
+        
+        audio = tts_agent.synthesize(segment["content"])
+        return {"audio_content": audio, "duration": audio_duration(audio), "words": []}
+    
+    def _submit_segment(self, segment: Dict, executor: ThreadPoolExecutor, tts_agent=None):
+        """
+        Start synthesizing one segment, returning a concurrent.futures.Future
+        
+        The async agent runs every session's requests on one shared loop under
+        its concurrency and quota limits, without a thread each.
+        """
+        tts_agent = tts_agent or self.tts_agent
+        if hasattr(tts_agent, "submit"):
+            # Copies with another voice still run on the shared agent's loop
+            return self.tts_agent.submit(tts_agent.synthesize_with_timepoints_async([segment]))
+        return executor.submit(self._synthesize_segment, segment, tts_agent)
+        
+    def _join_narration(self, synthesized: List[Dict]) -> Dict:
+        """
+        Join per-segment audio into the narration track
+        
+        Args:
+            synthesized: Results of _synthesize_segment, in playback order
+            
+        Returns:
+            Dictionary with audio_content, per-segment durations and
+            lead_trims (seconds of leading silence removed), and the gap
+            between segments
+        """
+        if self.audio_postprocessor is not None:
+            try:
+                return self.audio_postprocessor.process(
+                    [audio["audio_content"] for audio in synthesized]
+                )
+            except Exception as e:
+                print(f"⚠️  Audio post-processing failed, using raw segments: {e}")
+        
+        # MP3 frames concatenate cleanly, so per-segment audio is joined as-is
+        return {
+            "audio_content": b"".join(audio["audio_content"] for audio in synthesized),
+            "durations": [audio["duration"] for audio in synthesized],
+            "lead_trims": [0.0] * len(synthesized),
+            "gap": 0.0
+        }
+    
+    def _apply_narration_timing(self, segments: List[Dict], synthesized: List[Dict],
+                                narration: Dict) -> float:
+        """
+        Re-time segments and their words from the joined narration
+        
+        Args:
+            segments: Narrative segments, updated in place
+            synthesized: Results of _synthesize_segment, in the same order
+            narration: Result of _join_narration
+            
+        Returns:
+            Total narration duration in seconds
+        """
+        total_duration = retime_segments(segments, narration["durations"], gap=narration["gap"])
+        
+        # Word times are relative to each segment's raw audio; shift them
+        # onto the narration timeline, net of trimmed leading silence
+        for segment, audio, lead_trim in zip(segments, synthesized, narration["lead_trims"]):
+            offset = segment["start_time"] - lead_trim
+            segment["words"] = [
+                {
+                    "text": word["text"],
+                    "start_time": round(max(segment["start_time"], offset + word["start_time"]), 3),
+                    "end_time": round(min(segment["end_time"], offset + word["end_time"]), 3)
+                }
+                for word in audio["words"]
+            ]
+        return total_duration
+    
+    def _render_with_repairs(self, animation_code: str, session_dir: Path,
+                             render: Optional[Callable[..., Dict]] = None) -> Dict:
+        """
+        Render the scene, feeding Manim errors back to the model for small fixes
+        
+        Each failed render is reduced to its traceback and the code around the
+        failing line, the model returns a find/replace patch, and the patched
+        script is rendered again under the same name so Manim's partial movie
+        cache skips every animation that already rendered.
+        
+        Args:
+            animation_code: Generated Manim code
+            session_dir: Session directory; animation.py is updated with fixes
+            render: Renderer taking render_animation's arguments; defaults
+                    to AnimationAgent.render_animation
+            
+        Returns:
+            Result of the last render_animation call, with a "repairs" list
+        """
+        render = render or self.animation_agent.render_animation
+        script_name = f"scene_{session_dir.name}"
+        repairs = []
+        usage = TokenUsageTracker()
+        
+        while True:
+            render_result = render(
+                animation_code=animation_code,
+                scene_name="GeneratedScene",
+                quality="low",
+                format="mp4",
+                script_name=script_name
+            )
+            if render_result["success"] or len(repairs) >= self.render_repairs:
+                break
+            
+            failure = extract_traceback(
+                (render_result.get("stderr") or "") + (render_result.get("stdout") or ""),
+                script_name=render_result.get("script_name")
+            )
+            print(f"🔧 Render failed ({failure['error_type']} at line {failure['line']}), "
+                  f"requesting a patch...")
+            repair = {"error_type": failure["error_type"], "message": failure["message"],
+                      "line": failure["line"]}
+            repairs.append(repair)
+            try:
+                animation_code = self.content_agent.repair_animation_script(
+                    animation_code, failure, usage=usage
+                )
+            except Exception as e:
+                # A patch that does not apply is not worth another render
+                repair["patch_error"] = str(e)
+                print(f"⚠️  Patch rejected: {e}")
+                break
+            (session_dir / "animation.py").write_text(animation_code)
         
+        render_result["repairs"] = repairs
+        if repairs:
+            render_result["repair_token_usage"] = usage.summary()
+        return render_result
+    
     def generate_learning_content(self, user_query: str,
                                   narrative_style: str = "intuitive",
                                   target_duration: int = 120,
-                                  include_video: bool = True) -> Dict:
+                                  include_video: bool = True,
+                                  audio_stream: Optional[AudioSegmentStream] = None) -> Dict:
         """
         Generate complete learning content from user query
         
@@ -53,6 +259,8 @@ class OrchestratorAgent:
             narrative_style: Narrative style (intuitive, formal, conversational)
             target_duration: Target duration in seconds
             include_video: Whether to generate animation video
+            audio_stream: Optional stream that receives each segment's audio,
+                          in order, as soon as it has been synthesized
             
         Returns:
             Complete content package with all assets
@@ -69,15 +277,66 @@ class OrchestratorAgent:
             "assets": {}
         }
         
+        # Narrative segments are streamed, so synthesis of early segments
+        # overlaps with the model still writing the later ones
+        tts_executor = ThreadPoolExecutor(max_workers=self.tts_workers)
+        audio_futures = []
+        
+        # Segments finish out of order; publish the ready prefix in order
+        publish_lock = threading.Lock()
+        published = [0]
+        
+        def publish_ready(_future):
+            with publish_lock:
+                while (published[0] < len(audio_futures)
+                       and audio_futures[published[0]].done()):
+                    future = audio_futures[published[0]]
+                    if future.cancelled() or future.exception():
+                        audio_stream.close(error="Audio synthesis failed")
+                        return
+                    audio_stream.append(future.result()["audio_content"])
+                    published[0] += 1
+        
+        def synthesize_segment(segment: Dict):
+            # Word timepoints come back with the audio, for captions and sync
+            future = self._submit_segment(segment, tts_executor)
+            audio_futures.append(future)
+            if audio_stream is not None:
+                future.add_done_callback(publish_ready)
+        
+        audio_file = session_dir / "narration.mp3"
+        
+        def write_narration(narrative: Dict):
+            # Time the animation against the synthesized audio rather than
+            # the model's per-segment estimates
+            print(f"🎙️  Generating audio narration...")
+            synthesized = [future.result() for future in audio_futures]
+            narration = self._join_narration(synthesized)
+            audio_file.write_bytes(narration["audio_content"])
+            
+            estimated_duration = narrative["total_duration"]
+            narrative["total_duration"] = self._apply_narration_timing(
+                narrative["segments"], synthesized, narration
+            )
+            print(f"⏱️  Narration is {narrative['total_duration']:.1f}s "
+                  f"(estimated {estimated_duration}s)")
+        
         try:
             # Step 1: Generate content (mindmap, narrative, animation code)
             print(f"🎯 Generating content for: {user_query}")
             content = self.content_agent.generate_complete_content(
-                user_query, narrative_style, target_duration
+                user_query, narrative_style, target_duration,
+                on_segment=synthesize_segment,
+                mindmap_mode=self.mindmap_mode,
+                on_narrative=write_narration,
+                animation_mode=self.animation_mode
             )
             
             results["topic"] = content["topic"]
             results["content"] = content
+            results["token_usage"] = content["token_usage"]
+            print(f"🔢 Tokens: {content['token_usage']['prompt_tokens']} in / "
+                  f"{content['token_usage']['output_tokens']} out")
             
             # Save mindmap
             mindmap_file = session_dir / "mindmap.txt"
@@ -88,16 +347,9 @@ class OrchestratorAgent:
             }
             print(f"✅ Mindmap generated")
             
-            # Step 2: Generate audio narration
-            print(f"🎙️  Generating audio narration...")
+            # Step 2: Audio narration (written and measured before the
+            # animation script was generated)
             narrative_segments = content["narrative"]["segments"]
-            full_text = " ".join([seg["content"] for seg in narrative_segments])
-            
-            audio_file = session_dir / "narration.mp3"
-            audio_result = self.tts_agent.text_to_speech(
-                text=full_text,
-                output_file=str(audio_file)
-            )
             
             results["assets"]["audio"] = {
                 "path": str(audio_file),
@@ -110,30 +362,67 @@ class OrchestratorAgent:
             # Step 3: Generate animation video (if requested)
             if include_video:
                 print(f"🎬 Rendering animation video...")
-                animation_code = content["animation"]["animation_code"]
-                
-                # Save animation code
-                animation_code_file = session_dir / "animation.py"
-                animation_code_file.write_text(animation_code)
+                animation_plan = content["animation"].get("animation_plan")
                 
-                # Render animation
-                render_result = self.animation_agent.render_animation(
-                    animation_code=animation_code,
-                    scene_name="GeneratedScene",
-                    quality="low",
-                    format="mp4"
-                )
+                if animation_plan is not None:
+                    # Compose cached primitive clips; only new ones are rendered
+                    (session_dir / "animation_plan.json").write_text(
+                        json.dumps(animation_plan, indent=2)
+                    )
+                    render_result = self.animation_agent.render_composition(
+                        animation_plan,
+                        output_path=str(self.animation_agent.output_dir / f"composition_{session_id}.mp4")
+                    )
+                    render_result["repairs"] = []
+                    if render_result["success"]:
+                        print(f"♻️  Clip cache: {render_result['cache_hits']} hits, "
+                              f"{render_result['cache_misses']} rendered")
+                else:
+                    animation_code = content["animation"]["animation_code"]
+                    
+                    # Save animation code
+                    animation_code_file = session_dir / "animation.py"
+                    animation_code_file.write_text(animation_code)
+                    
+                    # Render animation, patching the script if Manim rejects it
+                    render = None
+                    if self.pipe_render:
+                        # Frames and narration go through one encoder, so
+                        # the result is already the final video
+                        render = functools.partial(
+                            self.animation_agent.render_with_audio,
+                            audio_path=str(audio_file),
+                            output_path=str(session_dir / "final_video.mp4"),
+                            audio_duration=content["narrative"]["total_duration"]
+                        )
+                    render_result = self._render_with_repairs(animation_code, session_dir, render)
                 
-                if render_result["success"]:
-                    video_path = render_result["video_path"]
-                    print(f"✅ Animation rendered: {Path(video_path).name}")
+                if render_result["success"] and render_result.get("audio_muxed"):
+                    final_video = render_result["video_path"]
+                    print(f"✅ Final video rendered with narration: {Path(final_video).name}")
+                    results["assets"]["video"] = {
+                        "path": final_video,
+                        "size": render_result["file_size"],
+                        "metadata": render_result["metadata"]
+                    }
+                elif render_result["success"]:
+                    # Keep the silent render so voice/language variants can
+                    # be re-muxed without rendering again
+                    video_path = str(session_dir / "raw_video.mp4")
+                    shutil.copy2(render_result["video_path"], video_path)
+                    print(f"✅ Animation rendered: {Path(render_result['video_path']).name}")
+                    
+                    # The render directory (partial movie files included) is
+                    # not needed once the video is in the session
+                    self.animation_agent.discard_render(render_result["video_path"])
                     
                     # Add audio to video
                     print(f"🔊 Adding audio to video...")
                     combined_result = self.animation_agent.add_audio_to_video(
                         video_path=video_path,
                         audio_path=str(audio_file),
-                        output_path=str(session_dir / "final_video.mp4")
+                        output_path=str(session_dir / "final_video.mp4"),
+                        audio_duration=content["narrative"]["total_duration"]
                     )
                     
                     if combined_result["success"]:
@@ -153,6 +442,33 @@ class OrchestratorAgent:
                     results["assets"]["video"] = {
                         "error": render_result.get("error")
                     }
+                results["assets"]["video"]["repairs"] = render_result["repairs"]
+                if "repair_token_usage" in render_result:
+                    results["assets"]["video"]["repair_token_usage"] = render_result["repair_token_usage"]
+                
+                # Poster frame and preview GIF, so clients can show something
+                # before the full video has downloaded
+                preview_source = session_dir / "raw_video.mp4"
+                if not preview_source.exists() and "path" in results["assets"]["video"]:
+                    preview_source = Path(results["assets"]["video"]["path"])
+                if preview_source.exists():
+                    preview_result = self.animation_agent.generate_previews(
+                        str(preview_source), str(session_dir)
+                    )
+                    if preview_result["success"]:
+                        print(f"🖼️  Poster and preview created: "
+                              f"{(preview_result['poster_size'] + preview_result['preview_size']) / 1024:.1f} KB")
+                        results["assets"]["poster"] = {
+                            "path": preview_result["poster_path"],
+                            "size": preview_result["poster_size"],
+                            "time": preview_result["poster_time"]
+                        }
+                        results["assets"]["preview"] = {
+                            "path": preview_result["preview_path"],
+                            "size": preview_result["preview_size"]
+                        }
+                    else:
+                        print(f"⚠️  Preview generation failed: {preview_result.get('error')}")
             
             # Step 4: Save session metadata
             metadata_file = session_dir / "metadata.json"
@@ -170,6 +486,176 @@ class OrchestratorAgent:
             results["error"] = str(e)
             print(f"❌ Error: {e}")
             return results
+        finally:
+            tts_executor.shutdown(wait=False, cancel_futures=True)
+            for future in audio_futures:
+                future.cancel()
+            if audio_stream is not None:
+                audio_stream.close(error=results.get("error"))
+    
+    @staticmethod
+    def variant_language(voice_name: str, language_code: Optional[str] = None,
+                         translate: Optional[bool] = None) -> Tuple[Optional[str], bool]:
+        """
+        Resolve a variant's language and whether its narration is translated
+        
+        Args:
+            voice_name: Backend voice name
+            language_code: BCP-47 code; taken from Google-style voice names
+                           ("de-DE-Neural2-B") if omitted, otherwise unknown
+            translate: Translate the narration; defaults to translating
+                       whenever the language is known and not English
+            
+        Returns:
+            (language_code or None, translate)
+        
+        Raises:
+            ValueError: If translation is requested without a known language
+        """
+        if not language_code:
+            match = GOOGLE_VOICE_LANGUAGE.match(voice_name)
+            language_code = match.group(1) if match else None
+        if translate is None:
+            translate = bool(language_code) and not language_code.lower().startswith("en")
+        if translate and not language_code:
+            raise ValueError(f"language_code is required to translate for voice {voice_name!r}")
+        return language_code, translate
+    
+    @classmethod
+    def variant_id(cls, voice_name: str, language_code: Optional[str] = None,
+                   translate: Optional[bool] = None) -> str:
+        """
+        Directory-safe ID of a session's variant: the voice name plus a short
+        hash of the resolved language settings, so the same voice in another
+        language (or untranslated) is a separate variant
+        """
+        language_code, translate = cls.variant_language(voice_name, language_code, translate)
+        voice = re.sub(r"[^A-Za-z0-9._-]+", "_", voice_name).strip("._") or "default"
+        settings = f"{(language_code or '').lower()}|{int(translate)}".encode("utf-8")
+        return f"{voice}-{hashlib.sha256(settings).hexdigest()[:8]}"
+    
+    def generate_variant(self, session_id: str, voice_name: str,
+                         language_code: Optional[str] = None, gender: str = "NEUTRAL",
+                         translate: Optional[bool] = None) -> Dict:
+        """
+        Re-voice a finished session without generating or rendering again
+        
+        The narration is re-synthesized in another voice (optionally after
+        translating the segments) and re-muxed onto the session's silent
+        raw_video.mp4. Results are cached per voice and language under
+        variants/ (see variant_id).
+        
+        Args:
+            session_id: Session to re-voice
+            voice_name: Backend voice name, e.g. "de-DE-Neural2-B"
+            language_code: BCP-47 code; taken from a Google voice name if
+                           omitted (required to translate for other backends)
+            gender: Voice gender for Google voices
+            translate: Translate the narration first; defaults to translating
+                       whenever the language is not English
+            
+        Returns:
+            Variant record with status, narration segments and asset paths
+        """
+        session_dir = self.output_dir / session_id
+        metadata_file = session_dir / "metadata.json"
+        if not metadata_file.exists():
+            return {"success": False, "error": "Session not found"}
+        
+        try:
+            variant_id = self.variant_id(voice_name, language_code, translate)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        variant_dir = session_dir / "variants" / variant_id
+        variant_file = variant_dir / "variant.json"
+        if variant_file.exists():
+            cached = json.loads(variant_file.read_text())
+            if cached.get("status") == "completed":
+                return cached
+        variant_dir.mkdir(parents=True, exist_ok=True)
+        
+        language_code, translate = self.variant_language(voice_name, language_code, translate)
+        
+        variant = {
+            "success": False,
+            "session_id": session_id,
+            "variant_id": variant_dir.name,
+            "voice_name": voice_name,
+            "language_code": language_code,
+            "translated": translate,
+            "status": "processing",
+            "assets": {}
+        }
+        
+        # A shallow copy shares clients and quota with the main agent, while
+        # set_voice only replaces the copy's voice settings
+        tts_agent = copy.copy(self.tts_agent)
+        if self.tts_backend.startswith("google"):
+            tts_agent.set_voice(language_code=language_code, name=voice_name, gender=gender)
+        else:
+            tts_agent.set_voice(voice_name)
+        
+        tts_executor = ThreadPoolExecutor(max_workers=self.tts_workers)
+        try:
+            with open(metadata_file) as f:
+                metadata = json.load(f)
+            segments = copy.deepcopy(metadata["content"]["narrative"]["segments"])
+            if translate:
+                print(f"🌐 Translating narration to {language_code}...")
+                segments = self.content_agent.translate_segments(segments, language_code)
+            
+            print(f"🎙️  Generating {voice_name} narration...")
+            futures = [self._submit_segment(segment, tts_executor, tts_agent)
+                       for segment in segments]
+            synthesized = [future.result() for future in futures]
+            narration = self._join_narration(synthesized)
+            
+            audio_file = variant_dir / "narration.mp3"
+            audio_file.write_bytes(narration["audio_content"])
+            total_duration = self._apply_narration_timing(segments, synthesized, narration)
+            variant["assets"]["audio"] = {
+                "path": str(audio_file),
+                "size": audio_file.stat().st_size,
+                "segments": segments,
+                "duration": total_duration
+            }
+            
+            # Pipe-rendered sessions have no silent copy; the mux only takes
+            # the video stream from the final video, if that rendered
+            raw_video = session_dir / "raw_video.mp4"
+            if not raw_video.exists() and "path" in metadata.get("assets", {}).get("video", {}):
+                raw_video = Path(metadata["assets"]["video"]["path"])
+            if raw_video.exists():
+                print(f"🔊 Re-muxing narration onto the rendered video...")
+                combined_result = self.animation_agent.add_audio_to_video(
+                    video_path=str(raw_video),
+                    audio_path=str(audio_file),
+                    output_path=str(variant_dir / "final_video.mp4"),
+                    audio_duration=total_duration
+                )
+                if combined_result["success"]:
+                    variant["assets"]["video"] = {
+                        "path": combined_result["video_path"],
+                        "size": combined_result["file_size"],
+                        "metadata": combined_result["metadata"]
+                    }
+                else:
+                    variant["assets"]["video"] = {"error": combined_result.get("error")}
+            
+            variant["success"] = True
+            variant["status"] = "completed"
+            print(f"✅ Variant {variant['variant_id']} created")
+            
+        except Exception as e:
+            variant["status"] = "failed"
+            variant["error"] = str(e)
+            print(f"❌ Variant error: {e}")
+        finally:
+            tts_executor.shutdown(wait=False, cancel_futures=True)
+        
+        with open(variant_file, 'w') as f:
+            json.dump(variant, f, indent=2)
+        return variant
     
     def copy_to_public(self, session_id: str, public_dir: str) -> Dict:
         """
@@ -199,7 +685,6 @@ class OrchestratorAgent:
             audio_src = session_dir / "narration.mp3"
             if audio_src.exists():
                 audio_dest = public_session / "narration.mp3"
-                import shutil
                 shutil.copy2(audio_src, audio_dest)
                 public_paths["audio"] = f"/generated/{session_id}/narration.mp3"
             
@@ -207,15 +692,20 @@ class OrchestratorAgent:
             video_src = session_dir / "final_video.mp4"
             if video_src.exists():
                 video_dest = public_session / "video.mp4"
-                import shutil
                 shutil.copy2(video_src, video_dest)
                 public_paths["video"] = f"/generated/{session_id}/video.mp4"
             
+            # Copy poster and preview
+            for preview_name in ("poster.jpg", "preview.gif"):
+                preview_src = session_dir / preview_name
+                if preview_src.exists():
+                    shutil.copy2(preview_src, public_session / preview_name)
+                    public_paths[Path(preview_name).stem] = f"/generated/{session_id}/{preview_name}"
+            
             # Copy mindmap
             mindmap_src = session_dir / "mindmap.txt"
             if mindmap_src.exists():
                 mindmap_dest = public_session / "mindmap.txt"
-                import shutil
                 shutil.copy2(mindmap_src, mindmap_dest)
                 public_paths["mindmap"] = mindmap_src.read_text()
             
@@ -0,0 +1,274 @@
+"""
+Prompt templates for the content generation agent
+Compact, registered prompts with token budgets and per-session usage telemetry
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+
+# Instructions shared by every call; sent once as the model's system
+# instruction instead of being repeated in each prompt body
+SYSTEM_INSTRUCTION = """You are an expert educator and educational content creator.
+Be accurate, clear and build from basics to advanced ideas.
+Return exactly the requested format: no markdown code fences, no commentary, no emojis."""
+
+# Rough characters-per-token ratio for Gemini on English text. Good enough to
+# enforce budgets locally without a count_tokens round trip per call.
+CHARS_PER_TOKEN = 4
+
+# Largest output the model accepts in one response
+MAX_OUTPUT_TOKENS = 8192
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a piece of text
+
+    Args:
+        text: Prompt or response text
+
+    Returns:
+        Approximate number of tokens
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class PromptTemplate:
+    """A named prompt with input/output token budgets"""
+
+    def __init__(self, name: str, template: str, max_input_tokens: int,
+                 max_output_tokens: int, truncatable: Optional[str] = None,
+                 output_tokens_per_unit: int = 0,
+                 output_token_cap: int = MAX_OUTPUT_TOKENS):
+        """
+        Args:
+            name: Registry key
+            template: str.format template
+            max_input_tokens: Budget for the rendered prompt
+            max_output_tokens: Budget passed to the model as max_output_tokens
+                               (the base budget when it scales, see output_budget)
+            truncatable: Field that may be shortened to fit the input budget
+            output_tokens_per_unit: Output tokens added per unit of work, e.g.
+                                    per second of animation
+            output_token_cap: Upper bound for a scaled output budget
+        """
+        self.name = name
+        self.template = template
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.truncatable = truncatable
+        self.output_tokens_per_unit = output_tokens_per_unit
+        self.output_token_cap = output_token_cap
+
+    def output_budget(self, units: float = 0) -> int:
+        """
+        Output token budget for a call covering some units of work
+
+        Args:
+            units: Size of the request in the template's unit (0 for the base budget)
+
+        Returns:
+            max_output_tokens plus output_tokens_per_unit per unit, capped
+        """
+        budget = self.max_output_tokens + int(self.output_tokens_per_unit * units)
+        return min(max(budget, self.max_output_tokens), self.output_token_cap)
+
+    def fixed_tokens(self, field: str, **fields) -> int:
+        """Estimated prompt tokens with one field left empty"""
+        return estimate_tokens(self.template.format(**dict(fields, **{field: ""})))
+
+    def render(self, **fields) -> str:
+        """
+        Render the template, trimming the truncatable field if over budget
+
+        Raises:
+            ValueError: If the prompt cannot fit within max_input_tokens
+        """
+        prompt = self.template.format(**fields)
+        overflow = estimate_tokens(prompt) - self.max_input_tokens
+        if overflow <= 0:
+            return prompt
+
+        if self.truncatable and fields.get(self.truncatable):
+            value = str(fields[self.truncatable])
+            keep = max(0, len(value) - overflow * CHARS_PER_TOKEN)
+            fields = dict(fields, **{self.truncatable: value[:keep]})
+            prompt = self.template.format(**fields)
+            if estimate_tokens(prompt) <= self.max_input_tokens:
+                return prompt
+
+        raise ValueError(
+            f"Prompt '{self.name}' needs ~{estimate_tokens(prompt)} tokens, "
+            f"budget is {self.max_input_tokens}"
+        )
+
+
+PROMPT_TEMPLATES: Dict[str, PromptTemplate] = {}
+
+
+def register_template(template: PromptTemplate) -> PromptTemplate:
+    """Add a template to the registry, replacing any with the same name"""
+    PROMPT_TEMPLATES[template.name] = template
+    return template
+
+
+def get_template(name: str) -> PromptTemplate:
+    """Look up a registered template by name"""
+    if name not in PROMPT_TEMPLATES:
+        raise KeyError(f"Unknown prompt template: {name}")
+    return PROMPT_TEMPLATES[name]
+
+
+register_template(PromptTemplate(
+    name="topic",
+    template="Main educational topic of this query in 2-4 words, nothing else: '{user_query}'",
+    max_input_tokens=200,
+    max_output_tokens=16,
+    truncatable="user_query",
+))
+
+register_template(PromptTemplate(
+    name="mindmap",
+    template="""Mermaid.js mindmap for "{topic}". Request: {user_query}
+Root node ((topic)), 5-7 branches, 2-4 concise sub-nodes each, logical hierarchy, include applications.
+Output starts with "mindmap", two-space indentation, e.g.
+mindmap
+  root((Topic))
+    Branch
+      Detail""",
+    max_input_tokens=400,
+    max_output_tokens=1024,
+    truncatable="user_query",
+))
+
+register_template(PromptTemplate(
+    name="narrative",
+    template="""{style} audio narration explaining "{topic}".
+~{target_words} words ({target_duration}s), 8-12 segments of 1-3 sentences, basics to advanced, real-world examples and analogies.
+JSON array only: [{{"segment_id":1,"title":"...","content":"...","estimated_duration":10}}]""",
+    max_input_tokens=300,
+    max_output_tokens=2048,
+))
+
+register_template(PromptTemplate(
+    name="lesson_plan",
+    template="""{style} audio lesson on "{topic}". Request: {user_query}
+One JSON object, "segments" first:
+{{"segments":[{{"segment_id":1,"title":"...","content":"...","estimated_duration":10}}],
+"concept_tree":{{"label":"{topic}","children":[{{"label":"Branch","children":[{{"label":"Detail"}}]}}]}}}}
+segments: ~{target_words} words ({target_duration}s), 8-12 segments of 1-3 sentences, basics to advanced, real-world examples and analogies.
+concept_tree: 5-7 branches following the narrative, 2-4 concise children each, include applications.""",
+    max_input_tokens=500,
+    max_output_tokens=3072,
+    truncatable="user_query",
+))
+
+register_template(PromptTemplate(
+    name="animation",
+    template="""Manim Community Edition code for "{topic}", {duration}s total, 854x480 at 15fps.
+Timeline (id start-end title):
+{timeline}
+One Scene class "GeneratedScene"; visuals follow the timeline with formulas/graphs/diagrams and color;
+use self.wait() so transitions land on segment boundaries and total runtime is {duration}s.
+Continuous motion: one ValueTracker swept in a single self.play, never a loop of short plays.
+Helpers (from motion import ...): tangent_sweep(axes,f,x_start)->(tracker,group), secant_approach(axes,f,x0,h_start),
+area_sweep(axes,graph,x_start), trace_dot(axes,f,tracker), value_label(tracker,label), sweep(self,tracker,target,run_time=).
+Python only, starting with "from manim import *".""",
+    max_input_tokens=900,
+    max_output_tokens=2560,
+    truncatable="timeline",
+    # Scripts grow with the runtime they have to fill; scaled by seconds
+    output_tokens_per_unit=30,
+))
+
+register_template(PromptTemplate(
+    name="translate",
+    template="""Translate each string of this JSON array into {language} for spoken narration.
+Keep meaning, tone and technical terms; same number of strings, same order.
+JSON array of strings only.
+{texts}""",
+    max_input_tokens=1600,
+    max_output_tokens=512,
+    # Long narrations are translated in batches that fit max_input_tokens;
+    # scaled by input tokens, leaving room for longer target languages
+    output_tokens_per_unit=3,
+))
+
+
+register_template(PromptTemplate(
+    name="animation_plan",
+    template="""Visuals for a lesson on "{topic}", one building block per timeline segment.
+Timeline (id start-end title):
+{timeline}
+Building blocks, name(default params) - description:
+{catalogue}
+Expressions use x, + - * / **, sin cos tan exp log sqrt abs pi e. LaTeX in "label"/"latex".
+JSON array only, one item per segment id:
+[{{"segment_id":1,"primitive":"title_card","params":{{"text":"..."}}}}]""",
+    max_input_tokens=900,
+    max_output_tokens=1536,
+    truncatable="timeline",
+))
+
+register_template(PromptTemplate(
+    name="animation_repair",
+    template="""This Manim Community Edition scene "GeneratedScene" fails to render.
+{error_type}: {message}
+Traceback (end):
+{traceback}
+Code (line| source):
+{code}
+Minimal fix only; keep the timeline and self.wait() durations.
+JSON array of edits, each "find" copied exactly from one place in the code (without line numbers):
+[{{"find":"...","replace":"..."}}]""",
+    max_input_tokens=1800,
+    max_output_tokens=1024,
+    truncatable="traceback",
+))
+
+
+def compact_timeline(segments: List[Dict], title_chars: int = 32) -> str:
+    """
+    Render narrative segments as a terse timeline for the animation prompt
+
+    Args:
+        segments: Narrative segments with start/end times
+        title_chars: Maximum characters kept from each title
+
+    Returns:
+        One "id start-end title" line per segment
+    """
+    return "\n".join(
+        f"{s['segment_id']} {s['start_time']:g}-{s['end_time']:g} {s['title'][:title_chars]}"
+        for s in segments
+    )
+
+
+class TokenUsageTracker:
+    """Thread-safe token accounting per prompt template"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage: Dict[str, Dict[str, int]] = {}
+
+    def record(self, template_name: str, prompt_tokens: int, output_tokens: int):
+        """Add the token counts of one model call"""
+        with self._lock:
+            entry = self._usage.setdefault(
+                template_name, {"calls": 0, "prompt_tokens": 0, "output_tokens": 0}
+            )
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["output_tokens"] += output_tokens
+
+    def summary(self) -> Dict:
+        """Per-template counts plus session totals"""
+        with self._lock:
+            by_template = {name: dict(entry) for name, entry in self._usage.items()}
+        return {
+            "by_template": by_template,
+            "prompt_tokens": sum(e["prompt_tokens"] for e in by_template.values()),
+            "output_tokens": sum(e["output_tokens"] for e in by_template.values()),
+            "calls": sum(e["calls"] for e in by_template.values()),
+        }
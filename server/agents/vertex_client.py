@@ -0,0 +1,101 @@
+"""
+Shared Vertex AI client registry
+Initializes Vertex AI lazily and reuses GenerativeModel instances (and their
+gRPC channels) across agents, services and worker threads in the process
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+
+DEFAULT_LOCATION = "us-central1"
+
+_lock = threading.RLock()
+_active_config: Optional[Tuple[Optional[str], str]] = None
+_models: Dict[Tuple, object] = {}
+
+
+def init_vertex(project_id: Optional[str] = None, location: str = DEFAULT_LOCATION):
+    """
+    Initialize Vertex AI for a project/location on first use
+
+    vertexai.init only updates global configuration, so it is skipped when the
+    requested project/location is already active.
+
+    Args:
+        project_id: Google Cloud project ID (defaults to GOOGLE_CLOUD_PROJECT)
+        location: Google Cloud region
+    """
+    global _active_config
+
+    project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+    config = (project_id, location)
+
+    with _lock:
+        if _active_config == config:
+            return
+        import vertexai
+        vertexai.init(project=project_id, location=location)
+        _active_config = config
+
+
+def get_generative_model(model_name: str, project_id: Optional[str] = None,
+                         location: str = DEFAULT_LOCATION,
+                         system_instruction: Optional[str] = None):
+    """
+    Return the shared GenerativeModel for a model/project/location
+
+    A GenerativeModel captures project and location when it is built and
+    creates its prediction client (one gRPC channel) on the first request, so
+    reusing the instance means each request after the first skips channel setup.
+
+    Args:
+        model_name: Gemini model name, e.g. "gemini-1.5-pro"
+        project_id: Google Cloud project ID (defaults to GOOGLE_CLOUD_PROJECT)
+        location: Google Cloud region
+        system_instruction: Optional system instruction baked into the model
+
+    Returns:
+        vertexai.generative_models.GenerativeModel
+    """
+    project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+    key = (model_name, project_id, location, system_instruction)
+
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            from vertexai.generative_models import GenerativeModel
+
+            # Construct while the matching config is active so the model
+            # binds to this project/location
+            init_vertex(project_id, location)
+            model = GenerativeModel(model_name, system_instruction=system_instruction)
+            _models[key] = model
+        return model
+
+
+def clear_clients():
+    """Drop cached models, e.g. after credentials change"""
+    global _active_config
+
+    with _lock:
+        _models.clear()
+        _active_config = None
+
+
+def _reset_after_fork():
+    """gRPC channels are not fork-safe; forked workers build their own"""
+    global _lock, _active_config
+
+    _lock = threading.RLock()
+    _models.clear()
+    _active_config = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,208 @@
+"""
+Primitive clip catalogue and cache
+Specs for the parameterized scene building blocks in primitives.py, parameter
+validation, and an on-disk cache of rendered clips keyed by a hash of the
+primitive and its parameters. Imports nothing from Manim, so the server can
+plan and look up clips without loading it.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Bump when primitives.py draws differently so cached clips are not reused
+PRIMITIVES_VERSION = 2
+
+# Names an expression such as "x**2" or "sin(x)" may use
+EXPRESSION_NAMES = {"x", "sin", "cos", "tan", "exp", "log", "sqrt", "abs", "pi", "e"}
+EXPRESSION_FUNCTIONS = EXPRESSION_NAMES - {"x", "pi", "e"}
+
+# Syntax allowed besides names, numbers and calls: arithmetic only
+EXPRESSION_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.USub, ast.UAdd,
+)
+
+# name -> description and default parameters. Clip length is set by the
+# primitive, not the narration, so clips are reusable across lessons; the
+# composition holds the last frame to fill each segment.
+PRIMITIVE_SPECS: Dict[str, Dict] = {
+    "title_card": {
+        "description": "Title with optional subtitle",
+        "params": {"text": "Title", "subtitle": ""},
+    },
+    "function_plot": {
+        "description": "Axes and the graph of f(x) with a LaTeX label",
+        "params": {"expression": "x**2", "x_range": [-1, 4], "y_range": [-1, 9],
+                   "label": "", "color": "BLUE"},
+    },
+    "secant_to_tangent": {
+        "description": "Secant through x0 and x1 sliding into the tangent at x0",
+        "params": {"expression": "x**2", "x_range": [-1, 4], "y_range": [-1, 9],
+                   "x0": 1.0, "x1": 2.5},
+    },
+    "formula": {
+        "description": "A LaTeX formula written out, with optional caption",
+        "params": {"latex": "f'(x) = \\lim_{h \\to 0} \\frac{f(x+h) - f(x)}{h}", "caption": ""},
+    },
+    "bullet_list": {
+        "description": "Heading and up to 5 bullet points revealed in turn",
+        "params": {"heading": "Key ideas", "items": ["First idea", "Second idea"]},
+    },
+}
+
+COLORS = {"BLUE", "RED", "GREEN", "YELLOW", "ORANGE", "PURPLE", "TEAL", "WHITE"}
+
+
+def check_expression(expression: str) -> str:
+    """
+    Validate a function-of-x expression
+
+    Only numbers, EXPRESSION_NAMES, arithmetic operators and calls of
+    EXPRESSION_FUNCTIONS are allowed, so attribute access, subscripts, lambdas and
+    comprehensions are rejected before primitives.make_function evals it.
+
+    Raises:
+        ValueError: If it does not parse or uses anything else
+    """
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression {expression!r}: {e.msg}")
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id not in EXPRESSION_NAMES:
+                raise ValueError(f"Expression uses unsupported name: {node.id}")
+        elif isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise ValueError(f"Expression uses unsupported constant: {node.value!r}")
+        elif isinstance(node, ast.Call):
+            if (not isinstance(node.func, ast.Name) or node.func.id not in EXPRESSION_FUNCTIONS
+                    or node.keywords):
+                raise ValueError(f"Unsupported call in expression {expression!r}")
+        elif not isinstance(node, EXPRESSION_NODES):
+            raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+    return expression
+
+
+def _check_range(value) -> List[float]:
+    low, high = (float(v) for v in value)
+    if not low < high:
+        raise ValueError(f"Range must be increasing: {value}")
+    return [low, high]
+
+
+def resolve_params(name: str, params: Optional[Dict] = None) -> Dict:
+    """
+    Fill in defaults, drop unknown keys and validate a primitive's parameters
+
+    Args:
+        name: Primitive name in PRIMITIVE_SPECS
+        params: Parameters from the animation plan
+
+    Returns:
+        Complete, JSON-serializable parameters
+
+    Raises:
+        ValueError: If the primitive is unknown or a parameter is invalid
+    """
+    if not isinstance(name, str) or name not in PRIMITIVE_SPECS:
+        raise ValueError(f"Unknown primitive: {name}")
+    if params is not None and not isinstance(params, dict):
+        raise ValueError(f"Parameters for {name} must be an object")
+
+    defaults = PRIMITIVE_SPECS[name]["params"]
+    resolved = {key: (params or {}).get(key, default) for key, default in defaults.items()}
+
+    try:
+        for key, value in resolved.items():
+            if key == "expression":
+                resolved[key] = check_expression(str(value))
+            elif key in ("x_range", "y_range"):
+                resolved[key] = _check_range(value)
+            elif key in ("x0", "x1"):
+                resolved[key] = float(value)
+            elif key == "color":
+                resolved[key] = str(value).upper() if str(value).upper() in COLORS else defaults[key]
+            elif key == "items":
+                if not isinstance(value, (list, tuple)):
+                    raise ValueError(f"items must be a list, got {type(value).__name__}")
+                resolved[key] = [str(item)[:60] for item in value][:5]
+            else:
+                resolved[key] = str(value)[:120]
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid parameters for {name}: {e}")
+
+    if name == "secant_to_tangent" and resolved["x0"] == resolved["x1"]:
+        raise ValueError("secant_to_tangent needs x0 != x1")
+    return resolved
+
+
+def clip_key(name: str, params: Dict, quality: str = "low") -> str:
+    """Content hash identifying a rendered clip"""
+    payload = json.dumps([PRIMITIVES_VERSION, name, params, quality],
+                         sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def clip_script(name: str, params: Dict) -> str:
+    """Manim script defining PrimitiveScene (needs animation_manim on PYTHONPATH)"""
+    return (
+        "import json\n"
+        "from primitives import make_scene\n\n"
+        f"PrimitiveScene = make_scene({name!r}, json.loads({json.dumps(params)!r}))\n"
+    )
+
+
+def catalogue() -> str:
+    """Compact primitive list for prompts: name(defaults) - description"""
+    return "\n".join(
+        f"{name}({json.dumps(spec['params'], separators=(',', ':'))}) - {spec['description']}"
+        for name, spec in PRIMITIVE_SPECS.items()
+    )
+
+
+class ClipCache:
+    """Rendered primitive clips stored as <key>.mp4 in one directory"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.mp4"
+
+    def get_or_render(self, name: str, params: Dict, render: Callable[[str, Dict], str],
+                      quality: str = "low") -> Tuple[Path, bool]:
+        """
+        Return the cached clip for a primitive, rendering it on a miss
+
+        Args:
+            name: Primitive name
+            params: Resolved parameters (see resolve_params)
+            render: Called as render(name, params) on a miss; returns the
+                    path of the rendered video, or raises
+            quality: Render quality, part of the cache key
+
+        Returns:
+            (clip path, whether it was a cache hit)
+        """
+        cache_path = self.path(clip_key(name, params, quality))
+        if cache_path.exists():
+            # Refresh the mtime so storage eviction sees the clip as recently used
+            os.utime(cache_path)
+            return cache_path, True
+
+        rendered = render(name, params)
+        # Copy then rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(rendered, tmp_path)
+        os.replace(tmp_path, cache_path)
+        return cache_path, False
@@ -1,4 +1,5 @@
 from manim import *
+from motion import sweep, tangent_sweep
 
 class DerivativeExplanation(Scene):
     def construct(self):
@@ -70,19 +71,19 @@ class DerivativeExplanation(Scene):
         self.wait(2)
         
         # [0:23 - 0:30] Points Getting Closer (7 seconds)
-        for new_x2 in [2.2, 1.8, 1.5, 1.3, 1.15]:
-            new_dot2 = Dot(axes.c2p(new_x2, func(new_x2)), color=YELLOW)
-            new_secant = Line(
-                axes.c2p(x1, func(x1)),
-                axes.c2p(new_x2, func(new_x2)),
-                color=GREEN
-            )
-            self.play(
-                Transform(dot2, new_dot2),
-                Transform(secant, new_secant),
-                run_time=0.8
-            )
-            self.wait(0.6)
+        # One tracker drives the second point; the dot and secant follow it
+        # in a single continuous animation
+        x2_tracker = ValueTracker(x2)
+        dot2.add_updater(lambda d: d.move_to(
+            axes.c2p(x2_tracker.get_value(), func(x2_tracker.get_value()))
+        ))
+        secant.add_updater(lambda l: l.put_start_and_end_on(
+            axes.c2p(x1, func(x1)),
+            axes.c2p(x2_tracker.get_value(), func(x2_tracker.get_value()))
+        ))
+        sweep(self, x2_tracker, 1.15, run_time=7)
+        dot2.clear_updaters()
+        secant.clear_updaters()
         
         # [0:31 - 0:35] Tangent Line Appears (4 seconds)
         tangent_text = Text("Tangent Line: Instantaneous Rate of Change", font_size=30, color=RED).to_edge(DOWN)
@@ -155,19 +156,15 @@ class DerivativeExplanation(Scene):
         
         # Animate tangent moving with the point
         self.play(FadeOut(secant))
-        moving_tangent = get_tangent_line(0.5)
-        self.play(Create(moving_tangent))
-        
-        # Slow down the moving dot to take 13 seconds (15s - 2s for setup)
-        for x_val in np.linspace(0.5, 2.5, 50):
-            new_dot = Dot(axes.c2p(x_val, func(x_val)), color=YELLOW)
-            new_tangent = get_tangent_line(x_val)
-            self.play(
-                Transform(moving_dot, new_dot),
-                Transform(moving_tangent, new_tangent),
-                run_time=0.26,  # 50 steps * 0.26 = 13 seconds
-                rate_func=linear
-            )
+        start_tangent = get_tangent_line(0.5)
+        self.play(Create(start_tangent))
+        
+        # The tangent and dot are redrawn from one tracker, so the 13 second
+        # move (15s - 2s for setup) is a single animation
+        x_tracker, moving_tangent = tangent_sweep(axes, func, x_start=0.5, length=1.2)
+        self.remove(start_tangent, moving_dot)
+        self.add(moving_tangent)
+        sweep(self, x_tracker, 2.5, run_time=13)
         
         # [1:11 - 1:18] Conclusion (7 seconds) - extended to match narration + audio buffer
         self.wait(7)
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Updater-based motion helpers for Manim scenes
+Continuous motion is driven by one ValueTracker and always_redraw, so a sweep
+is a single self.play call (one partial movie file) instead of a Python loop
+of many short Transform animations that each build new mobjects.
+
+Usage:
+    tracker, tangent = tangent_sweep(axes, lambda x: x**2, x_start=0.5)
+    self.add(tangent)
+    sweep(self, tracker, 2.5, run_time=13)
+"""
+
+from typing import Callable, Optional, Tuple
+
+from manim import (
+    BLUE, GREEN, RED, RIGHT, UP, YELLOW,
+    Axes, DecimalNumber, Dot, Line, MathTex, Scene, ValueTracker, VGroup,
+    always_redraw, linear,
+)
+
+# Step for numerical derivatives, so helpers only need f itself
+DERIVATIVE_STEP = 1e-4
+
+
+def slope_at(func: Callable[[float], float], x: float, h: float = DERIVATIVE_STEP) -> float:
+    """Central-difference derivative of func at x"""
+    return (func(x + h) - func(x - h)) / (2 * h)
+
+
+def _line_through(axes: Axes, x: float, y: float, slope: float, length: float, color) -> Line:
+    half = length / 2
+    return Line(axes.c2p(x - half, y - slope * half), axes.c2p(x + half, y + slope * half),
+                color=color)
+
+
+def sweep(scene: Scene, tracker: ValueTracker, target: float, *animations,
+          run_time: float = 2.0, rate_func=linear):
+    """
+    Move a tracker to target in one animation; every mobject redrawn from
+    it follows continuously
+
+    Args:
+        scene: Scene to play on
+        tracker: ValueTracker driving the motion
+        target: Final tracker value
+        *animations: Extra animations played alongside
+        run_time: Duration in seconds
+        rate_func: Manim rate function (linear keeps a constant speed)
+    """
+    scene.play(tracker.animate.set_value(target), *animations,
+               run_time=run_time, rate_func=rate_func)
+
+
+def trace_dot(axes: Axes, func: Callable[[float], float], tracker: ValueTracker,
+              color=YELLOW) -> Dot:
+    """Dot on the graph of func at x = tracker value"""
+    return always_redraw(lambda: Dot(axes.c2p(tracker.get_value(), func(tracker.get_value())),
+                                     color=color))
+
+
+def tangent_sweep(axes: Axes, func: Callable[[float], float], x_start: float,
+                  length: float = 1.2, color=RED, dot_color=YELLOW) -> Tuple[ValueTracker, VGroup]:
+    """
+    Tangent line and point of contact that follow a tracker along the graph
+
+    Args:
+        axes: Axes the graph is plotted on
+        func: Function of x
+        x_start: Initial point of contact
+        length: Tangent segment length in x units
+        color: Tangent color
+        dot_color: Point color
+
+    Returns:
+        (tracker holding x, VGroup of tangent and dot to add to the scene)
+    """
+    tracker = ValueTracker(x_start)
+
+    def tangent() -> Line:
+        x = tracker.get_value()
+        return _line_through(axes, x, func(x), slope_at(func, x), length, color)
+
+    return tracker, VGroup(always_redraw(tangent), trace_dot(axes, func, tracker, dot_color))
+
+
+def secant_approach(axes: Axes, func: Callable[[float], float], x0: float, h_start: float,
+                    length: float = 3.0, color=GREEN, dot_color=YELLOW) -> Tuple[ValueTracker, VGroup]:
+    """
+    Secant through x0 and x0 + h whose second point slides in as h shrinks
+
+    Sweep the tracker towards 0 (not to 0 exactly) to turn the secant into
+    the tangent at x0.
+
+    Args:
+        axes: Axes the graph is plotted on
+        func: Function of x
+        x0: Fixed point
+        h_start: Initial offset of the second point
+        length: Secant segment length in x units
+        color: Secant color
+        dot_color: Color of both points
+
+    Returns:
+        (tracker holding h, VGroup of secant and both dots)
+    """
+    tracker = ValueTracker(h_start)
+
+    def secant() -> Line:
+        h = tracker.get_value() or DERIVATIVE_STEP
+        slope = (func(x0 + h) - func(x0)) / h
+        return _line_through(axes, x0, func(x0), slope, length, color)
+
+    fixed = Dot(axes.c2p(x0, func(x0)), color=dot_color)
+    moving = always_redraw(lambda: Dot(axes.c2p(x0 + tracker.get_value(),
+                                                func(x0 + tracker.get_value())), color=dot_color))
+    return tracker, VGroup(always_redraw(secant), fixed, moving)
+
+
+def area_sweep(axes: Axes, graph, x_start: float, x_end: Optional[float] = None,
+               color=BLUE, opacity: float = 0.4) -> Tuple[ValueTracker, VGroup]:
+    """
+    Shaded area under a plotted graph from x_start up to a tracker
+
+    Args:
+        axes: Axes the graph is plotted on
+        graph: Result of axes.plot
+        x_start: Left edge of the area
+        x_end: Initial right edge (defaults to a sliver past x_start)
+        color: Fill color
+        opacity: Fill opacity
+
+    Returns:
+        (tracker holding the right edge, VGroup with the area)
+    """
+    tracker = ValueTracker(x_end if x_end is not None else x_start + DERIVATIVE_STEP)
+    area = always_redraw(lambda: axes.get_area(
+        graph, x_range=[x_start, max(x_start + DERIVATIVE_STEP, tracker.get_value())],
+        color=color, opacity=opacity
+    ))
+    return tracker, VGroup(area)
+
+
+def value_label(tracker: ValueTracker, label: str, value: Optional[Callable[[float], float]] = None,
+                num_decimal_places: int = 2, font_size: int = 36) -> VGroup:
+    """
+    "label = 1.23" readout that updates with a tracker
+
+    Args:
+        tracker: Tracker to read
+        label: LaTeX shown before the number, e.g. r"f'(x)"
+        value: Maps the tracker value to the displayed number (identity if omitted)
+        num_decimal_places: Digits after the decimal point
+        font_size: Text size
+
+    Returns:
+        VGroup of label and number; position it once, the number stays beside it
+    """
+    tex = MathTex(f"{label} =", font_size=font_size)
+    number = DecimalNumber(0, num_decimal_places=num_decimal_places, font_size=font_size)
+    number.add_updater(lambda m: m.set_value(
+        value(tracker.get_value()) if value else tracker.get_value()
+    ).next_to(tex, RIGHT))
+    return VGroup(tex, number).to_edge(UP)
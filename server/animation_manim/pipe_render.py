@@ -0,0 +1,172 @@
+"""
+Direct-to-ffmpeg Manim renderer
+Renders a scene with a file writer that streams raw frames over a pipe into
+one ffmpeg encoder, which also muxes the narration. Manim's per-animation
+partial movie files and the final combine step are skipped, and no separate
+audio pass is needed.
+
+Usage:
+    python pipe_render.py scene.py GeneratedScene --output final.mp4 \
+        --audio narration.mp3 --audio-duration 74.2 --quality low
+"""
+
+import argparse
+import importlib.util
+import subprocess
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from manim import __version__ as manim_version
+from manim import config
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.scene.scene_file_writer import SceneFileWriter
+
+QUALITIES = {"low": "low_quality", "medium": "medium_quality", "high": "high_quality"}
+
+# PipeFileWriter overrides the SceneFileWriter API of these releases
+# (__init__(renderer, scene_name, **kwargs), write_frame(frame, num_frames));
+# 0.22 builds the writer from a settings object and calls write_frame(pixels, repeat=)
+SUPPORTED_MANIM = ((0, 19), (0, 22))
+
+
+def check_manim_version():
+    """
+    Raises:
+        RuntimeError: If the installed Manim has a file writer API this
+                      module does not implement
+    """
+    version = tuple(int(part) for part in manim_version.split(".")[:2] if part.isdigit())
+    low, high = SUPPORTED_MANIM
+    if not low <= version < high:
+        raise RuntimeError(
+            f"pipe_render supports manim >={low[0]}.{low[1]},<{high[0]}.{high[1]} "
+            f"(installed: {manim_version}); unset MANIM_PIPE_RENDER to render normally"
+        )
+
+
+class PipeFileWriter(SceneFileWriter):
+    """
+    SceneFileWriter that sends every frame to a single ffmpeg process
+
+    The encoder is opened on the first written animation and closed in
+    finish(); animations do not get partial movie files of their own.
+    """
+
+    def __init__(self, renderer, scene_name: str, output_path: str,
+                 audio_path: Optional[str] = None, audio_duration: Optional[float] = None,
+                 **kwargs):
+        self.output_path = output_path
+        self.audio_path = audio_path
+        self.audio_duration = audio_duration
+        self.process: Optional[subprocess.Popen] = None
+        self.frames_written = 0
+        self.last_frame: Optional[bytes] = None
+        super().__init__(renderer, scene_name, **kwargs)
+
+    def _open_encoder(self):
+        cmd = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba",
+            "-s", f"{config.pixel_width}x{config.pixel_height}",
+            "-r", str(config.frame_rate),
+            "-i", "pipe:0",
+        ]
+        if self.audio_path:
+            cmd += ["-i", self.audio_path, "-map", "0:v:0", "-map", "1:a:0", "-c:a", "aac"]
+        cmd += ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+                self.output_path]
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def begin_animation(self, allow_write: bool = False, *args, **kwargs):
+        if allow_write and self.process is None:
+            self._open_encoder()
+
+    def end_animation(self, allow_write: bool = False, *args, **kwargs):
+        # The encoder stays open across animations
+        pass
+
+    def write_frame(self, frame_or_renderer, num_frames: int = 1):
+        if self.process is None:
+            return
+        frame = (frame_or_renderer if isinstance(frame_or_renderer, np.ndarray)
+                 else frame_or_renderer.get_frame())
+        data = np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+        for _ in range(num_frames):
+            self.process.stdin.write(data)
+        self.frames_written += num_frames
+        self.last_frame = data
+
+    def is_already_cached(self, *args, **kwargs) -> bool:
+        return False
+
+    def add_partial_movie_file(self, *args, **kwargs):
+        pass
+
+    def combine_to_movie(self):
+        pass
+
+    def clean_cache(self):
+        pass
+
+    def finish(self):
+        if self.process is None:
+            return
+
+        # Hold the last frame until the narration ends, like the tpad
+        # padding in AnimationAgent.add_audio_to_video
+        if self.audio_duration and self.last_frame is not None:
+            missing = round(self.audio_duration * config.frame_rate) - self.frames_written
+            for _ in range(max(0, missing)):
+                self.process.stdin.write(self.last_frame)
+
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {self.process.returncode}")
+
+
+def render(scene_file: str, scene_name: str, output_path: str, quality: str = "low",
+           audio_path: Optional[str] = None, audio_duration: Optional[float] = None,
+           media_dir: Optional[str] = None):
+    """
+    Render a scene straight into an MP4, muxing narration if given
+
+    Args:
+        scene_file: Python file defining the scene
+        scene_name: Scene class name
+        output_path: MP4 to write
+        quality: low, medium or high
+        audio_path: Narration to mux into the same encode
+        audio_duration: Narration length; the last frame is held until then
+        media_dir: Manim media directory (a temp directory if omitted)
+    """
+    check_manim_version()
+    config.quality = QUALITIES.get(quality, "low_quality")
+    config.disable_caching = True  # Nothing is read back from partial files
+    config.media_dir = media_dir or tempfile.mkdtemp(prefix="manim_pipe_")
+
+    spec = importlib.util.spec_from_file_location(Path(scene_file).stem, scene_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    scene_class = getattr(module, scene_name)
+
+    file_writer = partial(PipeFileWriter, output_path=output_path,
+                          audio_path=audio_path, audio_duration=audio_duration)
+    scene_class(renderer=CairoRenderer(file_writer_class=file_writer)).render()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scene_file")
+    parser.add_argument("scene_name")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--quality", default="low", choices=sorted(QUALITIES))
+    parser.add_argument("--audio")
+    parser.add_argument("--audio-duration", type=float)
+    parser.add_argument("--media-dir")
+    args = parser.parse_args()
+
+    render(args.scene_file, args.scene_name, args.output, args.quality,
+           args.audio, args.audio_duration, args.media_dir)
@@ -0,0 +1,128 @@
+"""
+Parameterized Manim scene building blocks
+Each primitive draws one common lesson visual from a few parameters (see
+clips.PRIMITIVE_SPECS). Rendered clips are cached by parameter hash, so the
+same axes, plots and secant-to-tangent transitions are rendered once.
+"""
+
+from typing import Callable, Dict
+
+import numpy as np
+from manim import (
+    BLUE, DOWN, GREEN, LEFT, ORANGE, PURPLE, RED, TEAL, UP, WHITE, YELLOW,
+    Axes, Create, FadeIn, MathTex, Scene, Text, VGroup, Write, smooth,
+)
+
+from clips import resolve_params
+from motion import secant_approach, sweep, tangent_sweep
+
+COLORS = {"BLUE": BLUE, "RED": RED, "GREEN": GREEN, "YELLOW": YELLOW,
+          "ORANGE": ORANGE, "PURPLE": PURPLE, "TEAL": TEAL, "WHITE": WHITE}
+
+EXPRESSION_NAMESPACE = {"sin": np.sin, "cos": np.cos, "tan": np.tan, "exp": np.exp,
+                        "log": np.log, "sqrt": np.sqrt, "abs": np.abs, "pi": np.pi, "e": np.e}
+
+
+def make_function(expression: str) -> Callable[[float], float]:
+    """Compile a validated expression of x into a function"""
+    code = compile(expression, "<expression>", "eval")
+    return lambda x: float(eval(code, {"__builtins__": {}}, dict(EXPRESSION_NAMESPACE, x=x)))
+
+
+def _axes(params: Dict) -> Axes:
+    x_min, x_max = params["x_range"]
+    y_min, y_max = params["y_range"]
+    return Axes(
+        x_range=[x_min, x_max, max(1, round((x_max - x_min) / 5))],
+        y_range=[y_min, y_max, max(1, round((y_max - y_min) / 5))],
+        x_length=7,
+        y_length=5,
+        axis_config={"include_tip": True},
+    ).shift(DOWN * 0.5)
+
+
+def title_card(scene: Scene, params: Dict):
+    title = Text(params["text"], font_size=48)
+    scene.play(Write(title), run_time=1.5)
+    if params["subtitle"]:
+        subtitle = Text(params["subtitle"], font_size=30).next_to(title, DOWN)
+        scene.play(FadeIn(subtitle), run_time=0.8)
+    scene.wait(0.5)
+
+
+def function_plot(scene: Scene, params: Dict):
+    axes = _axes(params)
+    labels = axes.get_axis_labels(x_label="x", y_label="f(x)")
+    graph = axes.plot(make_function(params["expression"]), color=COLORS[params["color"]],
+                      x_range=params["x_range"])
+    scene.play(Create(axes), Write(labels), run_time=2)
+    scene.play(Create(graph), run_time=1.5)
+    if params["label"]:
+        label = MathTex(params["label"], color=COLORS[params["color"]]).to_corner(UP)
+        scene.play(Write(label), run_time=1)
+    scene.wait(0.5)
+
+
+def secant_to_tangent(scene: Scene, params: Dict):
+    func = make_function(params["expression"])
+    axes = _axes(params)
+    x0, x1 = params["x0"], params["x1"]
+    scene.add(axes, axes.plot(func, color=BLUE, x_range=params["x_range"]))
+
+    # One continuous sweep of h towards 0 instead of a loop of Transforms
+    tracker, secant = secant_approach(axes, func, x0, x1 - x0)
+    scene.play(Create(secant), run_time=1.5)
+    sweep(scene, tracker, (x1 - x0) * 1e-3, run_time=4, rate_func=smooth)
+    _, tangent = tangent_sweep(axes, func, x0, length=3.0)
+    scene.play(FadeIn(tangent[0]), run_time=0.5)
+    scene.wait(0.5)
+
+
+def formula(scene: Scene, params: Dict):
+    tex = MathTex(params["latex"], font_size=44)
+    scene.play(Write(tex), run_time=2)
+    if params["caption"]:
+        caption = Text(params["caption"], font_size=28).next_to(tex, DOWN)
+        scene.play(FadeIn(caption), run_time=0.8)
+    scene.wait(0.5)
+
+
+def bullet_list(scene: Scene, params: Dict):
+    heading = Text(params["heading"], font_size=40).to_edge(UP)
+    items = VGroup(*(Text(f"• {item}", font_size=30) for item in params["items"]))
+    items.arrange(DOWN, aligned_edge=LEFT, buff=0.4).next_to(heading, DOWN, buff=0.6)
+    scene.play(Write(heading), run_time=1)
+    for item in items:
+        scene.play(FadeIn(item), run_time=0.6)
+    scene.wait(0.5)
+
+
+PRIMITIVES: Dict[str, Callable[[Scene, Dict], None]] = {
+    "title_card": title_card,
+    "function_plot": function_plot,
+    "secant_to_tangent": secant_to_tangent,
+    "formula": formula,
+    "bullet_list": bullet_list,
+}
+
+
+def make_scene(name: str, params: Dict) -> type:
+    """
+    Build a Scene class that renders one primitive
+
+    Args:
+        name: Primitive name
+        params: Primitive parameters (validated and completed here)
+
+    Returns:
+        Scene subclass for Manim to render
+    """
+    resolved = resolve_params(name, params)
+    draw = PRIMITIVES[name]
+
+    class PrimitiveScene(Scene):
+        def construct(self):
+            draw(self, resolved)
+
+    # Manim looks scenes up by class name, so every primitive is "PrimitiveScene"
+    return PrimitiveScene
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the API server
+Fails when importing main.py gets slow or starts pulling in heavy SDKs again.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--budget-ms 1500]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).parent.parent
+
+# Modules that must only be loaded on first use or during warmup
+HEAVY_MODULES = [
+    "vertexai",
+    "google.cloud.aiplatform",
+    "google.cloud.texttospeech",
+    "manim",
+]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\S.*)$")
+
+
+def measure_import(module: str = "main") -> dict:
+    """
+    Import a module in a fresh interpreter with -X importtime
+
+    Returns:
+        Dictionary with cumulative microseconds per imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(SERVER_DIR),
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, EDAPT_WARMUP="0"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(3).strip()] = int(match.group(2))
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API server import time")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    timings = []
+    loaded_heavy = set()
+    for _ in range(args.runs):
+        cumulative = measure_import(args.module)
+        timings.append(cumulative.get(args.module, 0) / 1000)
+        loaded_heavy.update(name for name in HEAVY_MODULES if name in cumulative)
+
+    median_ms = statistics.median(timings)
+    print(f"import {args.module}: median {median_ms:.1f} ms "
+          f"(min {min(timings):.1f}, max {max(timings):.1f}, runs {args.runs})")
+
+    failed = False
+    if loaded_heavy:
+        print(f"❌ Heavy modules imported eagerly: {', '.join(sorted(loaded_heavy))}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"❌ Import time over budget ({args.budget_ms:.0f} ms)")
+        failed = True
+
+    if not failed:
+        print("✅ Import time within budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
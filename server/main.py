@@ -1,21 +1,42 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
 from typing import Optional, Dict
 from pathlib import Path
+import importlib.util
+import threading
 import sys
 import uuid
 import json
+import os
+import re
+import shutil
 
 # Add agents to path
 sys.path.append(str(Path(__file__).parent))
+from agents.audio_stream import AudioSegmentStream
+from storage_manager import StorageArea, StorageManager, quota_from_env
 
-try:
-    from agents.orchestrator_agent import OrchestratorAgent
-    AGENTS_AVAILABLE = True
-except ImportError:
-    AGENTS_AVAILABLE = False
+
+def _module_installed(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+# Agent modules pull in the Vertex AI and Text-to-Speech SDKs, so only check
+# that they are installed here and import them on first use or during warmup
+# (Text-to-Speech is only needed for the default Google TTS backend)
+AGENTS_AVAILABLE = all(
+    _module_installed(module)
+    for module in ("vertexai", "google.cloud.texttospeech")
+    if module == "vertexai" or os.getenv("TTS_BACKEND", "google_async").startswith("google")
+)
+if not AGENTS_AVAILABLE:
     print("Warning: Agent modules not available. Using fallback mode.")
 
 # Initialize the FastAPI app
@@ -39,12 +60,133 @@ public_dir = Path(__file__).parent.parent / "public"
 public_dir.mkdir(parents=True, exist_ok=True)
 app.mount("/public", StaticFiles(directory=str(public_dir)), name="public")
 
-# Initialize orchestrator
-orchestrator = OrchestratorAgent() if AGENTS_AVAILABLE else None
+# Generated sessions live here whether or not the agents have been loaded
+output_dir = Path.cwd() / "generated_content"
+
+# Pre-rendered mindmap SVGs, named by content hash
+mindmap_svg_dir = output_dir / ".mindmap_svg"
+
+# Uploaded textbooks, ingested into the local retrieval corpus
+uploads_dir = Path(__file__).parent.parent / "Data" / "uploads"
+
+# Manim render directories and cached primitive clips (see AnimationAgent)
+media_dir = Path.cwd() / "media"
+
+# Orchestrator is constructed lazily (see get_orchestrator)
+orchestrator = None
+orchestrator_error: Optional[str] = None
+orchestrator_lock = threading.Lock()
 
 # In-memory storage for generation status
 generation_status: Dict[str, Dict] = {}
 
+# Narration audio of sessions still being generated, by temporary session ID
+audio_streams: Dict[str, AudioSegmentStream] = {}
+
+# Variants being generated, by "session_id/variant_id"
+variant_status: Dict[str, Dict] = {}
+
+# In-memory storage for textbook ingestion status
+ingestion_status: Dict[str, Dict] = {}
+
+
+def get_orchestrator():
+    """
+    Return the shared orchestrator, importing and constructing the agents on
+    first call. Returns None when the agents are unavailable or failed to load;
+    a failed construction is attempted again on the next call.
+    Blocks while building, so call it from a thread, not the event loop.
+    """
+    global orchestrator, orchestrator_error
+    
+    if orchestrator is not None or not AGENTS_AVAILABLE:
+        return orchestrator
+    
+    with orchestrator_lock:
+        if orchestrator is None:
+            try:
+                from agents.orchestrator_agent import OrchestratorAgent
+                orchestrator = OrchestratorAgent(output_dir=str(output_dir))
+                orchestrator_error = None
+            except Exception as e:
+                orchestrator_error = str(e)
+                print(f"Warning: Failed to initialize agents: {e}")
+    
+    return orchestrator
+
+
+async def require_orchestrator():
+    """
+    Return the shared orchestrator for a request handler without blocking
+    the event loop. Raises 503 while warmup is still building the agents or
+    when they cannot be built.
+    """
+    if orchestrator is not None:
+        return orchestrator
+    if not AGENTS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Agent services not available")
+    if orchestrator_lock.locked():
+        raise HTTPException(status_code=503, detail="Agent services are warming up",
+                            headers={"Retry-After": "5"})
+    
+    # Not built yet (warmup disabled) or the last attempt failed: try again
+    # in a worker thread
+    built = await run_in_threadpool(get_orchestrator)
+    if not built:
+        raise HTTPException(status_code=503,
+                            detail=f"Agent services not available: {orchestrator_error}")
+    return built
+
+
+def _pinned_entries(area: str) -> set:
+    """Sessions whose variants are still being generated must not be evicted"""
+    if area != "sessions":
+        return set()
+    return {key.split("/", 1)[0] for key in list(variant_status)}
+
+
+def _forget_evicted(area: str, name: str):
+    """Drop in-memory status of evicted sessions so they read as not found"""
+    if area == "sessions":
+        for key, status in list(generation_status.items()):
+            if status.get("session_id") == name:
+                generation_status.pop(key, None)
+
+
+# Disk quotas; a session's published copy is evicted together with it.
+# Sessions younger than an hour (e.g. still generating) are never evicted.
+storage_manager = StorageManager(
+    [
+        StorageArea("sessions", [str(output_dir), str(public_dir / "generated")],
+                    quota_bytes=quota_from_env("STORAGE_SESSIONS_QUOTA_MB", 4096),
+                    min_age=3600),
+        StorageArea("renders", [str(media_dir / "videos")],
+                    quota_bytes=quota_from_env("STORAGE_RENDERS_QUOTA_MB", 1024),
+                    max_age=float(os.getenv("STORAGE_RENDERS_MAX_AGE", "3600")), min_age=900),
+        StorageArea("clips", [str(media_dir / "clips")],
+                    quota_bytes=quota_from_env("STORAGE_CLIPS_QUOTA_MB", 1024), min_age=300),
+        StorageArea("mindmaps", [str(mindmap_svg_dir)],
+                    quota_bytes=quota_from_env("STORAGE_MINDMAPS_QUOTA_MB", 64)),
+    ],
+    interval=float(os.getenv("STORAGE_COMPACT_INTERVAL", "600")),
+    pinned=_pinned_entries,
+    on_evict=_forget_evicted
+)
+
+
+@app.on_event("startup")
+async def start_storage_manager():
+    """Compact storage in the background"""
+    if os.getenv("STORAGE_COMPACTION", "1") != "0":
+        storage_manager.start()
+
+
+@app.on_event("startup")
+async def warm_up_agents():
+    """Build the agents in a background thread so startup is not blocked"""
+    if AGENTS_AVAILABLE and os.getenv("EDAPT_WARMUP", "1") != "0":
+        threading.Thread(target=get_orchestrator, name="agent-warmup", daemon=True).start()
+
 
 class ContentRequest(BaseModel):
     query: str
@@ -53,6 +195,13 @@ class ContentRequest(BaseModel):
     include_video: bool = True
 
 
+class VariantRequest(BaseModel):
+    voice_name: str
+    language_code: Optional[str] = None
+    gender: str = "NEUTRAL"
+    translate: Optional[bool] = None
+
+
 class ContentResponse(BaseModel):
     session_id: str
     status: str
@@ -65,17 +214,46 @@ async def root():
         "service": "Edapt Learning Content API",
         "version": "2.0.0",
         "status": "running",
-        "agents_available": AGENTS_AVAILABLE
+        "agents_available": AGENTS_AVAILABLE,
+        "agents_ready": orchestrator is not None
     }
 
 
+@app.get("/healthz")
+async def liveness():
+    """
+    Liveness probe: the process is up and serving requests
+    """
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+async def readiness():
+    """
+    Readiness probe: agents are constructed and can accept generation work
+    """
+    if orchestrator is not None:
+        return {"status": "ready"}
+    
+    if not AGENTS_AVAILABLE:
+        state = "unavailable"
+    elif orchestrator_error:
+        state = "failed"
+    else:
+        state = "warming_up"
+    
+    return JSONResponse(
+        status_code=503,
+        content={"status": state, "error": orchestrator_error}
+    )
+
+
 @app.post("/api/generate-content", response_model=ContentResponse)
 async def generate_content(request: ContentRequest, background_tasks: BackgroundTasks):
     """
     Generate complete learning content from user query using AI agents
     """
-    if not AGENTS_AVAILABLE or not orchestrator:
-        raise HTTPException(status_code=503, detail="Agent services not available")
+    orchestrator = await require_orchestrator()
     
     try:
         # Generate temporary session ID
@@ -86,6 +264,8 @@ async def generate_content(request: ContentRequest, background_tasks: Background
             "status": "processing",
             "query": request.query
         }
+        audio_stream = AudioSegmentStream()
+        audio_streams[temp_session_id] = audio_stream
         
         def generate_in_background():
             try:
@@ -93,7 +273,8 @@ async def generate_content(request: ContentRequest, background_tasks: Background
                     user_query=request.query,
                     narrative_style=request.narrative_style,
                     target_duration=request.target_duration,
-                    include_video=request.include_video
+                    include_video=request.include_video,
+                    audio_stream=audio_stream
                 )
                 
                 actual_session_id = result["session_id"]
@@ -112,13 +293,19 @@ async def generate_content(request: ContentRequest, background_tasks: Background
                     "status": "failed",
                     "error": str(e)
                 }
+            finally:
+                # Listeners already attached keep their reference; later
+                # requests are served from narration.mp3
+                audio_stream.close()
+                audio_streams.pop(temp_session_id, None)
         
         background_tasks.add_task(generate_in_background)
         
         return ContentResponse(
             session_id=temp_session_id,
             status="processing",
-            message="Content generation started. Check status with /api/status/{session_id}"
+            message="Content generation started. Check status with /api/status/{session_id}. "
+                    "Narration can be played from /api/audio-stream/{session_id} as it is synthesized"
         )
         
     except Exception as e:
@@ -148,6 +335,13 @@ async def get_status(session_id: str):
     }
 
 
+def _public_url(session_id: str, filename: str) -> Optional[str]:
+    """URL of a published session asset, or None if it was not generated"""
+    if (public_dir / "generated" / session_id / filename).exists():
+        return f"/public/generated/{session_id}/{filename}"
+    return None
+
+
 @app.get("/api/content/{session_id}")
 async def get_content(session_id: str):
     """
@@ -167,43 +361,117 @@ async def get_content(session_id: str):
     
     # Get actual session ID
     actual_session_id = result.get("session_id", session_id)
+    storage_manager.touch("sessions", actual_session_id)
     
     # Read mindmap content
     mindmap_code = None
-    if orchestrator:
-        mindmap_file = Path(orchestrator.output_dir) / actual_session_id / "mindmap.txt"
-        if mindmap_file.exists():
-            mindmap_code = mindmap_file.read_text()
-        
-        # Read metadata
-        metadata_file = Path(orchestrator.output_dir) / actual_session_id / "metadata.json"
-        metadata = {}
-        if metadata_file.exists():
-            with open(metadata_file) as f:
-                metadata = json.load(f)
+    mindmap_file = output_dir / actual_session_id / "mindmap.txt"
+    if mindmap_file.exists():
+        mindmap_code = mindmap_file.read_text()
+    
+    # Read metadata
+    metadata_file = output_dir / actual_session_id / "metadata.json"
+    metadata = {}
+    if metadata_file.exists():
+        with open(metadata_file) as f:
+            metadata = json.load(f)
     
     return {
         "session_id": actual_session_id,
         "status": "completed",
         "topic": result.get("topic"),
         "mindmap_code": mindmap_code,
+        "mindmap_svg_url": f"/api/content/{actual_session_id}/mindmap.svg" if mindmap_code else None,
         "audio_url": f"/public/generated/{actual_session_id}/narration.mp3",
         "video_url": f"/public/generated/{actual_session_id}/video.mp4",
+        "poster_url": _public_url(actual_session_id, "poster.jpg"),
+        "preview_url": _public_url(actual_session_id, "preview.gif"),
         "narrative": result.get("content", {}).get("narrative", {}),
         "assets": result.get("assets", {})
     }
 
 
+@app.get("/api/audio-stream/{session_id}")
+async def stream_audio(session_id: str):
+    """
+    Stream a session's narration while it is still being synthesized.
+    Segments are sent as soon as they are ready; once generation has
+    finished the complete narration.mp3 is served instead.
+    """
+    audio_stream = audio_streams.get(session_id)
+    if audio_stream is not None:
+        return StreamingResponse(
+            audio_stream.iter_chunks(),
+            media_type=audio_stream.media_type,
+            headers={"Cache-Control": "no-store"}
+        )
+    
+    if session_id not in generation_status:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    actual_session_id = generation_status[session_id].get("session_id", session_id)
+    storage_manager.touch("sessions", actual_session_id)
+    audio_file = output_dir / actual_session_id / "narration.mp3"
+    if not audio_file.exists():
+        raise HTTPException(status_code=404, detail="Narration not available")
+    return FileResponse(audio_file, media_type="audio/mpeg")
+
+
+@app.get("/api/content/{session_id}/mindmap.svg")
+async def get_mindmap_svg(session_id: str):
+    """
+    Redirect to the pre-rendered SVG of a session's mindmap, rendering it on
+    first request
+    """
+    if session_id in generation_status:
+        session_id = generation_status[session_id].get("session_id", session_id)
+    if not re.fullmatch(r"[A-Za-z0-9._-]+", session_id):
+        raise HTTPException(status_code=400, detail="Invalid session_id")
+    
+    mindmap_file = output_dir / session_id / "mindmap.txt"
+    if not mindmap_file.exists():
+        raise HTTPException(status_code=404, detail="Mindmap not found")
+    
+    from mindmap.mindmap_svg import get_mindmap_svg as render_mindmap_svg
+    try:
+        mindmap_hash, _ = render_mindmap_svg(mindmap_file.read_text(), str(mindmap_svg_dir))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return RedirectResponse(
+        f"/api/mindmaps/{mindmap_hash}.svg",
+        status_code=307,
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.get("/api/mindmaps/{mindmap_hash}.svg")
+async def get_mindmap_svg_by_hash(mindmap_hash: str):
+    """
+    Serve a pre-rendered mindmap SVG. The URL is a content hash, so the
+    response never changes and can be cached indefinitely.
+    """
+    if not re.fullmatch(r"[0-9a-f]{32}", mindmap_hash):
+        raise HTTPException(status_code=400, detail="Invalid mindmap hash")
+    
+    svg_file = mindmap_svg_dir / f"{mindmap_hash}.svg"
+    if not svg_file.exists():
+        raise HTTPException(status_code=404, detail="Mindmap SVG not found")
+    
+    return FileResponse(
+        svg_file,
+        media_type="image/svg+xml",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+
 @app.get("/api/sessions")
 async def list_sessions():
     """
     List all generation sessions
     """
-    if not orchestrator:
-        return {"sessions": []}
-    
     sessions = []
-    session_dir = orchestrator.output_dir
+    session_dir = output_dir
     
     if session_dir.exists():
         for item in session_dir.iterdir():
@@ -217,12 +485,198 @@ async def list_sessions():
                         "topic": metadata.get("topic"),
                         "status": metadata.get("status"),
                         "timestamp": metadata.get("timestamp"),
-                        "query": metadata.get("user_query")
+                        "query": metadata.get("user_query"),
+                        "poster_url": _public_url(item.name, "poster.jpg"),
+                        "preview_url": _public_url(item.name, "preview.gif")
                     })
     
     return {"sessions": sessions}
 
 
+def _resolve_session_dir(session_id: str) -> Path:
+    """Map a temporary or actual session ID to its directory"""
+    if session_id in generation_status:
+        session_id = generation_status[session_id].get("session_id", session_id)
+    if not re.fullmatch(r"[A-Za-z0-9._-]+", session_id):
+        raise HTTPException(status_code=400, detail="Invalid session_id")
+    
+    session_dir = output_dir / session_id
+    if not (session_dir / "metadata.json").exists():
+        raise HTTPException(status_code=404, detail="Session not found")
+    storage_manager.touch("sessions", session_id)
+    return session_dir
+
+
+@app.post("/api/sessions/{session_id}/variants")
+async def create_variant(session_id: str, request: VariantRequest,
+                         background_tasks: BackgroundTasks):
+    """
+    Re-voice a finished session in another voice or language. Only the
+    narration is synthesized again; it is re-muxed onto the session's
+    rendered video, so no content generation or rendering is repeated.
+    """
+    session_dir = _resolve_session_dir(session_id)
+    orchestrator = await require_orchestrator()
+    
+    try:
+        variant_id = orchestrator.variant_id(request.voice_name, request.language_code,
+                                             request.translate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    key = f"{session_dir.name}/{variant_id}"
+    variant_file = session_dir / "variants" / variant_id / "variant.json"
+    if variant_file.exists():
+        with open(variant_file) as f:
+            variant = json.load(f)
+        if variant.get("status") == "completed":
+            return variant
+    if variant_status.get(key, {}).get("status") == "processing":
+        return variant_status[key]
+    
+    variant_status[key] = {
+        "session_id": session_dir.name,
+        "variant_id": variant_id,
+        "voice_name": request.voice_name,
+        "status": "processing"
+    }
+    
+    def generate_in_background():
+        try:
+            orchestrator.generate_variant(
+                session_id=session_dir.name,
+                voice_name=request.voice_name,
+                language_code=request.language_code,
+                gender=request.gender,
+                translate=request.translate
+            )
+        finally:
+            # Finished variants are read back from variant.json
+            variant_status.pop(key, None)
+    
+    background_tasks.add_task(generate_in_background)
+    return variant_status[key]
+
+
+@app.get("/api/sessions/{session_id}/variants")
+async def list_variants(session_id: str):
+    """
+    List a session's voice/language variants and their status
+    """
+    session_dir = _resolve_session_dir(session_id)
+    
+    variants = [
+        status for key, status in variant_status.items()
+        if key.startswith(f"{session_dir.name}/")
+    ]
+    for variant_file in sorted(session_dir.glob("variants/*/variant.json")):
+        with open(variant_file) as f:
+            variant = json.load(f)
+        if any(v["variant_id"] == variant["variant_id"] for v in variants):
+            continue
+        base_url = f"/api/sessions/{session_dir.name}/variants/{variant['variant_id']}"
+        variants.append({
+            "variant_id": variant["variant_id"],
+            "voice_name": variant.get("voice_name"),
+            "language_code": variant.get("language_code"),
+            "translated": variant.get("translated"),
+            "status": variant.get("status"),
+            "error": variant.get("error"),
+            "duration": variant.get("assets", {}).get("audio", {}).get("duration"),
+            "audio_url": f"{base_url}/narration.mp3" if "audio" in variant.get("assets", {}) else None,
+            "video_url": f"{base_url}/final_video.mp4"
+            if "path" in variant.get("assets", {}).get("video", {}) else None
+        })
+    
+    return {"session_id": session_dir.name, "variants": variants}
+
+
+@app.get("/api/sessions/{session_id}/variants/{variant_id}/{filename}")
+async def get_variant_asset(session_id: str, variant_id: str, filename: str):
+    """
+    Serve a variant's narration or video
+    """
+    media_types = {"narration.mp3": "audio/mpeg", "final_video.mp4": "video/mp4",
+                   "variant.json": "application/json"}
+    if filename not in media_types or not re.fullmatch(r"[A-Za-z0-9_-][A-Za-z0-9._-]*", variant_id):
+        raise HTTPException(status_code=400, detail="Invalid variant asset")
+    
+    asset_file = _resolve_session_dir(session_id) / "variants" / variant_id / filename
+    if not asset_file.exists():
+        raise HTTPException(status_code=404, detail="Variant asset not found")
+    return FileResponse(asset_file, media_type=media_types[filename])
+
+
+@app.get("/api/storage")
+async def get_storage_metrics():
+    """
+    Storage usage, quotas, evictions and bytes reclaimed per area
+    """
+    return storage_manager.metrics()
+
+
+@app.post("/api/storage/compact")
+async def compact_storage(background_tasks: BackgroundTasks):
+    """
+    Run a storage compaction now, in the background
+    """
+    background_tasks.add_task(storage_manager.compact)
+    return {"status": "scheduled"}
+
+
+@app.post("/api/textbooks")
+async def upload_textbook(background_tasks: BackgroundTasks,
+                          file: UploadFile = File(...),
+                          document_id: Optional[str] = None):
+    """
+    Upload a textbook PDF and ingest it into the local retrieval corpus.
+    Re-uploading a revised edition with the same document_id only processes
+    the pages that changed.
+    """
+    if not (file.filename or "").lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF textbooks are supported")
+    
+    document_id = document_id or Path(file.filename).stem
+    if not re.fullmatch(r"[A-Za-z0-9._-]+", document_id):
+        raise HTTPException(status_code=400, detail="Invalid document_id")
+    
+    uploads_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = uploads_dir / f"{document_id}.pdf"
+    with open(pdf_path, "wb") as out:
+        shutil.copyfileobj(file.file, out)
+    
+    ingestion_status[document_id] = {"document_id": document_id, "status": "processing"}
+    
+    def ingest_in_background():
+        try:
+            from mindmap.ingestion import ingest_pdf
+            stats = ingest_pdf(str(pdf_path), document_id=document_id)
+            ingestion_status[document_id] = {**stats, "status": "completed"}
+        except Exception as e:
+            ingestion_status[document_id] = {
+                "document_id": document_id,
+                "status": "failed",
+                "error": str(e)
+            }
+    
+    background_tasks.add_task(ingest_in_background)
+    
+    return {
+        "document_id": document_id,
+        "status": "processing",
+        "message": "Ingestion started. Check status with /api/textbooks/{document_id}"
+    }
+
+
+@app.get("/api/textbooks/{document_id}")
+async def get_textbook_status(document_id: str):
+    """
+    Get ingestion status for an uploaded textbook
+    """
+    if document_id not in ingestion_status:
+        raise HTTPException(status_code=404, detail="Textbook not found")
+    return ingestion_status[document_id]
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
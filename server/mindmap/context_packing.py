@@ -0,0 +1,140 @@
+"""
+Context packing for retrieval-augmented prompts
+Dedupes overlapping chunks, reranks them with BM25 + MMR and packs the best
+ones into a token budget before they are sent to the LLM.
+"""
+
+import math
+from typing import List, Sequence, Set
+
+from agents.prompt_templates import CHARS_PER_TOKEN, estimate_tokens
+from mindmap.text_utils import tokenize
+
+# BM25 parameters for scoring within the retrieved set
+K1 = 1.2
+B = 0.75
+
+SHINGLE_SIZE = 5
+
+
+def _shingles(tokens: Sequence[str]) -> Set[tuple]:
+    if len(tokens) < SHINGLE_SIZE:
+        return {tuple(tokens)} if tokens else set()
+    return {tuple(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def _jaccard(a: Set, b: Set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def bm25_scores(query: str, documents: List[List[str]]) -> List[float]:
+    """
+    Score tokenized documents against a query, using the documents themselves
+    as the corpus for IDF and average length
+
+    Args:
+        query: User query
+        documents: Token lists
+
+    Returns:
+        One score per document
+    """
+    query_terms = set(tokenize(query))
+    if not documents or not query_terms:
+        return [0.0] * len(documents)
+
+    num_docs = len(documents)
+    avg_length = sum(len(doc) for doc in documents) / num_docs or 1.0
+    doc_freq = {term: sum(1 for doc in documents if term in doc) for term in query_terms}
+
+    scores = []
+    for doc in documents:
+        counts = {}
+        for token in doc:
+            if token in query_terms:
+                counts[token] = counts.get(token, 0) + 1
+        score = 0.0
+        for term, tf in counts.items():
+            idf = math.log1p((num_docs - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * len(doc) / avg_length))
+        scores.append(score)
+    return scores
+
+
+def _truncate(text: str, token_budget: int) -> str:
+    """Cut text to roughly token_budget tokens, on a word boundary if possible"""
+    limit = max(0, token_budget) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    return cut.rsplit(" ", 1)[0] if " " in cut else cut
+
+
+def pack_contexts(query: str, contexts: List[str], token_budget: int = 3000,
+                  duplicate_threshold: float = 0.6, diversity: float = 0.3) -> List[str]:
+    """
+    Select, order and pack retrieved contexts for a prompt
+
+    1. Near-duplicates (shingle Jaccard >= duplicate_threshold) are dropped,
+       keeping the first occurrence.
+    2. Remaining chunks are ordered by maximal marginal relevance: BM25
+       relevance to the query, minus `diversity` times the highest term
+       overlap with a chunk already selected.
+    3. Chunks are added in that order while they fit in token_budget. The
+       first (most useful) chunk is always kept, cut to the budget if it
+       does not fit on its own.
+
+    Args:
+        query: User query
+        contexts: Retrieved chunk texts, best first
+        token_budget: Approximate token limit for the packed contexts
+        duplicate_threshold: Similarity above which chunks count as duplicates
+        diversity: MMR trade-off between relevance (0) and novelty (1)
+
+    Returns:
+        Packed contexts, most useful first
+    """
+    tokenized, shingles, unique = [], [], []
+    for text in contexts:
+        tokens = tokenize(text)
+        text_shingles = _shingles(tokens)
+        if any(_jaccard(text_shingles, seen) >= duplicate_threshold for seen in shingles):
+            continue
+        tokenized.append(tokens)
+        shingles.append(text_shingles)
+        unique.append(text)
+
+    if not unique:
+        return []
+
+    relevance = bm25_scores(query, tokenized)
+    top_score = max(relevance) or 1.0
+    relevance = [score / top_score for score in relevance]
+    term_sets = [set(tokens) for tokens in tokenized]
+
+    selected, packed = [], []
+    remaining = list(range(len(unique)))
+    used_tokens = 0
+
+    while remaining:
+        def mmr(i):
+            redundancy = max((_jaccard(term_sets[i], term_sets[j]) for j in selected), default=0.0)
+            return (1 - diversity) * relevance[i] - diversity * redundancy
+
+        best = max(remaining, key=mmr)
+        remaining.remove(best)
+
+        text = unique[best]
+        cost = estimate_tokens(text)
+        if used_tokens + cost > token_budget:
+            if packed:
+                continue
+            text = _truncate(text, token_budget)
+            cost = estimate_tokens(text)
+        used_tokens += cost
+        selected.append(best)
+        packed.append(text)
+
+    return packed
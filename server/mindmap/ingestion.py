@@ -0,0 +1,230 @@
+"""
+Incremental textbook ingestion for the local retrieval corpus
+Streams PDFs page by page, chunks with overlap, dedupes chunks by content hash
+and only reprocesses pages whose text changed since the last ingestion.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from mindmap.local_rag import (
+    DEFAULT_INDEX_DIR,
+    build_index,
+    chunk_text,
+    iter_pdf_pages,
+    reload_local_index,
+    term_counts,
+)
+
+WHITESPACE = re.compile(r"\s+")
+
+_ingest_lock = threading.Lock()
+
+
+def content_hash(text: str) -> str:
+    """Hash of text with case and whitespace normalized"""
+    normalized = WHITESPACE.sub(" ", text).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+class ChunkStore:
+    """
+    Append-only store of unique chunks plus a manifest of ingested pages
+
+    chunks.jsonl holds one record per distinct chunk hash with its text and
+    precomputed term counts. manifest.json maps each document's pages to a
+    page hash and the chunk hashes it produced, which is what lets a revised
+    edition skip unchanged pages.
+    """
+
+    def __init__(self, index_dir: Path = DEFAULT_INDEX_DIR):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.chunks_file = self.index_dir / "chunks.jsonl"
+        self.manifest_file = self.index_dir / "manifest.json"
+
+        self.manifest = {"documents": {}}
+        if self.manifest_file.exists():
+            self.manifest = json.loads(self.manifest_file.read_text())
+
+        # Only hashes are kept in memory; texts stay on disk until a rebuild
+        self.known_hashes = set()
+        if self.chunks_file.exists():
+            with open(self.chunks_file) as f:
+                for line in f:
+                    self.known_hashes.add(json.loads(line)["hash"])
+
+    def add_batch(self, records: List[Dict]):
+        """
+        Compute term counts for a batch of new chunks and append them
+
+        Args:
+            records: Dictionaries with hash, text, source and page
+        """
+        if not records:
+            return
+        with open(self.chunks_file, "a") as f:
+            for record in records:
+                record["terms"] = term_counts(record["text"])
+                f.write(json.dumps(record) + "\n")
+                self.known_hashes.add(record["hash"])
+
+    def save_manifest(self):
+        tmp_file = self.manifest_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(self.manifest))
+        os.replace(tmp_file, self.manifest_file)
+
+    def referenced_hashes(self) -> List[str]:
+        """Chunk hashes in document/page order, each listed once"""
+        ordered, seen = [], set()
+        for document in self.manifest["documents"].values():
+            for page in sorted(document["page_chunks"], key=int):
+                for chunk_hash in document["page_chunks"][page]:
+                    if chunk_hash not in seen:
+                        seen.add(chunk_hash)
+                        ordered.append(chunk_hash)
+        return ordered
+
+    def rebuild_index(self) -> Path:
+        """
+        Rebuild the BM25 arrays from stored term counts and drop chunks no
+        page references any more. Nothing is re-parsed or re-tokenized.
+
+        Returns:
+            Path to the new index version directory
+        """
+        order = self.referenced_hashes()
+        wanted = set(order)
+
+        records = {}
+        with open(self.chunks_file) as f:
+            for line in f:
+                record = json.loads(line)
+                if record["hash"] in wanted and record["hash"] not in records:
+                    records[record["hash"]] = record
+
+        chunks = [records[chunk_hash] for chunk_hash in order if chunk_hash in records]
+
+        if len(records) < len(self.known_hashes):
+            tmp_file = self.chunks_file.with_suffix(".tmp")
+            with open(tmp_file, "w") as f:
+                for record in chunks:
+                    f.write(json.dumps(record) + "\n")
+            os.replace(tmp_file, self.chunks_file)
+            self.known_hashes = set(records)
+
+        return build_index(chunks, self.index_dir)
+
+
+def ingest_pdf(pdf_path: str, document_id: Optional[str] = None,
+               index_dir: Path = DEFAULT_INDEX_DIR, chunk_words: int = 180,
+               overlap_words: int = 40, batch_size: int = 64,
+               reload: bool = True) -> Dict:
+    """
+    Add or update a textbook in the local retrieval corpus
+
+    Args:
+        pdf_path: PDF to ingest
+        document_id: Stable identifier for the book (defaults to the file stem);
+                     re-ingesting a new edition under the same id only
+                     processes pages whose text changed
+        index_dir: Local index directory
+        chunk_words: Words per chunk
+        overlap_words: Overlap between consecutive chunks
+        batch_size: Chunks per term-count/append batch
+        reload: Reopen the shared in-process index after a rebuild
+
+    Returns:
+        Ingestion statistics
+    """
+    pdf_path = Path(pdf_path)
+    document_id = document_id or pdf_path.stem
+
+    stats = {
+        "document_id": document_id,
+        "pages": 0,
+        "pages_changed": 0,
+        "pages_removed": 0,
+        "chunks_added": 0,
+        "chunks_deduplicated": 0,
+        "index_version": None,
+    }
+
+    with _ingest_lock:
+        store = ChunkStore(index_dir)
+        document = store.manifest["documents"].get(document_id) or {
+            "source": pdf_path.name, "pages": {}, "page_chunks": {}
+        }
+        document["source"] = pdf_path.name
+
+        seen_pages = set()
+        batch, pending = [], set()
+
+        for page_number, page_text in iter_pdf_pages(str(pdf_path)):
+            page_key = str(page_number)
+            seen_pages.add(page_key)
+            stats["pages"] += 1
+
+            page_hash = content_hash(page_text)
+            if document["pages"].get(page_key) == page_hash:
+                continue
+            stats["pages_changed"] += 1
+
+            chunk_hashes = []
+            for text in chunk_text(page_text, chunk_words, overlap_words):
+                chunk_hash = content_hash(text)
+                chunk_hashes.append(chunk_hash)
+                if chunk_hash in store.known_hashes or chunk_hash in pending:
+                    stats["chunks_deduplicated"] += 1
+                    continue
+
+                pending.add(chunk_hash)
+                batch.append({
+                    "hash": chunk_hash,
+                    "text": text,
+                    "source": pdf_path.name,
+                    "page": page_number,
+                })
+                if len(batch) >= batch_size:
+                    store.add_batch(batch)
+                    stats["chunks_added"] += len(batch)
+                    batch = []
+
+            document["pages"][page_key] = page_hash
+            document["page_chunks"][page_key] = chunk_hashes
+
+        store.add_batch(batch)
+        stats["chunks_added"] += len(batch)
+
+        # Pages dropped from a revised edition
+        for page_key in set(document["pages"]) - seen_pages:
+            del document["pages"][page_key]
+            del document["page_chunks"][page_key]
+            stats["pages_removed"] += 1
+
+        store.manifest["documents"][document_id] = document
+        if stats["pages_changed"] or stats["pages_removed"] or not (Path(index_dir) / "CURRENT").exists():
+            store.save_manifest()
+            version_dir = store.rebuild_index()
+            stats["index_version"] = version_dir.name
+            if reload:
+                reload_local_index(index_dir)
+
+    print(f"Ingested {document_id}: {stats['pages_changed']}/{stats['pages']} pages changed, "
+          f"{stats['chunks_added']} chunks added, {stats['chunks_deduplicated']} deduplicated")
+    return stats
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python mindmap/ingestion.py <textbook.pdf> [document_id]")
+        sys.exit(1)
+
+    ingest_pdf(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,405 @@
+"""
+Local retrieval engine over textbook PDFs
+Offline alternative to the Vertex RAG corpus: PDF text is chunked and indexed
+with BM25 in memory-mapped NumPy arrays, so a query is a handful of vector
+adds over the postings of its terms.
+"""
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from mindmap.text_utils import tokenize
+
+DEFAULT_INDEX_DIR = Path(__file__).parent.parent / "rag_index"
+DEFAULT_PDF = Path(__file__).parent.parent.parent / "Data" / "biology-textbook.pdf"
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def iter_pdf_pages(pdf_path: str) -> Iterator[Tuple[int, str]]:
+    """
+    Extract text from a PDF one page at a time
+
+    Pages are parsed lazily and their text is handed off immediately, so
+    callers never hold more than one page of text.
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Yields:
+        (page_number, page_text) with 1-based page numbers
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ImportError("pypdf is required for PDF ingestion: pip install pypdf")
+
+    reader = PdfReader(pdf_path)
+    for page_number, page in enumerate(reader.pages, 1):
+        yield page_number, page.extract_text() or ""
+
+
+def chunk_text(text: str, chunk_words: int = 180, overlap_words: int = 40) -> List[str]:
+    """
+    Split text into overlapping word windows
+
+    Args:
+        text: Text to split
+        chunk_words: Words per chunk
+        overlap_words: Words shared between consecutive chunks
+
+    Returns:
+        List of chunk strings
+    """
+    words = text.split()
+    if not words:
+        return []
+
+    step = max(1, chunk_words - overlap_words)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words):
+            break
+    return chunks
+
+
+def term_counts(text: str) -> Dict[str, int]:
+    """Token frequencies of a chunk, the unit stored by the ingestion pipeline"""
+    counts: Dict[str, int] = {}
+    for token in tokenize(text):
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def current_version_dir(index_dir: Path = DEFAULT_INDEX_DIR) -> Optional[Path]:
+    """Directory of the index version named by CURRENT, if one has been built"""
+    pointer = Path(index_dir) / "CURRENT"
+    if not pointer.exists():
+        return None
+    return Path(index_dir) / pointer.read_text().strip()
+
+
+def build_index(chunks: List[Dict], index_dir: Path = DEFAULT_INDEX_DIR) -> Path:
+    """
+    Build a BM25 index over chunks and write it as .npy files
+
+    Postings are stored grouped by term (CSR layout): term_ptr[t]:term_ptr[t+1]
+    slices doc_ids/weights for term t. Weights already include IDF and length
+    normalization so queries only add them up.
+
+    Each build goes into a new versioned subdirectory and CURRENT is swapped
+    atomically, so readers that have the previous version memory-mapped are
+    never handed truncated files.
+
+    Args:
+        chunks: Dictionaries with "text", optional "source"/"page" and
+                optional precomputed "terms" (see term_counts)
+        index_dir: Directory to write the index to
+
+    Returns:
+        Path to the new index version directory
+    """
+    index_dir = Path(index_dir)
+    previous_dir = current_version_dir(index_dir)
+    version = int(previous_dir.name[1:]) + 1 if previous_dir else 1
+    version_dir = index_dir / f"v{version}"
+    version_dir.mkdir(parents=True, exist_ok=True)
+
+    vocab: Dict[str, int] = {}
+    term_ids, doc_ids, term_freqs = [], [], []
+    doc_lengths = np.zeros(len(chunks), dtype=np.float32)
+
+    for doc_id, chunk in enumerate(chunks):
+        counts = chunk.get("terms") or term_counts(chunk["text"])
+        for token, count in counts.items():
+            term_ids.append(vocab.setdefault(token, len(vocab)))
+            term_freqs.append(count)
+        doc_lengths[doc_id] = sum(counts.values())
+        doc_ids.extend([doc_id] * len(counts))
+
+    term_ids = np.asarray(term_ids, dtype=np.int32)
+    doc_ids = np.asarray(doc_ids, dtype=np.int32)
+    term_freqs = np.asarray(term_freqs, dtype=np.float32)
+
+    num_docs = max(len(chunks), 1)
+    avg_length = float(doc_lengths.mean()) if len(chunks) else 1.0
+    doc_freq = np.bincount(term_ids, minlength=len(vocab)).astype(np.float32)
+    idf = np.log1p((num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    length_norm = K1 * (1 - B + B * doc_lengths[doc_ids] / max(avg_length, 1.0))
+    weights = idf[term_ids] * term_freqs * (K1 + 1) / (term_freqs + length_norm)
+
+    order = np.argsort(term_ids, kind="stable")
+    term_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(doc_freq.astype(np.int64), out=term_ptr[1:])
+
+    # Best weight per term, used to turn scores into a [0, 1] distance
+    max_weight = np.zeros(len(vocab), dtype=np.float32)
+    np.maximum.at(max_weight, term_ids, weights.astype(np.float32))
+
+    np.save(version_dir / "term_ptr.npy", term_ptr)
+    np.save(version_dir / "doc_ids.npy", doc_ids[order])
+    np.save(version_dir / "weights.npy", weights[order].astype(np.float32))
+    np.save(version_dir / "max_weight.npy", max_weight)
+
+    # Chunk texts live in one blob so a query only reads the hits it returns
+    encoded = [chunk["text"].encode("utf-8") for chunk in chunks]
+    text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=text_offsets[1:])
+    (version_dir / "texts.bin").write_bytes(b"".join(encoded))
+    np.save(version_dir / "text_offsets.npy", text_offsets)
+
+    meta = {
+        "version": version,
+        "num_chunks": len(chunks),
+        "sources": [
+            {"source": chunk.get("source"), "page": chunk.get("page")} for chunk in chunks
+        ],
+    }
+    (version_dir / "vocab.json").write_text(json.dumps(vocab))
+    (version_dir / "meta.json").write_text(json.dumps(meta))
+
+    pointer_tmp = index_dir / "CURRENT.tmp"
+    pointer_tmp.write_text(version_dir.name)
+    os.replace(pointer_tmp, index_dir / "CURRENT")
+
+    # Keep the previous version for readers still holding it, drop older ones
+    for old_dir in index_dir.glob("v*"):
+        if old_dir.is_dir() and old_dir not in (version_dir, previous_dir):
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    return version_dir
+
+
+def build_index_from_pdfs(pdf_paths: Iterable[str], index_dir: Path = DEFAULT_INDEX_DIR,
+                          chunk_words: int = 180, overlap_words: int = 40) -> Path:
+    """
+    Chunk one or more PDFs and build the local index
+
+    Args:
+        pdf_paths: PDF files to index
+        index_dir: Directory to write the index to
+        chunk_words: Words per chunk
+        overlap_words: Overlap between consecutive chunks
+
+    Returns:
+        Path to the index directory
+    """
+    chunks = []
+    for pdf_path in pdf_paths:
+        for page_number, page_text in iter_pdf_pages(str(pdf_path)):
+            for text in chunk_text(page_text, chunk_words, overlap_words):
+                chunks.append({"text": text, "source": Path(pdf_path).name, "page": page_number})
+
+    print(f"Indexed {len(chunks)} chunks into {index_dir}")
+    return build_index(chunks, index_dir)
+
+
+class LocalRAGIndex:
+    """Memory-mapped BM25 index with Vertex-style top_k/distance-threshold search"""
+
+    def __init__(self, index_dir: Path = DEFAULT_INDEX_DIR):
+        """
+        Open the current version of an index written by build_index
+
+        Args:
+            index_dir: Directory containing the index versions
+        """
+        self.index_dir = Path(index_dir)
+        version_dir = current_version_dir(self.index_dir)
+        if version_dir is None:
+            raise FileNotFoundError(f"No local RAG index in {self.index_dir}")
+
+        self.term_ptr = np.load(version_dir / "term_ptr.npy", mmap_mode="r")
+        self.doc_ids = np.load(version_dir / "doc_ids.npy", mmap_mode="r")
+        self.weights = np.load(version_dir / "weights.npy", mmap_mode="r")
+        self.max_weight = np.load(version_dir / "max_weight.npy", mmap_mode="r")
+        self.text_offsets = np.load(version_dir / "text_offsets.npy", mmap_mode="r")
+        self.texts = np.memmap(version_dir / "texts.bin", dtype=np.uint8, mode="r") \
+            if self.text_offsets[-1] else np.zeros(0, dtype=np.uint8)
+        self.vocab: Dict[str, int] = json.loads((version_dir / "vocab.json").read_text())
+        self.meta = json.loads((version_dir / "meta.json").read_text())
+        self.version = self.meta["version"]
+        self.num_chunks = self.meta["num_chunks"]
+
+    def get_text(self, chunk_id: int) -> str:
+        """Decode one chunk's text from the memory-mapped blob"""
+        start, end = self.text_offsets[chunk_id], self.text_offsets[chunk_id + 1]
+        return self.texts[start:end].tobytes().decode("utf-8")
+
+    def search(self, query: str, top_k: int = 5,
+               vector_distance_threshold: Optional[float] = 0.5) -> List[Dict]:
+        """
+        Return the best chunks for a query
+
+        Distance is 1 - score / best_possible_score, where the best possible
+        score sums each query term's highest weight in the corpus. It is 0 for
+        a chunk that is the top match for every term and 1 for no overlap, so
+        the threshold keeps the same "lower is closer" meaning as Vertex RAG.
+
+        Args:
+            query: User query
+            top_k: Maximum number of chunks to return
+            vector_distance_threshold: Drop chunks farther than this (None keeps all)
+
+        Returns:
+            List of dictionaries with text, distance, source and page
+        """
+        return self.search_batch([query], top_k, vector_distance_threshold)[0]
+
+    def search_batch(self, queries: List[str], top_k: int = 5,
+                     vector_distance_threshold: Optional[float] = 0.5) -> List[List[Dict]]:
+        """
+        Search many queries in one pass over the postings
+
+        Each distinct term's postings are read once and added to the score
+        rows of every query that contains it.
+
+        Args:
+            queries: User queries
+            top_k: Maximum number of chunks per query
+            vector_distance_threshold: Drop chunks farther than this (None keeps all)
+
+        Returns:
+            One result list per query, as returned by search
+        """
+        query_terms = [
+            {self.vocab[token] for token in tokenize(query) if token in self.vocab}
+            for query in queries
+        ]
+        if not self.num_chunks:
+            return [[] for _ in queries]
+
+        rows_by_term: Dict[int, List[int]] = {}
+        for row, term_ids in enumerate(query_terms):
+            for term_id in term_ids:
+                rows_by_term.setdefault(term_id, []).append(row)
+
+        scores = np.zeros((len(queries), self.num_chunks), dtype=np.float32)
+        best_possible = np.zeros(len(queries), dtype=np.float32)
+        for term_id, rows in rows_by_term.items():
+            start, end = self.term_ptr[term_id], self.term_ptr[term_id + 1]
+            scores[np.ix_(rows, self.doc_ids[start:end])] += self.weights[start:end]
+            best_possible[rows] += self.max_weight[term_id]
+
+        results = []
+        for row, term_ids in enumerate(query_terms):
+            if not term_ids:
+                results.append([])
+                continue
+            distances = 1.0 - scores[row] / best_possible[row]
+            results.append(self._top_hits(scores[row], distances, top_k,
+                                          vector_distance_threshold))
+        return results
+
+    def _top_hits(self, scores: np.ndarray, distances: np.ndarray, top_k: int,
+                  vector_distance_threshold: Optional[float]) -> List[Dict]:
+        """Select and decode the closest chunks for one query"""
+        if vector_distance_threshold is not None:
+            candidates = np.flatnonzero(distances <= vector_distance_threshold)
+        else:
+            candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(distances[candidates], top_k)[:top_k]]
+        candidates = candidates[np.argsort(distances[candidates], kind="stable")]
+
+        results = []
+        for chunk_id in candidates:
+            source = self.meta["sources"][chunk_id]
+            results.append({
+                "text": self.get_text(int(chunk_id)),
+                "distance": float(distances[chunk_id]),
+                "source": source["source"],
+                "page": source["page"],
+            })
+        return results
+
+
+_index: Optional[LocalRAGIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_local_index(index_dir: Path = DEFAULT_INDEX_DIR) -> LocalRAGIndex:
+    """
+    Open the shared local index, building it from the bundled textbook the
+    first time if it does not exist yet
+    """
+    global _index
+
+    if _index is not None and _index.index_dir == Path(index_dir):
+        return _index
+
+    with _index_lock:
+        if _index is None or _index.index_dir != Path(index_dir):
+            if current_version_dir(index_dir) is None:
+                from mindmap.ingestion import ingest_pdf
+
+                print(f"Local RAG index not found, building from {DEFAULT_PDF.name}...")
+                ingest_pdf(DEFAULT_PDF, index_dir=index_dir, reload=False)
+            _index = LocalRAGIndex(index_dir)
+    return _index
+
+
+def reload_local_index(index_dir: Path = DEFAULT_INDEX_DIR) -> LocalRAGIndex:
+    """Reopen the shared index after a rebuild swapped in a new version"""
+    global _index
+
+    with _index_lock:
+        _index = LocalRAGIndex(index_dir)
+    return _index
+
+
+def query_local_index_batch(user_queries: List[str], top_k: int = 5,
+                            vector_distance_threshold: Optional[float] = 0.5,
+                            index_dir: Path = DEFAULT_INDEX_DIR) -> List[List[str]]:
+    """Batch form of query_local_index, one list of contexts per query"""
+    index = get_local_index(index_dir)
+    return [
+        [hit["text"] for hit in hits]
+        for hits in index.search_batch(user_queries, top_k, vector_distance_threshold)
+    ]
+
+
+def query_local_index(user_query: str, top_k: int = 5,
+                      vector_distance_threshold: Optional[float] = 0.5,
+                      index_dir: Path = DEFAULT_INDEX_DIR) -> List[str]:
+    """
+    Local counterpart of rag.retrieve returning only the chunk texts
+
+    Args:
+        user_query: The question from the user
+        top_k: Maximum number of contexts
+        vector_distance_threshold: Maximum distance of returned contexts
+        index_dir: Index directory
+
+    Returns:
+        A list of content strings ordered from closest to farthest
+    """
+    index = get_local_index(index_dir)
+    return [hit["text"] for hit in index.search(user_query, top_k, vector_distance_threshold)]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    pdfs = sys.argv[1:] or [str(DEFAULT_PDF)]
+    build_index_from_pdfs(pdfs)
+
+    index = LocalRAGIndex()
+    query = "How does photosynthesis convert light energy?"
+    start = time.perf_counter()
+    hits = index.search(query, top_k=5)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(hits)} hits in {elapsed_ms:.3f} ms")
+    for hit in hits:
+        print(f"  [{hit['distance']:.3f}] p{hit['page']}: {hit['text'][:80]}...")
@@ -0,0 +1,298 @@
+"""
+Deterministic Mermaid mindmap serialization, parsing and repair
+Renders a concept tree ({"label": ..., "children": [...]}) as Mermaid.js
+`mindmap` code so the mindmap does not need its own LLM call, and parses
+LLM-written mindmap code back into a tree so it can be validated and
+normalized on the server instead of failing in the browser.
+"""
+
+import copy
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+INDENT = "  "
+MAX_LABEL_LENGTH = 60
+MAX_DEPTH = 4
+MAX_CHILDREN = 8
+TAB_WIDTH = 4
+
+# Node shapes as (open, close) delimiters, longest first so "((" wins over "("
+NODE_SHAPES = OrderedDict([
+    ("circle", ("((", "))")),
+    ("hexagon", ("{{", "}}")),
+    ("bang", ("))", "((")),
+    ("square", ("[", "]")),
+    ("rounded", ("(", ")")),
+    ("cloud", (")", "(")),
+])
+
+# Optional node id followed by a shaped label, e.g. root((Cells)) or a[Text]
+NODE_ID = re.compile(r"^[A-Za-z0-9_-]*")
+
+# Characters that open or close Mermaid node shapes: (( )), [ ], { }, ) (
+SHAPE_CHARS = re.compile(r"[()\[\]{}]")
+WHITESPACE = re.compile(r"\s+")
+CLASS_SUFFIX = re.compile(r":::.*$")
+FENCE = re.compile(r"^\s*```")
+
+# Normalized results keyed by a hash of the input code and limits
+CACHE_SIZE = 512
+_normalize_cache: "OrderedDict[str, Dict]" = OrderedDict()
+_normalize_cache_lock = threading.Lock()
+
+
+def escape_label(label: str) -> str:
+    """
+    Make text safe as a Mermaid mindmap node label
+
+    Shape delimiters are removed (otherwise "Cell (biology)" renders as a
+    rounded node reading "biology"), whitespace and newlines collapse to single
+    spaces, a leading "::" (icon/class syntax) is dropped and long labels are
+    truncated on a word boundary.
+    """
+    text = SHAPE_CHARS.sub(" ", str(label))
+    text = WHITESPACE.sub(" ", text).strip().lstrip(":").strip()
+    if len(text) > MAX_LABEL_LENGTH:
+        text = text[:MAX_LABEL_LENGTH].rsplit(" ", 1)[0].rstrip(",;:-") + "..."
+    return text or "Untitled"
+
+
+def _format_node(node: Dict) -> str:
+    label = escape_label(node.get("label", ""))
+    shape = NODE_SHAPES.get(node.get("shape"))
+    return f"{shape[0]}{label}{shape[1]}" if shape else label
+
+
+def sanitize_tree(tree) -> Optional[Dict]:
+    """
+    Keep only the well-formed part of a model-written concept tree
+
+    Nodes must be objects with a non-empty string "label" (or plain strings)
+    and "children" must be a list; anything else is dropped.
+
+    Args:
+        tree: Parsed "concept_tree" value of any type
+
+    Returns:
+        Tree of {"label", "children"} nodes (plus "shape" where given), or
+        None if the root itself is malformed
+    """
+    if isinstance(tree, str) and tree.strip():
+        return {"label": tree.strip(), "children": []}
+    if not isinstance(tree, dict):
+        return None
+    label = tree.get("label")
+    if not isinstance(label, str) or not label.strip():
+        return None
+
+    children = tree.get("children")
+    node = {
+        "label": label,
+        "children": [
+            child for child in map(sanitize_tree, children if isinstance(children, list) else [])
+            if child is not None
+        ],
+    }
+    if tree.get("shape") in NODE_SHAPES:
+        node["shape"] = tree["shape"]
+    return node
+
+
+def render_mindmap(tree: Dict, max_depth: int = MAX_DEPTH,
+                   max_children: int = MAX_CHILDREN) -> str:
+    """
+    Serialize a concept tree to Mermaid mindmap code
+
+    Args:
+        tree: Root node with "label", optional "children" and optional
+              "shape" (a NODE_SHAPES key; the root is always a circle)
+        max_depth: Deepest level rendered below the root
+        max_children: Most children rendered under any one node
+
+    Returns:
+        Mermaid code starting with "mindmap"
+    """
+    lines = ["mindmap", f"{INDENT}root(({escape_label(tree.get('label', ''))}))"]
+
+    def add_children(children: List[Dict], depth: int):
+        if depth > max_depth:
+            return
+        if not isinstance(children, list):
+            return
+        for child in [c for c in children if isinstance(c, (dict, str))][:max_children]:
+            if isinstance(child, str):
+                child = {"label": child}
+            lines.append(f"{INDENT * (depth + 1)}{_format_node(child)}")
+            add_children(child.get("children"), depth + 1)
+
+    add_children(tree.get("children"), 1)
+    return "\n".join(lines)
+
+
+def parse_node(text: str) -> Tuple[str, Optional[str]]:
+    """
+    Split one mindmap line into its label and shape
+
+    Args:
+        text: Line content without indentation, e.g. "root((Cells))"
+
+    Returns:
+        (label, shape) where shape is a NODE_SHAPES key or None for plain text
+    """
+    text = CLASS_SUFFIX.sub("", text).strip()
+    rest = text[NODE_ID.match(text).end():]
+    for shape, (opening, closing) in NODE_SHAPES.items():
+        if (rest.startswith(opening) and rest.endswith(closing)
+                and len(rest) > len(opening) + len(closing)):
+            label = rest[len(opening):-len(closing)].strip().strip('"`').strip()
+            return label, shape
+    return text, None
+
+
+def parse_mindmap(code: str) -> Tuple[Optional[Dict], List[str]]:
+    """
+    Parse Mermaid mindmap code into a concept tree
+
+    Parsing is lenient: markdown fences, prose before the "mindmap" header,
+    comments, icons and class suffixes are skipped, tabs count as TAB_WIDTH
+    spaces and each node attaches to the nearest less-indented line above it.
+    Anything the browser would reject is reported as an issue.
+
+    Args:
+        code: Mindmap code as returned by the LLM
+
+    Returns:
+        (tree, issues) where tree is None if no nodes were found
+    """
+    issues = []
+    lines = code.splitlines()
+
+    if any(FENCE.match(line) for line in lines):
+        issues.append("markdown code fence")
+        lines = [line for line in lines if not FENCE.match(line)]
+
+    header = next((i for i, line in enumerate(lines) if line.strip() == "mindmap"), None)
+    if header is None:
+        issues.append("missing 'mindmap' header")
+    else:
+        if any(line.strip() for line in lines[:header]):
+            issues.append("text before 'mindmap' header")
+        lines = lines[header + 1:]
+
+    root = None
+    stack: List[Tuple[int, Dict]] = []
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("%%") or stripped.startswith("::icon("):
+            continue
+
+        indent = len(line.expandtabs(TAB_WIDTH)) - len(line.lstrip().expandtabs(TAB_WIDTH))
+        label, shape = parse_node(stripped)
+        node = {"label": label, "shape": shape, "children": []}
+        clean = escape_label(label)
+        if clean == "Untitled" and label.strip() != clean:
+            issues.append(f"empty label: {stripped!r}")
+        elif label != clean:
+            issues.append(f"unsafe label: {stripped!r}")
+
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        if stack:
+            stack[-1][1]["children"].append(node)
+        elif root is None:
+            root = node
+        else:
+            issues.append(f"extra root node: {stripped!r}")
+            root["children"].append(node)
+        stack.append((indent, node))
+
+    if root is None:
+        issues.append("no nodes")
+    return root, issues
+
+
+def _measure(node: Dict, depth: int, max_depth: int, max_children: int) -> List[str]:
+    issues = []
+    children = node.get("children") or []
+    if depth == max_depth and children:
+        issues.append(f"deeper than {max_depth} levels below {node['label']!r}")
+        return issues
+    if len(children) > max_children:
+        issues.append(f"{len(children)} children under {node['label']!r} (max {max_children})")
+    for child in children[:max_children]:
+        issues.extend(_measure(child, depth + 1, max_depth, max_children))
+    return issues
+
+
+def validate_mindmap(code: str, max_depth: int = MAX_DEPTH,
+                     max_children: int = MAX_CHILDREN) -> List[str]:
+    """
+    List the problems in a piece of mindmap code
+
+    Args:
+        code: Mindmap code
+        max_depth: Deepest level allowed below the root
+        max_children: Most children allowed under any one node
+
+    Returns:
+        Human-readable issues; empty if the code is valid and within limits
+    """
+    tree, issues = parse_mindmap(code)
+    if tree is not None:
+        issues.extend(_measure(tree, 0, max_depth, max_children))
+    return issues
+
+
+def normalize_mindmap(code: str, fallback_label: Optional[str] = None,
+                      max_depth: int = MAX_DEPTH,
+                      max_children: int = MAX_CHILDREN) -> Dict:
+    """
+    Parse, repair and re-serialize mindmap code
+
+    The output always has a "mindmap" header, two-space indentation, a single
+    circle root, escaped labels and at most max_depth levels and max_children
+    children per node; the returned tree is parsed back from that output, so
+    it has the same caps and labels. Results are cached by a hash of the
+    input, so repeated mindmaps cost one lookup (and a copy, so callers
+    cannot modify the cached result).
+
+    Args:
+        code: Mindmap code as returned by the LLM
+        fallback_label: Root label used when no nodes can be parsed
+        max_depth: Deepest level kept below the root
+        max_children: Most children kept under any one node
+
+    Returns:
+        Dictionary with success, mindmap_code, tree, issues and repaired
+    """
+    key = hashlib.sha256(
+        f"{max_depth}:{max_children}:{fallback_label}\n{code}".encode("utf-8")
+    ).hexdigest()
+    with _normalize_cache_lock:
+        if key in _normalize_cache:
+            _normalize_cache.move_to_end(key)
+            return copy.deepcopy(_normalize_cache[key])
+
+    tree, issues = parse_mindmap(code or "")
+    if tree is not None:
+        issues.extend(_measure(tree, 0, max_depth, max_children))
+    elif fallback_label:
+        tree = {"label": fallback_label, "children": []}
+
+    if tree is None:
+        result = {"success": False, "mindmap_code": "", "tree": None,
+                  "issues": issues, "repaired": False}
+    else:
+        normalized = render_mindmap(tree, max_depth=max_depth, max_children=max_children)
+        capped_tree, _ = parse_mindmap(normalized)
+        result = {"success": True, "mindmap_code": normalized, "tree": capped_tree,
+                  "issues": issues, "repaired": normalized != (code or "").strip()}
+
+    with _normalize_cache_lock:
+        _normalize_cache[key] = result
+        while len(_normalize_cache) > CACHE_SIZE:
+            _normalize_cache.popitem(last=False)
+    return copy.deepcopy(result)
@@ -0,0 +1,245 @@
+"""
+Server-side mindmap rendering
+Lays out a Mermaid mindmap with a Reingold-Tilford style tidy tree and writes
+it as a static SVG, cached on disk by a hash of the normalized mindmap so each
+diagram is laid out once and can be served as an immutable asset.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from mindmap.mermaid_mindmap import escape_label, normalize_mindmap, parse_mindmap
+
+# Bump when the drawing changes so cached SVGs are not reused
+LAYOUT_VERSION = 1
+
+FONT_FAMILY = "Inter, Segoe UI, Helvetica, Arial, sans-serif"
+FONT_SIZE = 13
+ROOT_FONT_SIZE = 16
+CHAR_WIDTH = 7.2  # Average glyph advance at FONT_SIZE
+NODE_HEIGHT = 30
+ROOT_HEIGHT = 44
+PADDING_X = 12
+MIN_NODE_WIDTH = 48
+LEVEL_GAP = 56
+SIBLING_GAP = 12
+MARGIN = 24
+
+ROOT_COLOR = "#1e293b"
+BRANCH_COLORS = ["#6366f1", "#0ea5e9", "#10b981", "#f59e0b", "#ef4444",
+                 "#8b5cf6", "#14b8a6", "#ec4899"]
+
+
+class _Box:
+    """A node plus the layout of its subtree relative to the subtree's origin"""
+
+    def __init__(self, node: Dict, depth: int, branch: int):
+        self.label = escape_label(node.get("label", ""))
+        self.shape = "circle" if depth == 0 else node.get("shape")
+        self.depth = depth
+        self.branch = branch
+        font_size = ROOT_FONT_SIZE if depth == 0 else FONT_SIZE
+        self.width = max(MIN_NODE_WIDTH,
+                         len(self.label) * CHAR_WIDTH * font_size / FONT_SIZE + 2 * PADDING_X)
+        self.height = ROOT_HEIGHT if depth == 0 else NODE_HEIGHT
+        self.children: List["_Box"] = []
+        self.offsets: List[float] = []  # Vertical shift of each child subtree
+        self.y = 0.0  # Centre relative to the subtree origin
+        self.contour: List[Tuple[float, float]] = []  # (top, bottom) per level
+        self.x = 0.0
+        self.abs_y = 0.0
+
+
+def _build(node: Dict, depth: int = 0, branch: int = -1) -> _Box:
+    box = _Box(node, depth, branch)
+    for index, child in enumerate(node.get("children") or []):
+        if isinstance(child, str):
+            child = {"label": child}
+        box.children.append(_build(child, depth + 1, index if depth == 0 else branch))
+    return box
+
+
+def _place(box: _Box):
+    """
+    Post-order pass: stack child subtrees as tightly as their contours allow,
+    then centre the parent on its first and last child.
+    """
+    half = box.height / 2
+    if not box.children:
+        box.contour = [(-half, half)]
+        return
+
+    merged: List[Tuple[float, float]] = []
+    for child in box.children:
+        _place(child)
+        shift = 0.0
+        if merged:
+            shift = max(merged[level][1] - child.contour[level][0] + SIBLING_GAP
+                        for level in range(min(len(merged), len(child.contour))))
+        box.offsets.append(shift)
+        for level, (top, bottom) in enumerate(child.contour):
+            if level < len(merged):
+                merged[level] = (min(merged[level][0], top + shift),
+                                 max(merged[level][1], bottom + shift))
+            else:
+                merged.append((top + shift, bottom + shift))
+
+    first = box.children[0].y + box.offsets[0]
+    last = box.children[-1].y + box.offsets[-1]
+    box.y = (first + last) / 2
+    box.contour = [(box.y - half, box.y + half)] + merged
+
+
+def _assign(box: _Box, origin: float, columns: List[float], out: List[_Box]):
+    box.abs_y = origin + box.y
+    box.x = columns[box.depth]
+    out.append(box)
+    for child, shift in zip(box.children, box.offsets):
+        _assign(child, origin + shift, columns, out)
+
+
+def layout_tree(tree: Dict) -> Tuple[List[_Box], float, float]:
+    """
+    Compute node positions for a concept tree, root on the left
+
+    Args:
+        tree: Root node with "label" and "children"
+
+    Returns:
+        (boxes, width, height) with each box's x/abs_y in SVG coordinates
+    """
+    root = _build(tree)
+    _place(root)
+
+    # One column per depth, as wide as its widest node
+    widths: Dict[int, float] = {}
+    stack = [root]
+    while stack:
+        box = stack.pop()
+        widths[box.depth] = max(widths.get(box.depth, 0), box.width)
+        stack.extend(box.children)
+    columns, x = [], MARGIN
+    for depth in range(len(widths)):
+        columns.append(x)
+        x += widths[depth] + LEVEL_GAP
+
+    top = min(level[0] for level in root.contour)
+    bottom = max(level[1] for level in root.contour)
+    boxes: List[_Box] = []
+    _assign(root, MARGIN - top, columns, boxes)
+
+    width = x - LEVEL_GAP + MARGIN
+    height = bottom - top + 2 * MARGIN
+    return boxes, width, height
+
+
+def _node_svg(box: _Box) -> str:
+    color = ROOT_COLOR if box.depth == 0 else BRANCH_COLORS[box.branch % len(BRANCH_COLORS)]
+    left, top = box.x, box.abs_y - box.height / 2
+    if box.shape == "hexagon":
+        inset = box.height / 3
+        points = [(left, box.abs_y), (left + inset, top), (left + box.width - inset, top),
+                  (left + box.width, box.abs_y), (left + box.width - inset, top + box.height),
+                  (left + inset, top + box.height)]
+        shape = '<polygon points="%s" fill="%s"/>' % (
+            " ".join(f"{px:.1f},{py:.1f}" for px, py in points), color)
+    else:
+        radius = {"circle": box.height / 2, "cloud": box.height / 2, "bang": box.height / 2,
+                  "square": 2}.get(box.shape, 8)
+        shape = (f'<rect x="{left:.1f}" y="{top:.1f}" width="{box.width:.1f}" '
+                 f'height="{box.height:.1f}" rx="{radius:.1f}" fill="{color}"/>')
+    font_size = ROOT_FONT_SIZE if box.depth == 0 else FONT_SIZE
+    text = (f'<text x="{left + box.width / 2:.1f}" y="{box.abs_y:.1f}" font-size="{font_size}" '
+            f'text-anchor="middle" dominant-baseline="central">{escape(box.label)}</text>')
+    return shape + text
+
+
+def render_svg(tree: Dict) -> str:
+    """
+    Render a concept tree as a standalone SVG document
+
+    Args:
+        tree: Root node with "label" and "children"
+
+    Returns:
+        SVG markup
+    """
+    boxes, width, height = layout_tree(tree)
+
+    edges = []
+    for box in boxes:
+        x1, y1 = box.x + box.width, box.abs_y
+        for child in box.children:
+            x2, y2 = child.x, child.abs_y
+            mid = (x1 + x2) / 2
+            color = BRANCH_COLORS[child.branch % len(BRANCH_COLORS)]
+            edges.append(f'<path d="M{x1:.1f},{y1:.1f} C{mid:.1f},{y1:.1f} {mid:.1f},{y2:.1f} '
+                         f'{x2:.1f},{y2:.1f}" stroke="{color}"/>')
+
+    return "\n".join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="0 0 {width:.0f} {height:.0f}">',
+        f'<g fill="none" stroke-width="2">{"".join(edges)}</g>',
+        f'<g font-family="{FONT_FAMILY}" fill="#ffffff">{"".join(_node_svg(box) for box in boxes)}</g>',
+        "</svg>",
+    ])
+
+
+def mindmap_hash(mindmap_code: str) -> Optional[str]:
+    """
+    Content hash of a mindmap's normalized form and the layout version
+
+    Args:
+        mindmap_code: Mermaid mindmap code
+
+    Returns:
+        32-character hex digest, or None if the code has no nodes
+    """
+    normalized = normalize_mindmap(mindmap_code)
+    if not normalized["success"]:
+        return None
+    return _normalized_hash(normalized["mindmap_code"])
+
+
+def _normalized_hash(normalized_code: str) -> str:
+    payload = f"v{LAYOUT_VERSION}\n{normalized_code}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def get_mindmap_svg(mindmap_code: str, cache_dir: str) -> Tuple[str, Path]:
+    """
+    Render a mindmap to SVG once and return the cached file
+
+    Args:
+        mindmap_code: Mermaid mindmap code
+        cache_dir: Directory holding <hash>.svg files
+
+    Returns:
+        (hash, path) of the cached SVG
+
+    Raises:
+        ValueError: If the mindmap has no nodes
+    """
+    # The hash and the drawing both come from the normalized code, so the
+    # depth and breadth caps apply to the SVG and equal SVGs share a file
+    normalized = normalize_mindmap(mindmap_code)
+    if not normalized["success"]:
+        raise ValueError("Mindmap has no nodes")
+    key = _normalized_hash(normalized["mindmap_code"])
+
+    cache_path = Path(cache_dir) / f"{key}.svg"
+    if not cache_path.exists():
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tree, _ = parse_mindmap(normalized["mindmap_code"])
+        svg = render_svg(tree)
+        # Write then rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(svg)
+        os.replace(tmp_path, cache_path)
+
+    return key, cache_path
@@ -1,5 +1,10 @@
-import vertexai
-from vertexai.preview import rag
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from agents.vertex_client import init_vertex
+from mindmap.retrieval_cache import RetrievalCache, normalize_query
 
 # --- Configuration ---
 # Your specific GCP project and RAG engine details
@@ -7,25 +12,170 @@ PROJECT_ID = "edapt-474000"
 LOCATION = "us-east4"
 RAG_RESOURCE_NAME = "projects/edapt-474000/locations/us-east4/ragCorpora/576460752303423488"
 
-# --- Initialize Vertex AI ---
-vertexai.init(project=PROJECT_ID, location=LOCATION)
+# Retrieval backend: "vertex" (RAG Engine corpus) or "local" (offline BM25 index
+# built from the textbook PDFs, see local_rag.py)
+RAG_BACKEND = os.getenv("RAG_BACKEND", "vertex")
+VECTOR_DISTANCE_THRESHOLD = 0.5
+TOP_K = 5
+
+# --- Retrieval cache ---
+# Results are keyed by normalized query and corpus version. The local index
+# bumps its version on every rebuild; for the Vertex corpus, call
+# invalidate_rag_cache() after importing files (or set RAG_CORPUS_VERSION).
+RETRIEVAL_CACHE = RetrievalCache(
+    max_entries=int(os.getenv("RAG_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("RAG_CACHE_TTL", "900"))
+)
+_vertex_corpus_version = os.getenv("RAG_CORPUS_VERSION", "0")
+BATCH_WORKERS = 8
+
+
+def corpus_version() -> str:
+    """Version of the corpus the active backend queries"""
+    if RAG_BACKEND == "local":
+        from mindmap.local_rag import get_local_index
+        return f"local-v{get_local_index().version}"
+    return f"vertex-{_vertex_corpus_version}"
+
+
+def invalidate_rag_cache(new_version: str = None):
+    """
+    Drop cached retrievals after the corpus changed.
+
+    Args:
+        new_version: Optional new Vertex corpus version label.
+    """
+    global _vertex_corpus_version
+    if new_version is not None:
+        _vertex_corpus_version = new_version
+    RETRIEVAL_CACHE.clear()
+
 
-def query_rag_engine(user_query: str) -> list[str]:
+def _cached_corpus_version():
+    """
+    corpus_version(), or None if it cannot be determined (e.g. the local
+    index failed to build); results are then retrieved without caching
+    """
+    try:
+        return corpus_version()
+    except Exception as e:
+        print(f"Corpus version unavailable, retrieving without the cache: {e}")
+        return None
+
+
+def _cache_key(user_query: str, version, top_k: int, vector_distance_threshold: float) -> tuple:
+    return (normalize_query(user_query), version, top_k, vector_distance_threshold)
+
+
+def query_rag_engine(user_query: str, top_k: int = TOP_K,
+                     vector_distance_threshold: float = VECTOR_DISTANCE_THRESHOLD) -> list[str]:
     """
     Queries the RAG Engine and returns the retrieved contexts as a list of strings.
+    Repeated queries against the same corpus version are served from the cache.
 
     Args:
         user_query: The question from the user.
+        top_k: Maximum number of contexts to retrieve.
+        vector_distance_threshold: Only return contexts at most this far from the query.
 
     Returns:
         A list of content strings from the retrieved documents.
     """
+    version = _cached_corpus_version()
+    key = _cache_key(user_query, version, top_k, vector_distance_threshold)
+    cached = RETRIEVAL_CACHE.get(key) if version is not None else None
+    if cached is not None:
+        return list(cached)
+
+    if RAG_BACKEND == "local":
+        contexts = query_local_rag(user_query, top_k, vector_distance_threshold)
+    else:
+        contexts = _retrieve_vertex(user_query, top_k, vector_distance_threshold)
+
+    # Errors come back as None and are not cached
+    if contexts is None:
+        return []
+    if version is not None:
+        RETRIEVAL_CACHE.put(key, contexts)
+    return list(contexts)
+
+
+def query_rag_engine_batch(user_queries: list[str], top_k: int = TOP_K,
+                           vector_distance_threshold: float = VECTOR_DISTANCE_THRESHOLD) -> list[list[str]]:
+    """
+    Retrieves contexts for many queries at once, e.g. every topic of a syllabus.
+    Duplicate and cached queries are only answered once; the local backend
+    scores all remaining queries in a single pass over its postings, the
+    Vertex backend issues the remaining retrievals concurrently.
+
+    Args:
+        user_queries: The questions to retrieve contexts for.
+        top_k: Maximum number of contexts per query.
+        vector_distance_threshold: Only return contexts at most this far from the query.
+
+    Returns:
+        One list of content strings per query, in input order.
+    """
+    version = _cached_corpus_version()
+    keys = [_cache_key(query, version, top_k, vector_distance_threshold) for query in user_queries]
+    results = {}
+    missing = {}
+    for query, key in zip(user_queries, keys):
+        if key in results or key in missing:
+            continue
+        cached = RETRIEVAL_CACHE.get(key) if version is not None else None
+        if cached is not None:
+            results[key] = cached
+        else:
+            missing[key] = query
+
+    if missing:
+        pending_keys = list(missing)
+        pending_queries = [missing[key] for key in pending_keys]
+
+        if RAG_BACKEND == "local":
+            try:
+                from mindmap.local_rag import query_local_index_batch
+                fetched = query_local_index_batch(pending_queries, top_k, vector_distance_threshold)
+            except Exception as e:
+                print(f"An error occurred while querying the local index: {e}")
+                fetched = [None] * len(pending_queries)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as executor:
+                fetched = list(executor.map(
+                    lambda query: _retrieve_vertex(query, top_k, vector_distance_threshold),
+                    pending_queries
+                ))
+
+        for key, contexts in zip(pending_keys, fetched):
+            if contexts is not None and version is not None:
+                RETRIEVAL_CACHE.put(key, contexts)
+            results[key] = contexts or []
+
+        print(f"Batch retrieval: {len(pending_keys)} fetched, "
+              f"{len(user_queries) - len(pending_keys)} served from cache or deduplicated.")
+
+    return [list(results[key]) for key in keys]
+
+
+def _retrieve_vertex(user_query: str, top_k: int,
+                     vector_distance_threshold: float):
+    """
+    Retrieves contexts from the Vertex RAG corpus, returning None on error.
+    """
     try:
+        # Vertex AI is initialized on first query rather than at import time
+        init_vertex(PROJECT_ID, LOCATION)
+        from vertexai.preview import rag
+
         # Perform the retrieval from the RAG engine
         response = rag.retrieve(
             rag_resource_name=RAG_RESOURCE_NAME,
             text=user_query,
-            query_config=rag.QueryConfig(vector_distance_threshold=0.5, top_k=5)
+            query_config=rag.QueryConfig(
+                vector_distance_threshold=vector_distance_threshold, top_k=top_k
+            )
         )
 
         # Extract just the text content from the response
@@ -35,4 +185,30 @@ def query_rag_engine(user_query: str) -> list[str]:
 
     except Exception as e:
         print(f"An error occurred while querying the RAG engine: {e}")
-        return []
\ No newline at end of file
+        return None
+
+
+def query_local_rag(user_query: str, top_k: int = TOP_K,
+                    vector_distance_threshold: float = VECTOR_DISTANCE_THRESHOLD) -> list[str]:
+    """
+    Queries the local textbook index instead of the Vertex RAG corpus,
+    returning None on error.
+
+    Args:
+        user_query: The question from the user.
+        top_k: Maximum number of contexts to retrieve.
+        vector_distance_threshold: Only return contexts at most this far from the query.
+
+    Returns:
+        A list of content strings from the retrieved chunks.
+    """
+    try:
+        from mindmap.local_rag import query_local_index
+
+        retrieved_contexts = query_local_index(user_query, top_k, vector_distance_threshold)
+        print(f"Successfully retrieved {len(retrieved_contexts)} contexts from local index.")
+        return retrieved_contexts
+
+    except Exception as e:
+        print(f"An error occurred while querying the local index: {e}")
+        return None
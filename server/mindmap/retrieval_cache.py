@@ -0,0 +1,61 @@
+"""
+LRU + TTL cache for retrieval results
+Keys include the corpus version, so a rebuilt corpus never serves stale hits.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation"""
+    return WHITESPACE.sub(" ", query).strip().lower().rstrip("?!.")
+
+
+class RetrievalCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 900.0):
+        """
+        Args:
+            max_entries: Least recently used entries are evicted beyond this
+            ttl_seconds: Entries older than this are treated as misses
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[list]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: list):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -1,9 +1,18 @@
-import vertexai
-from vertexai.generative_models import GenerativeModel, Part
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from agents.vertex_client import get_generative_model
+from mindmap.rag_service import PROJECT_ID, LOCATION
+from mindmap.context_packing import pack_contexts
+from mindmap.mermaid_mindmap import normalize_mindmap
 
 # --- LLM Configuration ---
 # Use the latest available Gemini Pro model
-LLM_MODEL = GenerativeModel("gemini-2.5-pro")
+LLM_MODEL_NAME = "gemini-2.5-pro"
+
+# Approximate token budget for retrieved context in the prompt
+CONTEXT_TOKEN_BUDGET = 3000
 
 def generate_answer_and_mindmap(query: str, rag_contexts: list[str]) -> tuple[str, str]:
     """
@@ -12,7 +21,9 @@ def generate_answer_and_mindmap(query: str, rag_contexts: list[str]) -> tuple[st
     if not rag_contexts:
         return "I couldn't find any relevant information to answer your question.", ""
 
-    context_string = "\n---\n".join(rag_contexts)
+    # Drop overlapping chunks and keep the most relevant, diverse ones that fit
+    packed_contexts = pack_contexts(query, rag_contexts, token_budget=CONTEXT_TOKEN_BUDGET)
+    context_string = "\n---\n".join(packed_contexts)
 
     # The prompt uses {{...}} to escape the curly braces for the f-string, fixing the Pylance error.
     prompt = f"""
@@ -47,12 +58,20 @@ def generate_answer_and_mindmap(query: str, rag_contexts: list[str]) -> tuple[st
     """
 
     try:
-        response = LLM_MODEL.generate_content([Part.from_text(prompt)])
+        from vertexai.generative_models import Part
+
+        # Shared model instance, built on first use
+        llm_model = get_generative_model(LLM_MODEL_NAME, project_id=PROJECT_ID, location=LOCATION)
+        response = llm_model.generate_content([Part.from_text(prompt)])
         full_response_text = response.text
 
         if "---MindMapSeparator---" in full_response_text:
             answer, mindmap = full_response_text.split("---MindMapSeparator---", 1)
-            return answer.strip(), mindmap.strip()
+            # Validate and repair the diagram here rather than in the browser
+            normalized = normalize_mindmap(mindmap)
+            if not normalized["success"]:
+                return answer.strip(), "Error: Could not generate mind map."
+            return answer.strip(), normalized["mindmap_code"]
         else:
             return full_response_text.strip(), "Error: Could not generate mind map."
 
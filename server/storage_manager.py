@@ -0,0 +1,238 @@
+"""
+Storage Manager
+Keeps generated sessions, published copies, Manim render directories and
+cached clips within per-area disk quotas. Entries are evicted by age and then
+least-recently-used order, using an in-memory access index fed by the API,
+and a background thread compacts periodically and records reclaimed bytes.
+"""
+
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+MB = 1024 * 1024
+
+
+class StorageArea:
+    """A directory (or parallel directories) of independently evictable entries"""
+
+    def __init__(self, name: str, roots: Iterable[str], quota_bytes: Optional[int] = None,
+                 max_age: Optional[float] = None, min_age: float = 0.0,
+                 include_hidden: bool = False):
+        """
+        Args:
+            name: Area name used in metrics and touch()
+            roots: Directories whose children are the entries. An entry's
+                   children with the same name in later roots (e.g. a
+                   session's published copy) belong to it and go with it.
+            quota_bytes: Least recently used entries are evicted beyond this
+            max_age: Entries unused for longer than this (seconds) are evicted
+            min_age: Entries used more recently than this are never evicted,
+                     protecting work in progress
+            include_hidden: Treat dot-files/directories as entries
+        """
+        self.name = name
+        self.roots = [Path(root) for root in roots]
+        self.quota_bytes = quota_bytes
+        self.max_age = max_age
+        self.min_age = min_age
+        self.include_hidden = include_hidden
+
+    def entry_names(self) -> Set[str]:
+        if not self.roots[0].exists():
+            return set()
+        return {
+            child.name for child in self.roots[0].iterdir()
+            if self.include_hidden or not child.name.startswith(".")
+        }
+
+    def entry_paths(self, name: str) -> List[Path]:
+        return [root / name for root in self.roots if (root / name).exists()]
+
+
+def _scan(paths: Iterable[Path]) -> Tuple[int, float]:
+    """Total size in bytes and newest modification time under some paths"""
+    size, newest = 0, 0.0
+    for path in paths:
+        if path.is_file() or path.is_symlink():
+            stat = path.lstat()
+            size += stat.st_size
+            newest = max(newest, stat.st_mtime)
+            continue
+        for directory, _, files in os.walk(path):
+            newest = max(newest, os.stat(directory).st_mtime)
+            for file_name in files:
+                try:
+                    stat = os.lstat(os.path.join(directory, file_name))
+                except FileNotFoundError:
+                    continue  # Removed while scanning
+                size += stat.st_size
+                newest = max(newest, stat.st_mtime)
+    return size, newest
+
+
+def _remove(path: Path):
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+class StorageManager:
+    """Quota, eviction and metrics for a set of storage areas"""
+
+    def __init__(self, areas: Iterable[StorageArea], interval: float = 600.0,
+                 pinned: Optional[Callable[[str], Set[str]]] = None,
+                 on_evict: Optional[Callable[[str, str], None]] = None):
+        """
+        Args:
+            areas: Storage areas to manage
+            interval: Seconds between background compactions
+            pinned: Called with an area name; returns entry names that must not
+                    be evicted right now (e.g. sessions still being generated)
+            on_evict: Called with (area name, entry name) after each eviction
+        """
+        self.areas: Dict[str, StorageArea] = {area.name: area for area in areas}
+        self.interval = interval
+        self.pinned = pinned
+        self.on_evict = on_evict
+
+        self._access: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._metrics = {
+            "compactions": 0,
+            "last_compaction": None,
+            "last_compaction_seconds": None,
+            "bytes_reclaimed": {name: 0 for name in self.areas},
+            "entries_evicted": {name: 0 for name in self.areas},
+            "usage_bytes": {name: None for name in self.areas},
+            "errors": 0,
+        }
+
+    def touch(self, area: str, name: str):
+        """Record that an entry was used, moving it to the back of the LRU order"""
+        with self._lock:
+            self._access[(area, name)] = time.time()
+
+    def _entries(self, area: StorageArea) -> List[Dict]:
+        entries = []
+        for name in area.entry_names():
+            size, modified = _scan(area.entry_paths(name))
+            with self._lock:
+                accessed = self._access.get((area.name, name), 0.0)
+            entries.append({"name": name, "size": size, "last_used": max(modified, accessed)})
+        return entries
+
+    def _evict(self, area: StorageArea, name: str) -> int:
+        size, _ = _scan(area.entry_paths(name))
+        for path in area.entry_paths(name):
+            _remove(path)
+        with self._lock:
+            self._access.pop((area.name, name), None)
+            self._metrics["bytes_reclaimed"][area.name] += size
+            self._metrics["entries_evicted"][area.name] += 1
+        if self.on_evict:
+            self.on_evict(area.name, name)
+        return size
+
+    def compact_area(self, area: StorageArea) -> Dict:
+        """
+        Evict expired entries, then least recently used ones until under quota
+
+        Args:
+            area: Area to compact
+
+        Returns:
+            Dictionary with usage before/after, bytes reclaimed and evicted names
+        """
+        now = time.time()
+        pinned = self.pinned(area.name) if self.pinned else set()
+        entries = sorted(self._entries(area), key=lambda entry: entry["last_used"])
+        usage = sum(entry["size"] for entry in entries)
+        result = {"usage_before": usage, "reclaimed": 0, "evicted": []}
+
+        for entry in entries:
+            idle = now - entry["last_used"]
+            if entry["name"] in pinned or idle < area.min_age:
+                continue
+            expired = area.max_age is not None and idle > area.max_age
+            over_quota = area.quota_bytes is not None and usage > area.quota_bytes
+            if not (expired or over_quota):
+                continue
+            reclaimed = self._evict(area, entry["name"])
+            usage -= entry["size"]
+            result["reclaimed"] += reclaimed
+            result["evicted"].append(entry["name"])
+
+        result["usage_after"] = usage
+        with self._lock:
+            self._metrics["usage_bytes"][area.name] = usage
+        return result
+
+    def compact(self) -> Dict:
+        """
+        Compact every area once
+
+        Returns:
+            Per-area compaction results
+        """
+        with self._compact_lock:
+            started = time.monotonic()
+            results = {}
+            for area in self.areas.values():
+                try:
+                    results[area.name] = self.compact_area(area)
+                except Exception as e:
+                    with self._lock:
+                        self._metrics["errors"] += 1
+                    results[area.name] = {"error": str(e)}
+                    print(f"⚠️  Storage compaction failed for {area.name}: {e}")
+
+            with self._lock:
+                self._metrics["compactions"] += 1
+                self._metrics["last_compaction"] = time.time()
+                self._metrics["last_compaction_seconds"] = round(time.monotonic() - started, 3)
+
+            reclaimed = sum(result.get("reclaimed", 0) for result in results.values())
+            if reclaimed:
+                print(f"🧹 Reclaimed {reclaimed / MB:.1f} MB of storage")
+            return results
+
+    def metrics(self) -> Dict:
+        """Reclaimed bytes, evictions and last known usage per area, plus quotas"""
+        with self._lock:
+            metrics = {
+                key: dict(value) if isinstance(value, dict) else value
+                for key, value in self._metrics.items()
+            }
+        metrics["quota_bytes"] = {name: area.quota_bytes for name, area in self.areas.items()}
+        return metrics
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.compact()
+
+    def start(self):
+        """Start background compaction (first pass after one interval)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="storage-compaction",
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop background compaction"""
+        self._stop.set()
+
+
+def quota_from_env(name: str, default_mb: int) -> Optional[int]:
+    """Quota in bytes from an environment variable in MB (0 disables the quota)"""
+    megabytes = int(os.getenv(name, str(default_mb)))
+    return megabytes * MB if megabytes > 0 else None
@@ -0,0 +1,184 @@
+"""
+Async Google Text-to-Speech Agent
+Non-blocking variant of GoogleTTSAgent built on TextToSpeechAsyncClient, with
+a shared channel, a concurrency limit, token-bucket rate limiting and
+jittered retries, so many sessions can synthesize at once within quota.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Coroutine, Dict, List, Optional
+
+from google.api_core import exceptions as api_exceptions
+from google.cloud import texttospeech
+
+from google_tts_agent import GoogleTTSAgent
+from ssml_builder import DEFAULT_EMPHASIS_TERMS
+
+# Errors worth retrying: quota, overload and transient server/network faults
+RETRYABLE_ERRORS = (
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.InternalServerError,
+    api_exceptions.Aborted,
+)
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available and take them"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class _LoopResources:
+    """Clients and limiters bound to one event loop"""
+
+    def __init__(self, max_concurrency: int, requests_per_minute: float):
+        from google.cloud import texttospeech_v1beta1
+
+        # One client per loop; every request on the loop reuses its channel
+        self.client = texttospeech.TextToSpeechAsyncClient()
+        self.beta_client = texttospeech_v1beta1.TextToSpeechAsyncClient()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.bucket = TokenBucket(requests_per_minute / 60.0, capacity=max_concurrency)
+
+
+class AsyncGoogleTTSAgent(GoogleTTSAgent):
+    """
+    GoogleTTSAgent whose synthesis calls are coroutines.
+
+    Voice and audio settings, and the synchronous methods, are inherited.
+    Limits apply per agent, so sessions sharing one agent share its quota.
+    """
+
+    def __init__(self, credentials_path: Optional[str] = None,
+                 max_concurrency: Optional[int] = None,
+                 requests_per_minute: Optional[float] = None,
+                 max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 8.0):
+        """
+        Initialize the async TTS agent.
+
+        Args:
+            credentials_path: Path to Google Cloud service account JSON file
+            max_concurrency: Requests in flight at once (TTS_MAX_CONCURRENCY, default 8)
+            requests_per_minute: Request quota (TTS_REQUESTS_PER_MINUTE, default 900,
+                                 under the default 1000/min project quota)
+            max_retries: Retries for quota and transient errors
+            base_delay: First retry backoff ceiling in seconds
+            max_delay: Largest backoff ceiling in seconds
+        """
+        super().__init__(credentials_path)
+        self.max_concurrency = max_concurrency or int(os.getenv("TTS_MAX_CONCURRENCY", "8"))
+        self.requests_per_minute = requests_per_minute or float(
+            os.getenv("TTS_REQUESTS_PER_MINUTE", "900")
+        )
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._resources: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopResources]" = \
+            weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def _loop_resources(self) -> _LoopResources:
+        loop = asyncio.get_running_loop()
+        if loop not in self._resources:
+            self._resources[loop] = _LoopResources(self.max_concurrency, self.requests_per_minute)
+        return self._resources[loop]
+
+    async def _call(self, method_name: str, request, beta: bool = False):
+        """Run one API call under the concurrency limit, rate limit and retry policy."""
+        resources = self._loop_resources()
+        client = resources.beta_client if beta else resources.client
+
+        for attempt in range(self.max_retries + 1):
+            await resources.bucket.acquire()
+            try:
+                async with resources.semaphore:
+                    return await getattr(client, method_name)(request=request)
+            except RETRYABLE_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                # Full jitter keeps retrying sessions from synchronizing
+                ceiling = min(self.max_delay, self.base_delay * 2 ** attempt)
+                await asyncio.sleep(random.uniform(0, ceiling))
+
+    async def synthesize_async(self, text: str) -> bytes:
+        """
+        Convert text to speech without blocking the event loop.
+
+        Args:
+            text: Text to convert to speech
+
+        Returns:
+            Audio content encoded per the current audio config
+        """
+        response = await self._call("synthesize_speech", texttospeech.SynthesizeSpeechRequest(
+            input=texttospeech.SynthesisInput(text=text),
+            voice=self.voice,
+            audio_config=self.audio_config
+        ))
+        return response.audio_content
+
+    async def synthesize_batch_async(self, texts: List[str]) -> List[bytes]:
+        """Convert several texts concurrently, returning audio in order."""
+        return list(await asyncio.gather(*(self.synthesize_async(text) for text in texts)))
+
+    async def synthesize_with_timepoints_async(self, segments: List[Dict], mark_words: bool = True,
+                                               emphasis_terms=DEFAULT_EMPHASIS_TERMS,
+                                               segment_break_ms: int = 0) -> Dict:
+        """
+        Async counterpart of synthesize_with_timepoints.
+
+        Returns:
+            Dictionary with audio_content, duration, and the "segments" and
+            "words" timelines in seconds from the start of the audio
+        """
+        request, builder = self._timepoint_request(segments, mark_words, emphasis_terms,
+                                                   segment_break_ms)
+        response = await self._call("synthesize_speech", request, beta=True)
+        return self._timepoint_result(response, builder)
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        """
+        Run a coroutine on the agent's background event loop.
+
+        Lets synchronous callers (such as the orchestrator running in a
+        worker thread) share one loop, channel and quota across sessions.
+
+        Args:
+            coroutine: Coroutine from one of the *_async methods
+
+        Returns:
+            concurrent.futures.Future with the coroutine's result
+        """
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="tts-async-loop",
+                                 daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
@@ -0,0 +1,147 @@
+"""
+Audio Post-Processing
+Decodes narration segments into NumPy arrays once, evens out their loudness,
+trims leading/trailing silence, joins them with exact gaps and encodes the
+result once, replacing ad-hoc pydub/ffmpeg passes over the files.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from audio_timing import iter_mp3_frames
+from ffmpeg_pipe import decode_pcm, encode_mp3
+
+
+def _segment_samples(audio: bytes, sample_rate: int) -> int:
+    """Number of samples a segment decodes to at sample_rate"""
+    seconds = 0.0
+    for index, (offset, frame_length, samples, rate) in enumerate(iter_mp3_frames(audio)):
+        frame = audio[offset:offset + min(frame_length, 64)]
+        if index == 0 and (b"Xing" in frame or b"Info" in frame):
+            continue
+        seconds += samples / rate
+    return int(round(seconds * sample_rate))
+
+
+class AudioPostProcessor:
+    """Vectorized loudness, trim and gap processing for narration segments"""
+
+    def __init__(self, sample_rate: int = 24000, target_dbfs: float = -20.0,
+                 peak_dbfs: float = -1.0, silence_dbfs: float = -45.0,
+                 keep_silence: float = 0.05, gap_seconds: float = 0.35,
+                 block_seconds: float = 0.02, bitrate: str = "64k"):
+        """
+        Args:
+            sample_rate: Processing and output sample rate (Google TTS uses 24 kHz)
+            target_dbfs: RMS level of the speech in every segment
+            peak_dbfs: Gain is reduced so no sample exceeds this level
+            silence_dbfs: Blocks quieter than this count as silence
+            keep_silence: Silence kept at each trimmed edge, in seconds
+            gap_seconds: Silence inserted between segments
+            block_seconds: Analysis block length
+            bitrate: MP3 bitrate of the output
+        """
+        self.sample_rate = sample_rate
+        self.target_dbfs = target_dbfs
+        self.peak_dbfs = peak_dbfs
+        self.silence_dbfs = silence_dbfs
+        self.keep_silence = keep_silence
+        self.gap_seconds = gap_seconds
+        self.block_size = max(1, int(block_seconds * sample_rate))
+        self.bitrate = bitrate
+
+    def decode(self, segments: List[bytes]) -> List[np.ndarray]:
+        """
+        Decode MP3 segments to mono float32 arrays with one ffmpeg process
+
+        The segments are decoded as one concatenated stream and split again
+        using each segment's frame-accurate sample count.
+        """
+        pcm = np.frombuffer(decode_pcm(b"".join(segments), self.sample_rate),
+                            dtype="<f4")
+        bounds = np.cumsum([_segment_samples(audio, self.sample_rate) for audio in segments])
+        bounds[-1] = len(pcm)  # Absorb decoder rounding in the last segment
+        return np.split(pcm, bounds[:-1])
+
+    def _block_levels(self, samples: np.ndarray) -> np.ndarray:
+        """RMS level of each analysis block in dBFS"""
+        blocks = len(samples) // self.block_size
+        if blocks == 0:
+            return np.full(1, -np.inf) if len(samples) == 0 else \
+                np.array([10 * np.log10(np.mean(samples ** 2) + 1e-12)])
+        framed = samples[:blocks * self.block_size].reshape(blocks, self.block_size)
+        return 10 * np.log10(np.mean(framed ** 2, axis=1) + 1e-12)
+
+    def trim(self, samples: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Remove leading and trailing silence
+
+        Returns:
+            (trimmed samples, seconds removed from the start)
+        """
+        voiced = np.flatnonzero(self._block_levels(samples) > self.silence_dbfs)
+        if len(voiced) == 0:
+            # All silence (e.g. the fake backend): nothing to trim against
+            return samples, 0.0
+        keep = int(self.keep_silence * self.sample_rate)
+        start = max(0, voiced[0] * self.block_size - keep)
+        end = min(len(samples), (voiced[-1] + 1) * self.block_size + keep)
+        return samples[start:end], float(start / self.sample_rate)
+
+    def normalize(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Scale a segment so its speech sits at target_dbfs without clipping
+
+        Loudness is measured over voiced blocks only, so pauses do not pull
+        the gain up.
+        """
+        levels = self._block_levels(samples)
+        voiced = levels[levels > self.silence_dbfs]
+        if len(voiced) == 0:
+            return samples
+        # Mean power of voiced blocks, back in dB
+        speech_dbfs = 10 * np.log10(np.mean(10 ** (voiced / 10)))
+        gain = 10 ** ((self.target_dbfs - speech_dbfs) / 20)
+
+        peak = np.max(np.abs(samples)) * gain
+        ceiling = 10 ** (self.peak_dbfs / 20)
+        if peak > ceiling:
+            gain *= ceiling / peak
+        return samples * np.float32(gain)
+
+    def process(self, segments: List[bytes]) -> Dict:
+        """
+        Decode, trim, normalize and join narration segments, encoding once
+
+        Args:
+            segments: Per-segment MP3 audio, in playback order
+
+        Returns:
+            Dictionary with audio_content (MP3), durations and lead_trims per
+            segment in seconds, the gap between segments and the total duration
+        """
+        if not segments:
+            return {"audio_content": b"", "durations": [], "lead_trims": [],
+                    "gap": self.gap_seconds, "duration": 0.0}
+
+        processed, lead_trims = [], []
+        for samples in self.decode(segments):
+            trimmed, lead = self.trim(samples)
+            processed.append(self.normalize(trimmed))
+            lead_trims.append(lead)
+
+        gap = np.zeros(int(round(self.gap_seconds * self.sample_rate)), dtype=np.float32)
+        pieces = [processed[0]]
+        for samples in processed[1:]:
+            pieces.extend([gap, samples])
+        joined = np.concatenate(pieces).astype("<f4")
+
+        return {
+            "audio_content": encode_mp3(joined.tobytes(), input_format="f32le",
+                                        sample_rate=self.sample_rate, bitrate=self.bitrate),
+            "durations": [len(samples) / self.sample_rate for samples in processed],
+            "lead_trims": lead_trims,
+            "gap": len(gap) / self.sample_rate,
+            "duration": len(joined) / self.sample_rate
+        }
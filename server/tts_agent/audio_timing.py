@@ -0,0 +1,160 @@
+"""
+Audio Timing
+Measures the real duration of synthesized audio and re-times narration
+segments, so downstream steps follow the audio instead of word-count guesses.
+"""
+
+import struct
+from typing import Dict, Iterator, List, Tuple
+
+# MPEG audio tables, indexed by the header's version/layer/bitrate bits
+MPEG1, MPEG2, MPEG25 = 3, 2, 0
+SAMPLE_RATES = {
+    MPEG1: (44100, 48000, 32000),
+    MPEG2: (22050, 24000, 16000),
+    MPEG25: (11025, 12000, 8000),
+}
+BITRATES = {
+    (MPEG1, 3): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (MPEG1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (MPEG1, 1): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (MPEG2, 3): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (MPEG2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (MPEG2, 1): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+
+def _frame_info(header: int):
+    """Return (frame_length, samples, sample_rate) for an MPEG audio frame header, or None"""
+    if header >> 21 != 0x7FF:
+        return None
+    version = (header >> 19) & 3
+    layer = (header >> 17) & 3
+    bitrate_index = (header >> 12) & 15
+    rate_index = (header >> 10) & 3
+    padding = (header >> 9) & 1
+    if version == 1 or layer == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    bitrate = BITRATES[(MPEG1 if version == MPEG1 else MPEG2, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    if layer == 3:  # Layer I
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    if layer == 1 and version != MPEG1:  # Layer III, MPEG-2/2.5
+        return 72 * bitrate // sample_rate + padding, 576, sample_rate
+    return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+
+
+def iter_mp3_frames(data: bytes) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Walk the frames of MP3 audio
+
+    Args:
+        data: MP3 file contents
+
+    Yields:
+        (offset, frame_length, samples, sample_rate) for each audio frame;
+        ID3v2 tags and bytes between frames are skipped
+    """
+    position = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # Skip the ID3v2 tag; its size is stored as a 28-bit syncsafe integer
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        position = 10 + size + (10 if data[5] & 0x10 else 0)
+
+    while position + 4 <= len(data):
+        info = _frame_info(struct.unpack(">I", data[position:position + 4])[0])
+        if info is None:
+            # Not a frame header; resynchronize on the next byte
+            position += 1
+            continue
+        frame_length, samples, sample_rate = info
+        yield position, frame_length, samples, sample_rate
+        position += frame_length
+
+
+def mp3_duration(data: bytes) -> float:
+    """
+    Duration of MP3 audio, by walking its frame headers
+
+    Args:
+        data: MP3 file contents
+
+    Returns:
+        Duration in seconds
+    """
+    duration = 0.0
+    for index, (offset, frame_length, samples, sample_rate) in enumerate(iter_mp3_frames(data)):
+        # A leading Xing/Info frame carries encoder metadata, not audio
+        frame = data[offset:offset + min(frame_length, 64)]
+        if index == 0 and (b"Xing" in frame or b"Info" in frame):
+            continue
+        duration += samples / sample_rate
+    return duration
+
+
+def wav_duration(data: bytes) -> float:
+    """
+    Duration of PCM WAV audio, from its fmt and data chunks
+
+    Args:
+        data: WAV file contents
+
+    Returns:
+        Duration in seconds
+    """
+    position = 12
+    byte_rate = None
+    while position + 8 <= len(data):
+        chunk_id = data[position:position + 4]
+        chunk_size = struct.unpack("<I", data[position + 4:position + 8])[0]
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack("<I", data[position + 16:position + 20])[0]
+        elif chunk_id == b"data" and byte_rate:
+            return min(chunk_size, len(data) - position - 8) / byte_rate
+        position += 8 + chunk_size + (chunk_size & 1)
+    return 0.0
+
+
+def audio_duration(data: bytes) -> float:
+    """
+    Duration of synthesized audio (WAV or MP3)
+
+    Args:
+        data: Audio file contents
+
+    Returns:
+        Duration in seconds
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return wav_duration(data)
+    return mp3_duration(data)
+
+
+def retime_segments(segments: List[Dict], durations: List[float], gap: float = 0.0) -> float:
+    """
+    Replace estimated segment timings with measured audio durations
+
+    Each segment gets "audio_duration" and new cumulative "start_time" and
+    "end_time"; "estimated_duration" is kept for comparison.
+
+    Args:
+        segments: Narrative segments, in playback order
+        durations: Measured duration of each segment's audio in seconds
+        gap: Silence between consecutive segments in seconds
+
+    Returns:
+        Total measured duration in seconds
+    """
+    if len(segments) != len(durations):
+        raise ValueError(f"{len(segments)} segments but {len(durations)} audio durations")
+
+    cumulative_time = 0.0
+    for index, (segment, duration) in enumerate(zip(segments, durations)):
+        if index:
+            cumulative_time += gap
+        segment["audio_duration"] = round(duration, 3)
+        segment["start_time"] = round(cumulative_time, 3)
+        cumulative_time += duration
+        segment["end_time"] = round(cumulative_time, 3)
+    return round(cumulative_time, 3)
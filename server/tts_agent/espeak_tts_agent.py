@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Offline TTS Agent using espeak-ng
+Linux-native alternative to the macOS 'say' agent, for CI and offline runs.
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ffmpeg_pipe import encode_mp3, encode_mp3_batch
+
+
+class EspeakTTSAgent:
+    """
+    Text-to-Speech agent using espeak-ng (or classic espeak) via subprocess.
+    WAV output is encoded to MP3 with ffmpeg through pipes, without temp files.
+    """
+
+    def __init__(self, voice: str = "en-us", rate: int = 160,
+                 executable: Optional[str] = None):
+        """
+        Initialize the espeak agent.
+
+        Args:
+            voice: espeak voice name (e.g. "en-us", "en-gb", "de")
+            rate: Speaking rate in words per minute
+            executable: Path to espeak-ng/espeak; found on PATH if omitted
+        """
+        self.voice = voice
+        self.rate = rate
+        self.bitrate = "64k"
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.executable:
+            raise RuntimeError("espeak-ng not found. Install it with: apt-get install espeak-ng")
+
+    def set_voice(self, voice_name: str = "en-us"):
+        """Set the espeak voice to use (see `espeak-ng --voices`)"""
+        self.voice = voice_name
+
+    def set_rate(self, rate: int = 160):
+        """Set speaking rate in words per minute"""
+        self.rate = rate
+
+    def synthesize_wav(self, text: str) -> bytes:
+        """
+        Convert text to WAV audio in memory.
+
+        Args:
+            text: Text to convert (passed on stdin, never parsed as options)
+
+        Returns:
+            WAV file contents
+        """
+        result = subprocess.run(
+            [self.executable, "--stdout", "-v", self.voice, "-s", str(self.rate)],
+            input=text.encode("utf-8"),
+            capture_output=True,
+            check=True
+        )
+        return result.stdout
+
+    def synthesize(self, text: str) -> bytes:
+        """
+        Convert text to MP3 audio in memory.
+
+        Args:
+            text: Text to convert
+
+        Returns:
+            MP3 audio content
+        """
+        return encode_mp3(self.synthesize_wav(text), bitrate=self.bitrate)
+
+    def synthesize_batch(self, texts: List[str]) -> List[bytes]:
+        """Convert several texts to MP3 audio, in order, with one ffmpeg process"""
+        return encode_mp3_batch([self.synthesize_wav(text) for text in texts],
+                                bitrate=self.bitrate)
+
+    def text_to_speech(self, text: str, output_path: str) -> str:
+        """
+        Convert text to speech and save as an MP3 file.
+
+        Args:
+            text: Text to convert
+            output_path: Path where audio file will be saved
+
+        Returns:
+            Path to the generated audio file
+        """
+        output_file = Path(output_path).with_suffix(".mp3")
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_bytes(self.synthesize(text))
+
+        print(f'Audio content written to file "{output_file}"')
+        return str(output_file)
+
+    def voices(self) -> List[Dict]:
+        """
+        List installed espeak voices.
+
+        Returns:
+            List of voice dictionaries with name, gender and language
+        """
+        result = subprocess.run(
+            [self.executable, "--voices"],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+
+        voice_list = []
+        # Columns: Pty Language Age/Gender VoiceName File Other Languages
+        for line in result.stdout.splitlines()[1:]:
+            fields = line.split()
+            if len(fields) < 4:
+                continue
+            gender = fields[2].split("/")[-1]
+            voice_list.append({
+                "name": fields[1],  # Usable with -v
+                "display_name": fields[3],
+                "gender": {"M": "MALE", "F": "FEMALE"}.get(gender, "NEUTRAL"),
+                "language": fields[1],
+                "natural_sample_rate": 22050
+            })
+
+        return voice_list
+
+
+if __name__ == "__main__":
+    agent = EspeakTTSAgent()
+    print(f"Using {agent.executable} with {len(agent.voices())} voices")
+    agent.text_to_speech(
+        "The derivative measures how fast a function changes.",
+        "../../media/audio/test/espeak_test.mp3"
+    )
@@ -0,0 +1,150 @@
+"""
+FFmpeg Pipe
+In-memory audio encoding through ffmpeg's stdin/stdout: no intermediate
+files, a cached tool probe, and batch encoding of many segments in a single
+ffmpeg process.
+"""
+
+import io
+import shutil
+import subprocess
+import wave
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from audio_timing import iter_mp3_frames
+
+DEFAULT_BITRATE = "128k"
+
+# ffmpeg raw PCM formats by WAV sample width in bytes
+PCM_FORMATS = {1: "u8", 2: "s16le", 4: "s32le"}
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_path() -> Optional[str]:
+    """Location of the ffmpeg binary, looked up once per process"""
+    return shutil.which("ffmpeg")
+
+
+def has_ffmpeg() -> bool:
+    """Check if ffmpeg is available, without spawning a process"""
+    return ffmpeg_path() is not None
+
+
+def _run_ffmpeg(input_args: List[str], output_args: List[str], data: bytes) -> bytes:
+    if not has_ffmpeg():
+        raise RuntimeError("ffmpeg not found on PATH")
+    result = subprocess.run(
+        [ffmpeg_path(), "-loglevel", "error", *input_args, "-i", "pipe:0",
+         *output_args, "pipe:1"],
+        input=data,
+        capture_output=True,
+        check=True
+    )
+    return result.stdout
+
+
+def encode_mp3(audio: bytes, input_format: str = "wav", sample_rate: Optional[int] = None,
+               channels: int = 1, bitrate: str = DEFAULT_BITRATE) -> bytes:
+    """
+    Encode audio to MP3 in memory
+
+    Args:
+        audio: Input audio (a WAV file, or raw PCM described by the other args)
+        input_format: ffmpeg demuxer, e.g. "wav", "aiff", "f32le", "s16le"
+        sample_rate: Sample rate of raw PCM input
+        channels: Channel count of raw PCM input
+        bitrate: MP3 bitrate
+
+    Returns:
+        MP3 audio content
+    """
+    input_args = ["-f", input_format]
+    if sample_rate:
+        input_args += ["-ar", str(sample_rate), "-ac", str(channels)]
+    return _run_ffmpeg(input_args, ["-acodec", "libmp3lame", "-ab", bitrate, "-f", "mp3"], audio)
+
+
+def decode_pcm(audio: bytes, sample_rate: int, channels: int = 1,
+               input_format: Optional[str] = None) -> bytes:
+    """
+    Decode audio to raw 32-bit float PCM in memory
+
+    Args:
+        audio: Encoded audio (MP3, WAV, ...)
+        sample_rate: Output sample rate
+        channels: Output channel count
+        input_format: ffmpeg demuxer; probed from the data if omitted
+
+    Returns:
+        Interleaved little-endian float32 samples
+    """
+    input_args = ["-f", input_format] if input_format else []
+    return _run_ffmpeg(input_args,
+                       ["-ar", str(sample_rate), "-ac", str(channels), "-f", "f32le"], audio)
+
+
+def read_wav(data: bytes) -> Tuple[bytes, int, int, int]:
+    """
+    Split a WAV file into raw PCM and its format
+
+    Returns:
+        (pcm, sample_rate, channels, sample_width)
+    """
+    with wave.open(io.BytesIO(data)) as wav:
+        return (wav.readframes(wav.getnframes()), wav.getframerate(),
+                wav.getnchannels(), wav.getsampwidth())
+
+
+def encode_mp3_batch(wavs: List[bytes], bitrate: str = DEFAULT_BITRATE) -> List[bytes]:
+    """
+    Encode many WAV segments to MP3 with one ffmpeg process
+
+    Each segment is padded with silence to a whole number of MP3 frames and
+    the bit reservoir is disabled, so the encoded stream can be cut back into
+    independently decodable per-segment MP3s on frame boundaries. The encoder
+    delay shifts each cut by a few milliseconds.
+
+    Args:
+        wavs: WAV file contents, all with the same format
+        bitrate: MP3 bitrate
+
+    Returns:
+        MP3 audio for each segment, in order
+    """
+    if not wavs:
+        return []
+
+    decoded = [read_wav(data) for data in wavs]
+    formats = {(rate, channels, width) for _, rate, channels, width in decoded}
+    if len(formats) > 1 or decoded[0][3] not in PCM_FORMATS:
+        # Mixed formats cannot share one raw PCM stream
+        return [encode_mp3(data, bitrate=bitrate) for data in wavs]
+
+    sample_rate, channels, width = formats.pop()
+    samples_per_frame = 1152 if sample_rate >= 32000 else 576
+    frame_bytes = samples_per_frame * channels * width
+    silence = b"\x80" if width == 1 else b"\x00"
+
+    pcm, frame_counts = [], []
+    for data, *_ in decoded:
+        frames = max(1, -(-len(data) // frame_bytes))
+        pcm.append(data + silence * (frames * frame_bytes - len(data)))
+        frame_counts.append(frames)
+
+    encoded = _run_ffmpeg(
+        ["-f", PCM_FORMATS[width], "-ar", str(sample_rate), "-ac", str(channels)],
+        ["-acodec", "libmp3lame", "-ab", bitrate, "-reservoir", "0",
+         "-write_xing", "0", "-id3v2_version", "0", "-f", "mp3"],
+        b"".join(pcm)
+    )
+
+    frames = [(offset, length) for offset, length, _, _ in iter_mp3_frames(encoded)]
+    segments, start = [], 0
+    for index, count in enumerate(frame_counts):
+        # The encoder's flush frames belong to the last segment
+        end = len(frames) if index == len(frame_counts) - 1 else min(start + count, len(frames))
+        segments.append(b"".join(encoded[offset:offset + length]
+                                 for offset, length in frames[start:end]))
+        start = end
+    return segments
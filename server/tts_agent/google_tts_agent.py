@@ -7,6 +7,8 @@ import os
 from pathlib import Path
 from typing import Optional, List, Dict
 from google.cloud import texttospeech
+from audio_timing import audio_duration
+from ssml_builder import DEFAULT_EMPHASIS_TERMS, SSMLBuilder, align_timepoints
 from narration_data import DERIVATIVE_NARRATION, get_full_narration_text, get_narration_segments
 
 
@@ -26,6 +28,9 @@ class GoogleTTSAgent:
         
         self.client = texttospeech.TextToSpeechClient()
         
+        # Timepoints are only exposed by the v1beta1 API; created on first use
+        self._beta_client = None
+        
         # Default voice settings
         self.voice = texttospeech.VoiceSelectionParams(
             language_code="en-US",
@@ -86,16 +91,15 @@ class GoogleTTSAgent:
             effects_profile_id=["small-bluetooth-speaker-class-device"]
         )
     
-    def text_to_speech(self, text: str, output_path: str) -> str:
+    def synthesize(self, text: str) -> bytes:
         """
-        Convert text to speech and save as audio file.
+        Convert text to speech and return the encoded audio in memory.
         
         Args:
             text: Text to convert to speech
-            output_path: Path where audio file will be saved
             
         Returns:
-            Path to the generated audio file
+            Audio content encoded per the current audio config
         """
         # Create synthesis input
         synthesis_input = texttospeech.SynthesisInput(text=text)
@@ -107,13 +111,111 @@ class GoogleTTSAgent:
             audio_config=self.audio_config
         )
         
+        return response.audio_content
+    
+    def synthesize_batch(self, texts: List[str]) -> List[bytes]:
+        """
+        Convert several texts to speech, in order.
+        
+        Args:
+            texts: Texts to convert
+            
+        Returns:
+            Audio content for each text
+        """
+        return [self.synthesize(text) for text in texts]
+    
+    def voices(self) -> List[Dict]:
+        """List the voices available for the current language."""
+        return self.list_available_voices(self.voice.language_code)
+    
+    def synthesize_with_timepoints(self, segments: List[Dict], mark_words: bool = True,
+                                   emphasis_terms=DEFAULT_EMPHASIS_TERMS,
+                                   segment_break_ms: int = 0) -> Dict:
+        """
+        Synthesize segments in one request and return the audio with an
+        aligned timeline taken from SSML <mark> timepoints.
+        
+        Args:
+            segments: Segments with "segment_id" and "content"
+            mark_words: Also return a start time for every word
+            emphasis_terms: Words or phrases spoken with emphasis
+            segment_break_ms: Pause inserted before each segment
+            
+        Returns:
+            Dictionary with audio_content, duration, and the "segments" and
+            "words" timelines in seconds from the start of the audio
+        """
+        from google.cloud import texttospeech_v1beta1
+        
+        if self._beta_client is None:
+            self._beta_client = texttospeech_v1beta1.TextToSpeechClient()
+        
+        request, builder = self._timepoint_request(segments, mark_words, emphasis_terms,
+                                                   segment_break_ms)
+        response = self._beta_client.synthesize_speech(request=request)
+        return self._timepoint_result(response, builder)
+    
+    def _timepoint_request(self, segments: List[Dict], mark_words: bool,
+                           emphasis_terms, segment_break_ms: int):
+        """Build the marked SSML and the v1beta1 request asking for its timepoints."""
+        from google.cloud import texttospeech_v1beta1
+        
+        builder = SSMLBuilder(emphasis_terms, segment_break_ms=segment_break_ms,
+                              mark_words=mark_words)
+        for segment in segments:
+            builder.add_segment(segment["segment_id"], segment["content"])
+        
+        request = texttospeech_v1beta1.SynthesizeSpeechRequest(
+            input=texttospeech_v1beta1.SynthesisInput(ssml=builder.build()),
+            voice=texttospeech_v1beta1.VoiceSelectionParams(
+                **texttospeech.VoiceSelectionParams.to_dict(self.voice)
+            ),
+            audio_config=texttospeech_v1beta1.AudioConfig(
+                **texttospeech.AudioConfig.to_dict(self.audio_config)
+            ),
+            enable_time_pointing=[
+                texttospeech_v1beta1.SynthesizeSpeechRequest.TimepointType.SSML_MARK
+            ]
+        )
+        return request, builder
+    
+    @staticmethod
+    def _timepoint_result(response, builder: SSMLBuilder) -> Dict:
+        """Measure the returned audio and align its timepoints to the marks."""
+        duration = audio_duration(response.audio_content)
+        timeline = align_timepoints(
+            builder.marks,
+            [(tp.mark_name, tp.time_seconds) for tp in response.timepoints],
+            total_duration=duration
+        )
+        
+        return {
+            "audio_content": response.audio_content,
+            "duration": duration,
+            **timeline
+        }
+    
+    def text_to_speech(self, text: str, output_path: str) -> str:
+        """
+        Convert text to speech and save as audio file.
+        
+        Args:
+            text: Text to convert to speech
+            output_path: Path where audio file will be saved
+            
+        Returns:
+            Path to the generated audio file
+        """
+        audio_content = self.synthesize(text)
+        
         # Ensure output directory exists
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
         # Write the response to the output file
         with open(output_file, 'wb') as out:
-            out.write(response.audio_content)
+            out.write(audio_content)
         
         print(f'Audio content written to file "{output_file}"')
         return str(output_file)
@@ -192,27 +294,13 @@ class GoogleTTSAgent:
         Returns:
             SSML formatted string
         """
-        segments = get_narration_segments()
-        
-        ssml_parts = ['<speak>']
-        
-        for segment in segments:
-            # Add pause before each segment
-            ssml_parts.append('<break time="500ms"/>')
-            
-            # Add the text with some emphasis on key words
-            text = segment['text']
-            
-            # Add emphasis to mathematical terms
-            text = text.replace('derivative', '<emphasis level="moderate">derivative</emphasis>')
-            text = text.replace('tangent line', '<emphasis level="moderate">tangent line</emphasis>')
-            text = text.replace('secant line', '<emphasis level="moderate">secant line</emphasis>')
-            
-            ssml_parts.append(text)
-        
-        ssml_parts.append('</speak>')
+        # Pauses, segment marks and emphasis on mathematical terms are all
+        # added by the builder in a single regex pass per segment
+        builder = SSMLBuilder(DEFAULT_EMPHASIS_TERMS, segment_break_ms=500)
+        for i, segment in enumerate(get_narration_segments(), 1):
+            builder.add_segment(i, segment['text'])
         
-        return ''.join(ssml_parts)
+        return builder.build()
     
     def list_available_voices(self, language_code: str = "en-US") -> List[Dict]:
         """
@@ -4,9 +4,12 @@ Alternative TTS Agent using free/local options
 For testing without Google Cloud credentials.
 """
 
+import os
 import subprocess
+import tempfile
 from pathlib import Path
-from typing import List
+from typing import Dict, List
+from ffmpeg_pipe import encode_mp3, encode_mp3_batch, has_ffmpeg
 from narration_data import DERIVATIVE_NARRATION, get_full_narration_text, get_narration_segments
 
 
@@ -39,6 +42,30 @@ class LocalTTSAgent:
         """
         self.rate = rate
     
+    def _say_to_wav(self, text: str) -> bytes:
+        """
+        Synthesize text with 'say' and return 16-bit WAV audio.
+        
+        'say' needs a seekable output file, so it writes to one temp file
+        that is read back and removed; everything after that stays in memory.
+        """
+        fd, temp_path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            cmd = [
+                'say',
+                '-v', self.voice,
+                '-r', str(self.rate),
+                '-o', temp_path,
+                '--file-format=WAVE',
+                '--data-format=LEI16@22050',  # Audio format
+                text
+            ]
+            subprocess.run(cmd, check=True)
+            return Path(temp_path).read_bytes()
+        finally:
+            os.unlink(temp_path)
+    
     def text_to_speech(self, text: str, output_path: str) -> str:
         """
         Convert text to speech using macOS 'say' command.
@@ -53,25 +80,16 @@ class LocalTTSAgent:
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        # Use macOS 'say' command to generate audio
-        cmd = [
-            'say',
-            '-v', self.voice,
-            '-r', str(self.rate),
-            '-o', str(output_file),
-            '--data-format=LEF32@22050',  # Audio format
-            text
-        ]
-        
         try:
-            subprocess.run(cmd, check=True)
+            wav = self._say_to_wav(text)
             
-            # Convert to MP3 if ffmpeg is available
-            mp3_path = output_file.with_suffix('.mp3')
-            if self._has_ffmpeg():
-                self._convert_to_mp3(str(output_file), str(mp3_path))
-                output_file.unlink()  # Remove the intermediate file
-                output_file = mp3_path
+            # Encode to MP3 in memory if ffmpeg is available
+            if has_ffmpeg():
+                output_file = output_file.with_suffix('.mp3')
+                output_file.write_bytes(encode_mp3(wav, bitrate='192k'))
+            else:
+                output_file = output_file.with_suffix('.wav')
+                output_file.write_bytes(wav)
             
             print(f'Audio content written to file "{output_file}"')
             return str(output_file)
@@ -83,30 +101,53 @@ class LocalTTSAgent:
             print("Error: 'say' command not found. This feature requires macOS.")
             return ""
     
-    def _has_ffmpeg(self) -> bool:
-        """Check if ffmpeg is available."""
+    def synthesize(self, text: str) -> bytes:
+        """
+        Convert text to MP3 audio in memory.
+        
+        Args:
+            text: Text to convert
+            
+        Returns:
+            MP3 audio content
+        """
+        return encode_mp3(self._say_to_wav(text), bitrate='192k')
+    
+    def synthesize_batch(self, texts: List[str]) -> List[bytes]:
+        """
+        Convert several texts to MP3 audio, in order, encoding all of them
+        with a single ffmpeg process.
+        """
+        return encode_mp3_batch([self._say_to_wav(text) for text in texts], bitrate='192k')
+    
+    def voices(self) -> List[Dict]:
+        """
+        List installed system voices.
+        
+        Returns:
+            List of voice dictionaries with name and language
+        """
         try:
-            subprocess.run(['ffmpeg', '-version'], 
-                         stdout=subprocess.DEVNULL, 
-                         stderr=subprocess.DEVNULL)
-            return True
+            result = subprocess.run(['say', '-v', '?'],
+                                  capture_output=True,
+                                  text=True)
         except FileNotFoundError:
-            return False
-    
-    def _convert_to_mp3(self, input_path: str, output_path: str):
-        """Convert audio file to MP3 format."""
-        cmd = [
-            'ffmpeg',
-            '-i', input_path,
-            '-acodec', 'libmp3lame',
-            '-ab', '192k',
-            '-y',  # Overwrite output file
-            output_path
-        ]
+            return []
         
-        subprocess.run(cmd, 
-                      stdout=subprocess.DEVNULL, 
-                      stderr=subprocess.DEVNULL)
+        voice_list = []
+        # Lines look like: "Alex                en_US    # Most people recognize me..."
+        for line in result.stdout.splitlines():
+            description = line.split('#', 1)[0].split()
+            if len(description) >= 2:
+                voice_list.append({
+                    'name': ' '.join(description[:-1]),
+                    'language': description[-1].replace('_', '-')
+                })
+        return voice_list
+    
+    def _has_ffmpeg(self) -> bool:
+        """Check if ffmpeg is available (probed once per process)."""
+        return has_ffmpeg()
     
     def generate_narration_audio(self, output_dir: str = "output", 
                                  mode: str = "full") -> List[str]:
@@ -0,0 +1,122 @@
+"""
+SSML Builder
+Builds SSML with <mark> tags per segment (and optionally per word) so the TTS
+API can return timepoints, and aligns those timepoints into a timeline.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape, unescape
+
+DEFAULT_EMPHASIS_TERMS = ("derivative", "tangent line", "secant line")
+
+
+@lru_cache(maxsize=32)
+def compile_token_pattern(emphasis_terms: Tuple[str, ...]) -> "re.Pattern":
+    """
+    Compile one pattern matching either an emphasis term or a single word
+
+    Longer terms are tried first so "tangent line" wins over "tangent".
+    """
+    alternatives = "|".join(
+        re.escape(escape(term)) for term in sorted(emphasis_terms, key=len, reverse=True)
+    )
+    term_group = rf"(?P<term>\b(?:{alternatives})\b)|" if alternatives else ""
+    return re.compile(rf"{term_group}(?P<word>\S+)", re.IGNORECASE)
+
+
+class SSMLBuilder:
+    """Accumulates narration segments into one marked-up <speak> document"""
+
+    def __init__(self, emphasis_terms: Sequence[str] = DEFAULT_EMPHASIS_TERMS,
+                 segment_break_ms: int = 500, mark_words: bool = False):
+        """
+        Args:
+            emphasis_terms: Words or phrases wrapped in <emphasis>
+            segment_break_ms: Pause inserted before each segment
+            mark_words: Also insert a <mark> before every word
+        """
+        self.pattern = compile_token_pattern(tuple(emphasis_terms))
+        self.segment_break_ms = segment_break_ms
+        self.mark_words = mark_words
+        self.parts: List[str] = []
+        self.marks: Dict[str, Dict] = {}
+
+    def add_segment(self, segment_id, text: str) -> "SSMLBuilder":
+        """
+        Append a segment, marking its start
+
+        Args:
+            segment_id: Identifier used in the mark names
+            text: Plain narration text
+
+        Returns:
+            The builder, for chaining
+        """
+        if self.segment_break_ms:
+            self.parts.append(f'<break time="{self.segment_break_ms}ms"/>')
+
+        mark = f"seg-{segment_id}"
+        self.marks[mark] = {"type": "segment", "segment_id": segment_id}
+        self.parts.append(f'<mark name="{mark}"/>')
+
+        word_index = 0
+
+        # One pass over the escaped text handles both emphasis and word marks
+        def replace(match):
+            nonlocal word_index
+            token = match.group(0)
+            prefix = ""
+            # Punctuation split off an emphasized term gets no mark of its own
+            if self.mark_words and any(char.isalnum() for char in token):
+                word_mark = f"w-{segment_id}-{word_index}"
+                self.marks[word_mark] = {"type": "word", "segment_id": segment_id,
+                                         "text": unescape(token), "index": word_index}
+                prefix = f'<mark name="{word_mark}"/>'
+                word_index += 1
+            if match.lastgroup == "term":
+                return f'{prefix}<emphasis level="moderate">{token}</emphasis>'
+            return prefix + token
+
+        self.parts.append(self.pattern.sub(replace, escape(text)))
+        return self
+
+    def build(self) -> str:
+        """Return the SSML document"""
+        return "<speak>" + " ".join(self.parts) + "</speak>"
+
+
+def align_timepoints(marks: Dict[str, Dict], timepoints: List[Tuple[str, float]],
+                     total_duration: Optional[float] = None, offset: float = 0.0) -> Dict:
+    """
+    Turn TTS mark timepoints into segment and word timelines
+
+    Args:
+        marks: Mark metadata from SSMLBuilder.marks
+        timepoints: (mark_name, seconds) pairs returned by the TTS API
+        total_duration: Audio length, used as the end of the last segment
+        offset: Seconds added to every time (for audio that is concatenated)
+
+    Returns:
+        Dictionary with "segments" (segment_id, start_time, end_time) and
+        "words" (segment_id, text, start_time, end_time)
+    """
+    segments, words = [], []
+    for name, seconds in sorted(timepoints, key=lambda tp: tp[1]):
+        info = marks.get(name)
+        if info is None:
+            continue
+        time = round(offset + seconds, 3)
+        if info["type"] == "segment":
+            segments.append({"segment_id": info["segment_id"], "start_time": time})
+        else:
+            words.append({"segment_id": info["segment_id"], "text": info["text"],
+                          "start_time": time})
+
+    end = round(offset + total_duration, 3) if total_duration is not None else None
+    for timeline in (segments, words):
+        for current, following in zip(timeline, timeline[1:] + [None]):
+            current["end_time"] = following["start_time"] if following else end
+
+    return {"segments": segments, "words": words}
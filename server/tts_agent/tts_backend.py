@@ -0,0 +1,108 @@
+"""
+TTS Backends
+Common interface for the text-to-speech engines and a factory that picks one
+by configuration, so the pipeline can run against Google Cloud TTS, macOS
+'say', espeak-ng on Linux, or a deterministic fake for CI and benchmarks.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Protocol, runtime_checkable
+
+
+@runtime_checkable
+class TTSBackend(Protocol):
+    """Anything that turns text into MP3 audio"""
+
+    def synthesize(self, text: str) -> bytes:
+        """Return MP3 audio for one piece of text"""
+        ...
+
+    def synthesize_batch(self, texts: List[str]) -> List[bytes]:
+        """Return MP3 audio for each text, in order"""
+        ...
+
+    def voices(self) -> List[Dict]:
+        """List the voices the backend can use"""
+        ...
+
+
+# A silent MPEG-2 Layer III frame: 24 kHz, 32 kbps, mono, no CRC. All-zero
+# side info and main data decode to 576 samples (24 ms) of silence.
+SILENT_FRAME = bytes([0xFF, 0xF3, 0x44, 0xC0]) + bytes(92)
+SILENT_FRAME_SECONDS = 576 / 24000
+
+
+class FakeTTSBackend:
+    """
+    Deterministic offline backend that returns silent MP3 audio whose length
+    follows the word count, like real speech at a fixed rate.
+    """
+
+    def __init__(self, words_per_second: float = 2.5, latency: float = 0.0):
+        """
+        Args:
+            words_per_second: Speaking rate used to size the audio
+            latency: Seconds to sleep per call, to simulate a remote engine
+        """
+        self.words_per_second = words_per_second
+        self.latency = latency
+        self.voice = "fake"
+
+    def set_voice(self, voice_name: str = "fake"):
+        """Record the voice name; the audio is silent either way"""
+        self.voice = voice_name
+
+    def duration_for(self, text: str) -> float:
+        """Audio length in seconds produced for a text"""
+        return len(text.split()) / self.words_per_second
+
+    def synthesize(self, text: str) -> bytes:
+        if self.latency:
+            time.sleep(self.latency)
+        frames = max(1, round(self.duration_for(text) / SILENT_FRAME_SECONDS))
+        return SILENT_FRAME * frames
+
+    def synthesize_batch(self, texts: List[str]) -> List[bytes]:
+        return [self.synthesize(text) for text in texts]
+
+    def voices(self) -> List[Dict]:
+        return [{"name": "fake", "gender": "NEUTRAL", "language": "en-US",
+                 "natural_sample_rate": 24000}]
+
+
+TTS_BACKENDS = ("google_async", "google", "macos", "espeak", "fake")
+
+
+def create_tts_backend(name: Optional[str] = None) -> TTSBackend:
+    """
+    Build the configured TTS backend
+
+    Engines are imported on demand, so the Google SDK is only needed when the
+    Google backend is selected.
+
+    Args:
+        name: One of TTS_BACKENDS; defaults to the TTS_BACKEND environment
+              variable, then "google_async"
+
+    Returns:
+        A TTSBackend instance
+    """
+    name = (name or os.getenv("TTS_BACKEND", "google_async")).lower()
+
+    if name == "google_async":
+        from async_google_tts_agent import AsyncGoogleTTSAgent
+        return AsyncGoogleTTSAgent()
+    if name == "google":
+        from google_tts_agent import GoogleTTSAgent
+        return GoogleTTSAgent()
+    if name == "macos":
+        from local_tts_agent import LocalTTSAgent
+        return LocalTTSAgent()
+    if name == "espeak":
+        from espeak_tts_agent import EspeakTTSAgent
+        return EspeakTTSAgent()
+    if name == "fake":
+        return FakeTTSBackend()
+
+    raise ValueError(f"Unknown TTS backend '{name}', expected one of {', '.join(TTS_BACKENDS)}")
@@ -6,9 +6,10 @@ import { Play, Pause, RotateCcw, Video, FileText, Volume2 } from "lucide-react";
 
 interface AnimatedVideoViewerProps {
   content: string;
+  poster?: string;
 }
 
-export const AnimatedVideoViewer = ({ content }: AnimatedVideoViewerProps) => {
+export const AnimatedVideoViewer = ({ content, poster }: AnimatedVideoViewerProps) => {
   const [isPlaying, setIsPlaying] = useState(false);
   const [videoProgress, setVideoProgress] = useState(0);
   const [currentTime, setCurrentTime] = useState(0);
@@ -108,7 +109,9 @@ export const AnimatedVideoViewer = ({ content }: AnimatedVideoViewerProps) => {
           <video
             ref={videoRef}
             className="w-full h-full object-contain bg-black"
-            src="/media/videos/manim-sample/480p15/DerivativeExplanation_with_audio.mp4"
+            src={content}
+            poster={poster}
+            preload={poster ? "none" : "metadata"}
             onPlay={() => setIsPlaying(true)}
             onPause={() => setIsPlaying(false)}
           >
@@ -16,6 +16,7 @@ import { Progress } from "@/components/ui/progress";
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { BookOpen, FileText, Clock, ChevronRight, Plus } from "lucide-react";
+import { API_BASE_URL } from "@/hooks/use-content-generation";
 
 export function LearningSidebar() {
   const navigate = useNavigate();
@@ -109,9 +110,18 @@ export function LearningSidebar() {
                     >
                       <div className="flex items-start gap-3 w-full">
                         <div className="flex-shrink-0">
-                          <div className="w-8 h-8 bg-gradient-primary rounded-lg flex items-center justify-center">
-                            <BookOpen className="w-4 h-4 text-white" />
-                          </div>
+                          {item.preview_url ? (
+                            <img
+                              src={`${API_BASE_URL}${item.preview_url}`}
+                              alt=""
+                              loading="lazy"
+                              className="w-14 h-8 rounded-lg object-cover bg-black"
+                            />
+                          ) : (
+                            <div className="w-8 h-8 bg-gradient-primary rounded-lg flex items-center justify-center">
+                              <BookOpen className="w-4 h-4 text-white" />
+                            </div>
+                          )}
                         </div>
                           <div className="flex-1 min-w-0">
                             <div className="flex items-center justify-between mb-1">
@@ -21,6 +21,8 @@ export interface GeneratedContent {
   mindmap_code: string;
   audio_url: string;
   video_url: string;
+  poster_url?: string | null;
+  preview_url?: string | null;
   narrative: {
     segments: Array<{
       segment_id: number;
@@ -36,7 +38,7 @@ export interface GeneratedContent {
   assets: any;
 }
 
-const API_BASE_URL = 'http://localhost:8000';
+export const API_BASE_URL = 'http://localhost:8000';
 
 export const useContentGeneration = () => {
   const [loading, setLoading] = useState(false);
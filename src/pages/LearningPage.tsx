@@ -11,7 +11,7 @@ import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
 import { toast } from "sonner";
-import { useContentGeneration } from "@/hooks/use-content-generation";
+import { API_BASE_URL, useContentGeneration } from "@/hooks/use-content-generation";
 import { Progress } from "@/components/ui/progress";
 
 const LearningPage = () => {
@@ -34,6 +34,7 @@ const LearningPage = () => {
         query: query,
         topic: content.topic,
         session_id: content.session_id,
+        preview_url: content.preview_url,
         createdAt: new Date().toISOString()
       };
       
@@ -123,7 +124,7 @@ const LearningPage = () => {
                 {hasContent && content ? (<AudioControls content={content.audio_url} />) : (<Card><CardContent className="flex items-center justify-center min-h-[400px]"><div className="text-center"><Volume2 className="w-16 h-16 text-muted-foreground mx-auto mb-4" /><h3 className="text-xl font-semibold text-muted-foreground mb-2">No Content Yet</h3><p className="text-muted-foreground">Enter a query above to generate audio explanations</p></div></CardContent></Card>)}
               </TabsContent>
               <TabsContent value="video" className="mt-6">
-                {hasContent && content ? (<AnimatedVideoViewer content={content.video_url} />) : (<Card><CardContent className="flex items-center justify-center min-h-[400px]"><div className="text-center"><Video className="w-16 h-16 text-muted-foreground mx-auto mb-4" /><h3 className="text-xl font-semibold text-muted-foreground mb-2">No Content Yet</h3><p className="text-muted-foreground">Enter a query above to generate animated videos</p></div></CardContent></Card>)}
+                {hasContent && content ? (<AnimatedVideoViewer content={`${API_BASE_URL}${content.video_url}`} poster={content.poster_url ? `${API_BASE_URL}${content.poster_url}` : undefined} />) : (<Card><CardContent className="flex items-center justify-center min-h-[400px]"><div className="text-center"><Video className="w-16 h-16 text-muted-foreground mx-auto mb-4" /><h3 className="text-xl font-semibold text-muted-foreground mb-2">No Content Yet</h3><p className="text-muted-foreground">Enter a query above to generate animated videos</p></div></CardContent></Card>)}
               </TabsContent>
             </Tabs>
           </main>